@@ -18,8 +18,23 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import itertools
+import os
+
+from robot.api import logger
 from robot.api.deco import keyword
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
 from .keywords import ApplicationKeywords, DialogKeywords, ControlKeywords
+from .keywords.async_runner import AsyncRunner
+from .keywords.dialog_watcher import DialogRule, DialogWatcher
+from .keywords.flight_recorder import FlightRecorder
+from .keywords.menu_cache import MenuCache
+from .keywords.poll_scheduler import PollScheduler
+from .keywords.prefetch import PropertyPrefetcher
+from .keywords.screenshot import ScreenshotPipeline
+from .keywords.ui_snapshot import UISnapshot
+from .keywords.window_snapshot import WindowSnapshot
+from .listener import LibraryListener
 
 __version__ = "1.0.0"
 
@@ -31,7 +46,20 @@ class PywinautoLibrary:
     ROBOT_LIBRARY_VERSION = __version__
 
     def __init__(self):
-        self.app_keywords = ApplicationKeywords()
+        self.window_snapshot = WindowSnapshot()
+        self.prefetcher = PropertyPrefetcher()
+        self.ui_snapshot = UISnapshot()
+        self.flight_recorder = FlightRecorder()
+        self.screenshots = ScreenshotPipeline()
+        self.screenshot_on_failure = True
+        self._screenshot_index = itertools.count(1)
+        self.ROBOT_LIBRARY_LISTENER = LibraryListener(self)
+        self.dialog_watcher = DialogWatcher(self.window_snapshot)
+        self.poll_scheduler = PollScheduler(snapshot_hooks=[self.window_snapshot.invalidate,
+                                                            self.dialog_watcher.check])
+        self.async_runner = AsyncRunner(self.poll_scheduler)
+        self.app_keywords = ApplicationKeywords(self.window_snapshot)
+        self.menu_cache = MenuCache()
         self.dialog_keywords = None
         self.control_keywords = None
 
@@ -82,46 +110,219 @@ class PywinautoLibrary:
 
     @keyword
     def launch_application(self, app_path, backend="win32"):
-        """Launch a Windows application."""
-        app = self.app_keywords.launch_application(app_path, backend)
-        self.dialog_keywords = DialogKeywords(app)  # Inject the application instance
-        self.control_keywords = ControlKeywords(self.dialog_keywords.dlg)  # Inject the dialog instance
-
-    @keyword
-    def connect_to_application(self, title_regex, backend="win32"):
-        """Connect to a running application using a window title regex."""
-        app = self.app_keywords.connect_to_application(title_regex, backend)
-        self.dialog_keywords = DialogKeywords(app)  # Inject the application instance
-        self.control_keywords = ControlKeywords(self.dialog_keywords.dlg)  # Inject the dialog instance
+        """Launch a Windows application.
+        backend is "win32", "uia" or "auto". "auto" connects both backends to the application and looks up
+        each control with win32 when it can find it, falling back to uia otherwise. The choice is remembered
+        per dialog class and control, see Get Backend Statistics."""
+        self._attach(self.app_keywords.launch_application(app_path, backend))
+
+    @keyword
+    def connect_to_application(self, title_regex=None, backend="win32", pid=None, process=None, handle=None,
+                               path=None):
+        """Connect to a running application.
+        The application is selected by exactly one of:
+        * title_regex - a regex matched against the titles of the top-level windows, which fails
+          if more than one window matches
+        * pid - the process ID
+        * process - the executable file name of the process, e.g. services.exe
+        * handle - the handle of one of its windows, in decimal or in hexadecimal with a 0x prefix
+        * path - the full path of its executable
+        pid, process, handle and path go straight to the process without scanning window titles,
+        which also works when the window titles are dynamic.
+
+        Example:
+        | Connect To Application | process=notepad.exe | backend=uia |"""
+        self._attach(self.app_keywords.connect_to_application(title_regex, backend, pid, process, handle, path))
+
+    @keyword
+    def connect_or_launch(self, app_path, backend="win32"):
+        """Connect to a running instance of the executable at app_path, or launch it if it is not running.
+        app_path may be followed by arguments, e.g. "notepad.exe C:\\notes.txt", which are used only for launching."""
+        self._attach(self.app_keywords.connect_or_launch(app_path, backend))
+
+    def _attach(self, app):
+        """Create the dialog and control keywords for an application."""
+        # The watcher was started for the previous application.
+        self.dialog_watcher.stop()
+        self.dialog_keywords = DialogKeywords(app, self.menu_cache, self.window_snapshot,
+                                              self.poll_scheduler, self.screenshots)  # Inject the application instance
+        self.control_keywords = ControlKeywords(self.dialog_keywords.dlg, self.menu_cache, self.poll_scheduler,
+                                                self.screenshots, self.prefetcher,
+                                                self.ui_snapshot)  # Inject the dialog instance
+        self.dialog_keywords.on_dialog_change = self.control_keywords.set_dialog
+        self.control_keywords.lookup_hooks.append(self.dialog_watcher.check)
+        self.control_keywords.lookup_hooks.append(self.dialog_keywords.refresh_dialog)
+        self.control_keywords.control_hooks.append(self.flight_recorder.control)
+
+    @keyword
+    def set_window_snapshot_ttl(self, ttl):
+        """Set for how many seconds the list of top-level windows is reused before the windows are enumerated again.
+        Connect To Application, Get Dialog and Get Dialog From Regex share this list, and each poll
+        of Get Dialog and Get Dialog From Regex enumerates the windows only once.
+        The default is 0.05 seconds. 0 enumerates the windows on every lookup."""
+        self.app_keywords.set_window_snapshot_ttl(ttl)
+
+    @keyword
+    def set_poll_intervals(self, min_interval, max_interval, backoff=None):
+        """Set the poll intervals, in seconds, of the waits done by this library.
+        All active waits are polled together, with one enumeration of the top-level windows per poll.
+        Each wait is first polled every min_interval seconds, and the interval is multiplied by backoff
+        (1.5 by default) after every unsuccessful poll, up to max_interval.
+        The defaults are 0.02 and 0.5 seconds."""
+        self.poll_scheduler.set_intervals(min_interval, max_interval, backoff)
+
+    @keyword
+    def get_poll_statistics(self, reset=False):
+        """Retrieve statistics of the recent waits as a list of dictionaries with the keys
+        "name", "polls" (number of polls), "detected" (whether the condition was met) and
+        "latency" (seconds from the start of the wait until the condition was detected or the wait timed out).
+        reset (optional) clears the statistics after retrieving them."""
+        statistics = list(self.poll_scheduler.statistics)
+        if reset and str(reset).lower() not in ("false", "no", "0"):
+            self.poll_scheduler.statistics.clear()
+        return statistics
+
+    @keyword
+    def get_backend_statistics(self):
+        """Retrieve the number of control lookups and the seconds spent in them per backend
+        as a dictionary with the keys "win32" and "uia", along with the "routes" remembered with backend=auto
+        as a dictionary of "dialog class/control" to backend."""
+        return self.app_keywords.get_backend_statistics()
+
+    @keyword
+    def add_dialog_watcher_rule(self, name, title_re=None, class_name=None, text_re=None, action="close"):
+        """Register a rule for unexpected dialogs handled by the dialog watcher.
+        A new top-level window of the application matches when its title matches title_re,
+        its class name equals class_name and any text of the window or its controls matches text_re.
+        Omitted criteria are not checked. A rule with the same name is replaced.
+
+        action can be:
+        * close - close the window
+        * click:<control> - click a control of the window, e.g. click:No
+        * keys:<keys> - type keys into the window, e.g. keys:{ESC}
+        * fail - fail the next wait or control keyword of this library (or Check Unexpected Dialogs)
+          with a clear error instead of letting it run into its timeout"""
+        self.dialog_watcher.add_rule(DialogRule(name, title_re, class_name, text_re, action))
+
+    @keyword
+    def remove_dialog_watcher_rule(self, name):
+        """Remove a dialog watcher rule by its name."""
+        self.dialog_watcher.remove_rule(name)
+
+    @keyword
+    def start_dialog_watcher(self, interval=0.5, budget=0.02):
+        """Start watching the current application for unexpected dialogs in a background thread.
+        Every interval seconds, the top-level windows of the application are compared with the previous scan,
+        and windows that appeared since then are matched against the rules. Windows already open when
+        the watcher starts and the current dialog are never acted upon.
+        budget is the largest fraction of time the scans may take. Slower scans stretch the interval.
+        The watcher stops when the library connects to or launches another application."""
+        if not self.app_keywords.app:
+            raise RuntimeError("No application is currently connected.")
+        self.dialog_watcher.budget = float(budget)
+        self.dialog_watcher.start(self.app_keywords.app, self.dialog_keywords.active_handle, interval)
+
+    @keyword
+    def stop_dialog_watcher(self):
+        """Stop watching for unexpected dialogs."""
+        self.dialog_watcher.stop()
+
+    @keyword
+    def check_unexpected_dialogs(self):
+        """Fail if the dialog watcher saw a dialog matching a rule with the fail action that no failed keyword
+        has reported yet."""
+        self.dialog_watcher.check()
+
+    @keyword
+    def get_dialog_watcher_statistics(self):
+        """Retrieve the dialog watcher statistics as a dictionary with the keys "scans", "scan_time"
+        (total seconds spent scanning), "mean_scan_time", "interval" (current seconds between scans)
+        and "events" (the recently handled windows)."""
+        return self.dialog_watcher.statistics()
 
     @keyword
     def close_application(self):
         """Close the current application."""
+        self.dialog_watcher.stop()
         self.dialog_keywords.close_window()
         self.app_keywords.close_application()
 
     @keyword
     def disconnect_from_application(self):
         """Disconnect from the current application."""
+        self.dialog_watcher.stop()
         self.dialog_keywords.disconnect_from_dialog()
         self.app_keywords.disconnect_from_application()
 
     # Dialog-related keywords
     @keyword
     def get_dialog_from_regex(self, title_re):
-        """Get the dialog matching the regex from the application."""
+        """Get the dialog matching the regex from the application.
+        Waits up to window_find_timeout for the dialog and fails if no visible window of the application matches."""
         self.dialog_keywords.get_dialog_from_regex(title_re)
         self.control_keywords.set_dialog(self.dialog_keywords.dlg)
 
     @keyword
     def get_dialog(self, title):
-        """Get the dialog by its exact title."""
+        """Get the dialog by its exact title.
+        Waits up to window_find_timeout for the dialog and fails if no visible window of the application matches."""
         self.dialog_keywords.get_dialog(title)
         self.control_keywords.set_dialog(self.dialog_keywords.dlg)
 
+    @keyword
+    def push_dialog(self, title):
+        """Get the dialog by its exact title, keeping the current dialog to return to with Pop Dialog.
+        The kept dialog keeps its control lookups (item indexes and tree nodes), so switching between a
+        window and its modal children doesn't rebuild them.
+
+        Example:
+        | Get Dialog | Main Window |
+        | Click | Options... |
+        | Push Dialog | Options |
+        | Click | OK |
+        | Pop Dialog |
+        | Click | Save |"""
+        self.dialog_keywords.push_dialog(title, self.control_keywords.lookup_state())
+        self.control_keywords.set_dialog(self.dialog_keywords.dlg)
+
+    @keyword
+    def pop_dialog(self):
+        """Return to the dialog that was current before the last Push Dialog.
+        The dialog is reused without searching the windows again if its window still exists,
+        otherwise it is looked up again by the title it was found with and its control lookups start over."""
+        control_state = self.dialog_keywords.pop_dialog()
+        if control_state is None:
+            self.control_keywords.set_dialog(self.dialog_keywords.dlg)
+        else:
+            self.control_keywords.restore_lookup_state(control_state)
+
+    @keyword
+    def wait_for_any_dialog(self, *title_res, timeout=None):
+        """Wait for a dialog matching any of the given title regexes and make it the current dialog.
+        All regexes are matched against a single enumeration of the top-level windows per poll,
+        so waiting for several possible outcomes costs no more than waiting for one.
+        timeout (optional) defaults to window_find_timeout.
+        Returns the regex that matched.
+
+        Example:
+        | ${matched}= | Wait For Any Dialog | Saved.* | Error.* | License.* | timeout=30 |"""
+        matched = self.dialog_keywords.wait_for_any_dialog(*title_res, timeout=timeout)
+        self.control_keywords.set_dialog(self.dialog_keywords.dlg)
+        return matched
+
+    @keyword
+    def get_dialog_resolution_statistics(self):
+        """Retrieve how often the current dialog was reused and looked up again, as a dictionary with the keys
+        "reused" (dialog keywords that reused the dialog resolved by Get Dialog, Get Dialog From Regex or
+        Wait For Any Dialog, instead of finding the window again) and "re_resolved" (lookups needed because
+        the dialog window was destroyed or recreated). Control keywords follow a recreated dialog as well."""
+        return {"reused": self.dialog_keywords.dialog_reuses,
+                "re_resolved": self.dialog_keywords.dialog_re_resolutions}
+
     @keyword
     def get_number_of_children(self):
-        """Get the number of child elements in the current dialog."""
+        """Get the number of child elements in the current dialog.
+        The children are counted from their element information, without building a wrapper for each of them."""
         return self.dialog_keywords.get_number_of_children()
 
     @keyword
@@ -159,12 +360,151 @@ class PywinautoLibrary:
         """Set focus to the current dialog window."""
         self.dialog_keywords.set_window_focus()
 
+    @keyword
+    def capture_dialog_screenshot(self, path=None, scale=1.0, quality=90):
+        """Capture an image of the current dialog and embed it in the log.
+        path (optional) is the image file to write. The format follows the extension (.png, .jpg, .jpeg or .bmp).
+        If omitted, a numbered PNG file is written to the output directory.
+        scale (optional) downscales the image, e.g. 0.5 halves its width and height.
+        quality (optional) is the JPEG quality.
+        Only the pixels are grabbed by the keyword itself. Scaling, encoding and writing happen in the background,
+        and the encoding of an identical earlier capture is reused. A failed background write fails the next capture.
+        Returns the path of the image. Requires Pillow."""
+        path = self.dialog_keywords.capture_dialog_screenshot(self._screenshot_path(path), scale, quality)
+        self._log_screenshot(path)
+        return path
+
+    @keyword
+    def set_screenshot_on_failure(self, enabled):
+        """Enable or disable capturing the current dialog when a keyword of this library fails. Enabled by default."""
+        self.screenshot_on_failure = str(enabled).lower() not in ("false", "no", "off", "0", "none", "")
+
+    def _screenshot_path(self, path):
+        """Get the path for a screenshot, numbering it in the output directory if no path is given."""
+        if path:
+            return path
+        return os.path.join(self._output_dir(), f"pywinauto-screenshot-{next(self._screenshot_index)}.png")
+
+    @staticmethod
+    def _output_dir():
+        """Get the Robot Framework output directory, or the working directory outside of a run."""
+        try:
+            return BuiltIn().get_variable_value("${OUTPUT DIR}")
+        except RobotNotRunningError:
+            return os.getcwd()
+
+    def _log_screenshot(self, path):
+        """Embed a screenshot in the log, relative to the output directory."""
+        try:
+            link = os.path.relpath(path, self._output_dir()).replace(os.sep, "/")
+        except ValueError:
+            # The image is on another drive than the output directory.
+            link = os.path.abspath(path)
+        logger.info(f'<a href="{link}"><img src="{link}" width="800px"></a>', html=True)
+
+    def _capture_failure_screenshot(self):
+        """Capture the current dialog after a failed keyword, ignoring any capture errors."""
+        if not self.screenshot_on_failure or not self.dialog_keywords or not self.dialog_keywords.dlg:
+            return
+        try:
+            path = self.dialog_keywords.capture_dialog_screenshot(self._screenshot_path(None))
+        except Exception as error:
+            logger.debug(f"Capturing a screenshot on failure failed: {error}")
+            return
+        self._log_screenshot(path)
+
+    def _record_keyword_start(self, name, args):
+        """Record the start of a keyword in the flight recorder along with the current dialog."""
+        dialogs = self.dialog_keywords
+        if dialogs is None:
+            self.flight_recorder.start(name, args, None, None)
+        else:
+            self.flight_recorder.start(name, args, dialogs.active_criteria(), dialogs.active_handle())
+
+    def _dump_flight_recorder_on_failure(self):
+        """Log the keywords recorded since the last dump after a failed keyword."""
+        lines = self.flight_recorder.dump(since_last_dump=True)
+        if lines:
+            logger.info("Flight recorder, oldest first:\n" + "\n".join(lines))
+
+    @keyword
+    def dump_flight_recorder(self, path=None):
+        """Write the last keyword calls of this library to the log, or to the file at path (optional).
+        The flight recorder is always on and keeps the last 256 calls with their arguments, the dialog they
+        ran in (the criteria it was found with and its handle), the last control they resolved (its class name,
+        backend and handle), their duration and status. The calls since
+        the previous dump are also logged automatically when a keyword of this library fails.
+        Returns the recorded calls as a list of lines, oldest first."""
+        lines = self.flight_recorder.dump()
+        if path:
+            with open(path, "w", encoding="utf-8") as output:
+                output.write("\n".join(lines) + "\n")
+        else:
+            logger.info("\n".join(lines))
+        return lines
+
+    @keyword
+    def get_flight_recorder_statistics(self):
+        """Retrieve the flight recorder statistics as a dictionary with the keys "records" (calls recorded),
+        "size" (calls kept) and "overhead_us" (mean microseconds spent recording a call)."""
+        return self.flight_recorder.statistics()
+
     @keyword
     def print_control_identifiers(self):
         """Print control identifiers of the current dialog."""
         return self.dialog_keywords.print_control_identifiers()
 
     # Control-related keywords
+    @keyword
+    def begin_property_prefetch(self, control_name=None):
+        """Fetch the properties of the current dialog, or of a specified control, and all their descendants
+        with a single UI Automation cache request (uia backend only).
+        Until End Property Prefetch or the next dialog change, Get Control Text and the Control Is Checked,
+        Control Is Unchecked and Control Is Indeterminate keywords read the prefetched values instead of
+        querying the application for each of them. Each control is still looked up once.
+        Texts only available from the text pattern, such as those of edit and document controls, are read
+        from the application. After any keyword of this library that may change the UI, the properties are
+        fetched again on the next read.
+        Returns the number of elements fetched."""
+        return self.control_keywords.begin_property_prefetch(control_name)
+
+    @keyword
+    def end_property_prefetch(self):
+        """Stop reading prefetched properties."""
+        self.control_keywords.end_property_prefetch()
+
+    @keyword
+    def get_prefetch_statistics(self):
+        """Retrieve the property prefetch statistics as a dictionary with the keys "hits" (reads served from
+        prefetched values), "control_hits" (the hits per "control/property"), "misses" (reads that queried
+        the application), "fetches" (bulk requests), "fetch_time" (seconds spent in bulk requests) and "active"."""
+        return self.prefetcher.statistics()
+
+    @keyword
+    def begin_ui_snapshot(self):
+        """Treat the UI as frozen and memoize the reads of the read-only getters, e.g. Get Control Text,
+        Get Combobox Items, Get Listview Item Count or Get Tab Text.
+        The first read of a control reads all the values of its kind at once, later reads of that control are
+        served from them. The text of an edit box is not part of that bulk read: it is only read, and then kept,
+        by Get Editbox Text. Any keyword of this library that is not read-only, e.g. Click, Type Text or
+        Combobox Select Value, and any dialog change discard everything read so far, so values are never older
+        than the last action. Changes made by the application itself or by other libraries are not seen
+        until the next action or End UI Snapshot.
+
+        Example:
+        | Begin UI Snapshot |
+        | ${items} = | Get Combobox Items | ComboBox |
+        | ${value} = | Get Combobox Selected Value | ComboBox |
+        | End UI Snapshot |"""
+        self.ui_snapshot.begin()
+
+    @keyword
+    def end_ui_snapshot(self):
+        """Stop memoizing reads. Returns the snapshot statistics as a dictionary with the keys "hits" (reads
+        served from the snapshot), "bulk_reads" (controls read at once), "invalidations" and "active"."""
+        self.ui_snapshot.end()
+        return self.ui_snapshot.statistics()
+
     @keyword
     def get_control_text(self, control_name):
         """Retrieve the text of a specified control."""
@@ -172,9 +512,21 @@ class PywinautoLibrary:
 
     @keyword
     def menu_select(self, menulocation):
-        """Select a menu item by its location (e.g., 'File -> Save')."""
+        """Select a menu item by its location (e.g., 'File -> Save').
+        With the win32 backend, the command ID of the selected item is remembered per application build
+        and dialog, and later selections of the same location send the command directly without opening
+        the menus. The menus are walked as usual when the item is unknown or currently disabled."""
         self.control_keywords.menu_select(menulocation)
 
+    @keyword
+    def get_menu_structure(self):
+        """Retrieve the menu bar of the current dialog as nested dictionaries with
+        "text", "id", "enabled" and "children" keys, without opening any menus.
+        The command IDs found are remembered, so following Menu Select calls can send the commands directly.
+        Menus that the application builds only when they are opened may appear empty.
+        Only the win32 backend is supported."""
+        return self.control_keywords.get_menu_structure()
+
     @keyword
     def type_text(self, control_name, text):
         """Type text into a specified control."""
@@ -226,6 +578,72 @@ class PywinautoLibrary:
 
         self.control_keywords.drag_mouse(control_name, dst, src, button, pressed, absolute)
 
+    @keyword
+    def capture_control_screenshot(self, control_name, path=None, scale=1.0, quality=90):
+        """Capture an image of a specified control and embed it in the log.
+        The arguments and behaviour are the same as with Capture Dialog Screenshot."""
+        path = self.control_keywords.capture_control_screenshot(control_name, self._screenshot_path(path),
+                                                                scale, quality)
+        self._log_screenshot(path)
+        return path
+
+    @keyword
+    def wait_until_control_is_visually_stable(self, control_name, stable_time=0.5, tolerance=0.01,
+                                              timeout=None, max_side=64):
+        """Wait until the image of a specified control has not changed for stable_time seconds.
+        Useful for owner-drawn controls that give no text or state signal when they finish rendering.
+        tolerance is the mean pixel difference (0 to 1) between two captures still considered unchanged.
+        timeout (optional) defaults to window_find_timeout.
+        max_side is the size, in pixels, the captures are downsampled to before they are compared.
+        Returns the number of seconds waited. Requires Pillow and NumPy."""
+        return self.control_keywords.wait_until_control_is_visually_stable(control_name, stable_time, tolerance,
+                                                                           timeout, max_side)
+
+    @keyword
+    def wait_until_control_image_changes(self, control_name, tolerance=0.01, timeout=None, max_side=64):
+        """Wait until the image of a specified control differs from its image at the start of the wait
+        by more than tolerance (the mean pixel difference, from 0 to 1).
+        timeout (optional) defaults to window_find_timeout.
+        max_side is the size, in pixels, the captures are downsampled to before they are compared.
+        Returns the difference detected. Requires Pillow and NumPy."""
+        return self.control_keywords.wait_until_control_image_changes(control_name, tolerance, timeout, max_side)
+
+    @keyword
+    def find_image_in_control(self, control_name, template_path, confidence=0.9, scales=1.0):
+        """Find a template image within the captured region of a control, e.g. an owner-drawn canvas.
+        confidence is the minimum normalized cross-correlation score (0 to 1) accepted as a match.
+        scales (optional) is a comma separated list of scales the template is tried at, e.g. 0.8,1.0,1.25.
+        The area of the previous match of the same template is searched first.
+        Returns the screen coordinates of the center of the match, usable as dst or src of Drag Mouse.
+        Fails if the template is not found. Requires Pillow and NumPy."""
+        return self.control_keywords.find_image_in_control(control_name, template_path, confidence, scales)
+
+    @keyword
+    def click_image_in_control(self, control_name, template_path, confidence=0.9, scales=1.0, button="left",
+                               double=False):
+        """Click the center of a template image found within the captured region of a control.
+        The arguments to find the image are the same as with Find Image In Control.
+        button can be “left”, “right” or “middle”. double (optional) double-clicks.
+        Returns the screen coordinates clicked."""
+        return self.control_keywords.click_image_in_control(control_name, template_path, confidence, scales,
+                                                            button, double)
+
+    @keyword
+    def control_exists(self, control_name, timeout=0):
+        """Return True if a specified control exists in the current dialog and False otherwise, without failing.
+        timeout (optional) is the number of seconds to wait for the control. By default the keyword returns
+        immediately instead of waiting window_find_timeout like the other control keywords."""
+        return self.control_keywords.control_exists(control_name, timeout)
+
+    @keyword
+    def count_controls(self, class_name=None, text_re=None, control_type=None):
+        """Count the controls of the current dialog, at any depth, matching all the given criteria.
+        class_name (optional) is the exact window class name, e.g. Button.
+        text_re (optional) is a regex the control text must match.
+        control_type (optional) is the UI Automation control type, e.g. Button, with the uia backend.
+        The controls are enumerated without building wrappers and the keyword returns immediately."""
+        return self.control_keywords.count_controls(class_name, text_re, control_type)
+
     @keyword
     def control_is_active(self, control_name):
         """Verify that the element is both visible and enabled.\
@@ -258,6 +676,21 @@ class PywinautoLibrary:
         retry_interval (optional) interval between scroll actions"""
         self.control_keywords.scroll(control_name, direction, amount, count, retry_interval)
 
+    @keyword
+    def scroll_to_item(self, control_name, item):
+        """Scroll a list box, list view, tree or combo box drop-down until an item is visible.
+        item is the text of the item, or its index if it is made of digits. For trees it is the path
+        of the node, e.g. "Root->Child".
+        The control's own ensure-visible or scroll-into-view operation is used where available, otherwise
+        the scroll position is bisected towards the item, so it takes a handful of steps whatever the length
+        of the list. The list of a combo box is dropped down first. Fails if the item is not visible afterwards.
+
+        Example:
+        | Scroll To Item | ListBox | Item 250 |
+        | Scroll To Item | ListView | 1200 |
+        | Scroll To Item | TreeView | Root->Branch->Leaf |"""
+        self.control_keywords.scroll_to_item(control_name, item)
+
     @keyword
     def control_has_focus(self, control_name):
         """Check if a control has focus."""
@@ -344,9 +777,13 @@ class PywinautoLibrary:
         self.control_keywords.combobox_select_index(control_name, value)
 
     @keyword
-    def combobox_select_value(self, control_name, value):
-        """Select a combobox item by value."""
-        self.control_keywords.combobox_select_value(control_name, value)
+    def combobox_select_value(self, control_name, value, ignore_case=False, regex=False):
+        """Select a combobox item by value.
+        ignore_case (optional) matches the value case-insensitively.
+        regex (optional) treats the value as a regular expression that must match the whole item text.
+        The item texts are indexed on first use and only re-read when the item count changes
+        or the value is not found, so repeated selections do not scan all items."""
+        self.control_keywords.combobox_select_value(control_name, value, ignore_case, regex)
 
     @keyword
     def get_editbox_line_count(self, control_name):
@@ -363,6 +800,28 @@ class PywinautoLibrary:
         """Retrieve the text of an edit box."""
         return self.control_keywords.get_editbox_text(control_name)
 
+    @keyword
+    def get_editbox_lines(self, control_name, start=0, end=None):
+        """Retrieve a range of lines from an edit box, reading its text with a single call.
+        start is the index of the first line to retrieve, starting from 0.
+        end (optional) is the index after the last line to retrieve. If omitted, all remaining lines are retrieved."""
+        return self.control_keywords.get_editbox_lines(control_name, start, end)
+
+    @keyword
+    def export_editbox_text(self, control_name, path, chunk_size=1000, encoding="utf-8"):
+        """Write the text of an edit box to a file, chunk_size lines at a time.
+        The text is read from the edit box with a single call and split into lines locally, so this is
+        suitable for very large edit controls.
+        Returns the number of lines written and the SHA-256 checksum of the file content."""
+        return self.control_keywords.export_editbox_text(control_name, path, chunk_size, encoding)
+
+    @keyword
+    def search_editbox_text(self, control_name, pattern, max_matches=None):
+        """Retrieve the indices of the edit box lines matching the regex pattern.
+        The text is read from the edit box with a single call and searched one line at a time.
+        max_matches (optional) stops the search after the given number of matches."""
+        return self.control_keywords.search_editbox_text(control_name, pattern, max_matches)
+
     @keyword
     def set_editbox_text(self, control_name, textblock):
         """Set the text of an edit box."""
@@ -394,16 +853,42 @@ class PywinautoLibrary:
         self.control_keywords.listbox_select_index(control_name, value)
 
     @keyword
-    def listbox_select_value(self, control_name, value):
-        """Select a listbox item by value."""
-        self.control_keywords.listbox_select_value(control_name, value)
+    def listbox_select_value(self, control_name, value, ignore_case=False, regex=False):
+        """Select a listbox item by value.
+        ignore_case (optional) matches the value case-insensitively.
+        regex (optional) treats the value as a regular expression that must match the whole item text.
+        The item texts are indexed on first use and only re-read when the item count changes
+        or the value is not found, so repeated selections do not scan all items."""
+        self.control_keywords.listbox_select_value(control_name, value, ignore_case, regex)
 
     @keyword
     def listbox_deselect_all(self, control_name):
         """Deselect all currently selected items in a listbox.
-        Further adjustments may be needed to address this scenario effectively."""
+        The selection is cleared with a single list box message (or the selection pattern with uia)
+        instead of clicking each item, and the keyword fails if any item is still selected afterwards."""
         self.control_keywords.listbox_deselect_all(control_name)
 
+    @keyword
+    def listbox_select_indices(self, control_name, *indices):
+        """Add the items at the given indices (starting from 0) to the selection of a listbox.
+        The items are selected in a single pass without clicking, and the selection is verified once at the end.
+        Returns the selected indices."""
+        return self.control_keywords.listbox_select_indices(control_name, *indices)
+
+    @keyword
+    def listbox_select_values(self, control_name, *values):
+        """Add the items with the given values to the selection of a listbox.
+        The items are selected in a single pass without clicking, and the selection is verified once at the end.
+        Returns the selected indices."""
+        return self.control_keywords.listbox_select_values(control_name, *values)
+
+    @keyword
+    def listbox_select_range(self, control_name, first, last):
+        """Add the items from index first to index last (inclusive) to the selection of a listbox.
+        On multiple selection list boxes the range is selected with a single message.
+        Returns the selected indices."""
+        return self.control_keywords.listbox_select_range(control_name, first, last)
+
     @keyword
     def get_listview_column_count(self, control_name):
         """Retrieve the column count of a listview."""
@@ -419,6 +904,19 @@ class PywinautoLibrary:
         """Retrieve the header text of a listview."""
         return self.control_keywords.listview_header_text(control_name)
 
+    @keyword
+    def get_listview_data(self, control_name, start=0, count=None, output=None, output_format="csv", encoding="utf-8"):
+        """Retrieve the rows of a listview as a list of dictionaries keyed by the column header names.
+        start (optional) is the index of the first row to retrieve, starting from 0.
+        count (optional) is the maximum number of rows to retrieve. If omitted, all remaining rows are retrieved.
+        output (optional) is a file path. When given, the rows are streamed to the file one at a time
+        instead of being returned, and the number of rows written is returned.
+        output_format (optional) can be "csv" (with a header row) or "jsonl" (one JSON object per line).
+        With the win32 backend, virtual list views are read without scrolling. With uia, rows of a
+        virtualized list view are realized one at a time, which may scroll it, and the keyword fails if
+        the list view returns fewer rows than it reports."""
+        return self.control_keywords.get_listview_data(control_name, start, count, output, output_format, encoding)
+
     @keyword
     def listview_get_selected_count(self, control_name):
         """Retrieve the selected item count of a listview."""
@@ -479,6 +977,67 @@ class PywinautoLibrary:
         """Retrieve the text of a status bar."""
         return self.control_keywords.get_statusbar_text(control_name)
 
+    @keyword
+    def wait_for_statusbar_text(self, control_name, pattern, part=None, timeout=None):
+        """Wait until the text of a status bar matches the regex pattern.
+        part (optional) is the index of the status bar part to check. If omitted, any part may match.
+        timeout (optional) defaults to window_find_timeout.
+        The status bar is resolved once and only the requested part is read on each poll.
+        Returns the matching text and the number of seconds it took to match, usable as a latency metric.
+
+        Example:
+        | ${text} | ${seconds}= | Wait For Statusbar Text | StatusBar | Loaded .* records | part=0 | timeout=30 |"""
+        return self.control_keywords.wait_for_statusbar_text(control_name, pattern, part, timeout)
+
+    @keyword
+    def wait_for_control_state(self, control_name, state, timeout=None):
+        """Wait until a control is in the given state: exists, visible, enabled, ready (visible and enabled),
+        checked or unchecked.
+        timeout (optional) defaults to window_find_timeout.
+        Returns the number of seconds it took to reach the state.
+
+        Example:
+        | ${seconds}= | Wait For Control State | Connect | ready | timeout=30 |"""
+        return self.control_keywords.wait_for_control_state(control_name, state, timeout)
+
+    # Async keywords, executed by Robot Framework 7.1 or newer. They run the blocking calls of their
+    # synchronous counterparts in a bounded thread pool, so several of them, e.g. on two library instances
+    # connected to different applications, can be awaited concurrently:
+    #     await asyncio.gather(client.wait_for_statusbar_text_async("StatusBar", "Ready"),
+    #                          server.wait_for_statusbar_text_async("StatusBar", "Ready"))
+    # Cancelling one, including by a timeout of asyncio.wait_for, ends its polling at the next tick.
+    @keyword
+    async def wait_for_any_dialog_async(self, *title_res, timeout=None):
+        """Async version of Wait For Any Dialog."""
+        return await self.async_runner.run(self.wait_for_any_dialog, *title_res, timeout=timeout)
+
+    @keyword
+    async def wait_for_control_state_async(self, control_name, state, timeout=None):
+        """Async version of Wait For Control State."""
+        return await self.async_runner.run(self.control_keywords.wait_for_control_state, control_name, state,
+                                           timeout)
+
+    @keyword
+    async def wait_for_statusbar_text_async(self, control_name, pattern, part=None, timeout=None):
+        """Async version of Wait For Statusbar Text."""
+        return await self.async_runner.run(self.control_keywords.wait_for_statusbar_text, control_name, pattern,
+                                           part, timeout)
+
+    @keyword
+    async def get_control_text_async(self, control_name):
+        """Async version of Get Control Text."""
+        return await self.async_runner.run(self.control_keywords.get_control_text, control_name)
+
+    @keyword
+    async def get_editbox_text_async(self, control_name):
+        """Async version of Get Editbox Text."""
+        return await self.async_runner.run(self.control_keywords.get_editbox_text, control_name)
+
+    @keyword
+    async def get_statusbar_text_async(self, control_name):
+        """Async version of Get Statusbar Text."""
+        return await self.async_runner.run(self.control_keywords.get_statusbar_text, control_name)
+
     @keyword
     def get_tab_count(self, control_name):
         """Retrieve the number of tabs."""
@@ -500,9 +1059,11 @@ class PywinautoLibrary:
         return self.control_keywords.get_all_tab_texts(control_name)
 
     @keyword
-    def select_tab_by_text(self, control_name, text):
-        """Select a tab by its text."""
-        self.control_keywords.select_tab_by_text(control_name, text)
+    def select_tab_by_text(self, control_name, text, ignore_case=False, regex=False):
+        """Select a tab by its text.
+        ignore_case (optional) matches the text case-insensitively.
+        regex (optional) treats the text as a regular expression that must match the whole tab text."""
+        self.control_keywords.select_tab_by_text(control_name, text, ignore_case, regex)
 
     @keyword
     def select_tab_by_index(self, control_name, index):
@@ -520,9 +1081,11 @@ class PywinautoLibrary:
         return self.control_keywords.get_toolbar_button_text(control_name, index)
 
     @keyword
-    def click_toolbar_button(self, control_name, text):
-        """Click a toolbar button by its text."""
-        self.control_keywords.click_toolbar_button(control_name, text)
+    def click_toolbar_button(self, control_name, text, ignore_case=False, regex=False):
+        """Click a toolbar button by its text.
+        ignore_case (optional) matches the text case-insensitively.
+        regex (optional) treats the text as a regular expression that must match the whole button text."""
+        self.control_keywords.click_toolbar_button(control_name, text, ignore_case, regex)
 
     @keyword
     def get_tree_text(self, control_name):
@@ -593,7 +1156,54 @@ class PywinautoLibrary:
         """
         self.control_keywords.expand_tree_element(control_name, path)
 
+    @keyword
+    def collapse_tree_element(self, control_name, path):
+        """
+        Collapse a treeview control element by the path within the tree.
+        The path should take the same form as a menu, where -> delimits the nodes.
+        Cached nodes below the collapsed element are discarded, as applications may recreate them.
+        """
+        self.control_keywords.collapse_tree_element(control_name, path)
+
+    @keyword
+    def get_tree_structure(self, control_name, depth=None, output=None, expand=True, encoding="utf-8"):
+        """
+        Retrieve the nodes of a treeview control as nested dictionaries with "text" and "children" keys.
+        depth (optional) limits the number of levels retrieved, 1 retrieving only the root nodes.
+        output (optional) is a file path. When given, the nodes are streamed to the file as one JSON object
+        per line with "path", "depth" and "text" keys, and the number of nodes written is returned.
+        expand (optional) controls whether nodes whose children are not loaded yet are expanded.
+
+        Tree elements are resolved by path once and reused by the click and expand keywords,
+        so walking from the root is only needed for paths that have not been seen before.
+        """
+        return self.control_keywords.get_tree_structure(control_name, depth, output, expand, encoding)
+
+    @keyword
+    def export_control_tree(self, path, output_format="json", depth=None, identifiers=True, encoding="utf-8"):
+        """Write the control tree of the current dialog to a file, as a searchable alternative to
+        Print Control Identifiers.
+        Each control is described by its class_name, text, auto_id, control_id, rect (left, top, right, bottom)
+        and identifiers (the names it can be looked up with).
+        output_format can be "json" (one nested document) or "jsonl" (one object per control, with a "key"
+        identifying the control).
+        depth (optional) limits the number of levels below the dialog.
+        identifiers (optional) can be disabled to skip computing the lookup names, which is the slowest part.
+        The tree is reused for the same dialog until a control is added, removed, renamed, moved or resized.
+        Returns the number of controls written."""
+        return self.dialog_keywords.export_control_tree(path, output_format, depth, identifiers, encoding)
+
+    @keyword
+    def compare_control_trees(self, old_path, new_path, encoding="utf-8"):
+        """Compare two control trees written by Export Control Tree in the json format, e.g. from two builds.
+        Controls are matched by a stable identity (their class and automation id, control id or text,
+        along the path from the dialog), not by position.
+        Returns a dictionary with the "added" and "removed" controls and the "changed" fields of the others."""
+        return self.dialog_keywords.compare_control_trees(old_path, new_path, encoding)
+
     @keyword
     def popup_menu_select(self, menulocation):
-        """Select a menu item from a popup menu by its location."""
+        """Select a menu item from a popup menu by its location.
+        With the win32 backend, the item positions are remembered per application build and dialog,
+        so later selections of the same location skip matching the item texts at each menu level."""
         self.dialog_keywords.popup_menu_select(menulocation)
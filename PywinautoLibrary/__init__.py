@@ -18,4 +18,15 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-from .PywinautoLibrary import PywinautoLibrary
+__all__ = ["PywinautoLibrary"]
+
+
+def __getattr__(name):
+    """Import the library class on first use, so the helper modules of the package can be imported
+    without importing pywinauto."""
+    if name == "PywinautoLibrary":
+        # Importing the submodule binds its name on the package, so the class is bound over it.
+        from .PywinautoLibrary import PywinautoLibrary
+        globals()[name] = PywinautoLibrary
+        return PywinautoLibrary
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
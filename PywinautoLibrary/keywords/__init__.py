@@ -18,6 +18,20 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-from .application_keywords import ApplicationKeywords
-from .dialog_keywords import DialogKeywords
-from .control_keywords import ControlKeywords
+import importlib
+
+_KEYWORD_CLASSES = {
+    "ApplicationKeywords": ".application_keywords",
+    "DialogKeywords": ".dialog_keywords",
+    "ControlKeywords": ".control_keywords",
+}
+__all__ = list(_KEYWORD_CLASSES)
+
+
+def __getattr__(name):
+    """Import the keyword classes on first use, so the helper modules can be imported without pywinauto."""
+    if name not in _KEYWORD_CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_KEYWORD_CLASSES[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -18,15 +18,24 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import os
+
 from pywinauto import Application
+from pywinauto.application import ProcessNotFoundError, process_get_modules
+from pywinauto.findwindows import ElementAmbiguousError, ElementNotFoundError
 import pywinauto.timings
 
+from .hybrid import BackendRouter, HybridApplication
+from .window_snapshot import WindowSnapshot
+
 
 class ApplicationKeywords:
     """Keywords for interacting with Windows applications."""
 
-    def __init__(self):
+    def __init__(self, window_snapshot=None, backend_router=None):
         self.app = None
+        self.window_snapshot = window_snapshot if window_snapshot is not None else WindowSnapshot()
+        self.backend_router = backend_router if backend_router is not None else BackendRouter()
 
     def set_timeout(self, timeout_type, new_timeout_time):
         """Set timeout values for pywinauto."""
@@ -65,14 +74,91 @@ class ApplicationKeywords:
 
     def launch_application(self, app_path, backend="win32"):
         """Launch a Windows application."""
-        self.app = Application(backend).start(app_path)
+        self.app = self._application(backend).start(app_path)
+        return self.app
+
+    def connect_to_application(self, title_regex=None, backend="win32", pid=None, process=None, handle=None,
+                               path=None):
+        """Connect to a running application by exactly one of: a window title regex, a process ID,
+        a process name, a window handle or an executable path."""
+        selectors = {"title_regex": title_regex, "pid": pid, "process": process, "handle": handle, "path": path}
+        given = [name for name, value in selectors.items() if value is not None]
+        if len(given) != 1:
+            raise ValueError(f"Exactly one of {', '.join(selectors)} must be given.")
+        if pid is not None:
+            self.app = self._application(backend).connect(process=int(pid))
+        elif process is not None:
+            self.app = self._application(backend).connect(process=self._find_process(process))
+        elif handle is not None:
+            # Handles are usually written in hexadecimal, e.g. 0x000A04B2 as shown by Inspect or Spy++.
+            if isinstance(handle, str):
+                handle = int(handle, 16) if handle.lower().startswith("0x") else int(handle)
+            else:
+                handle = int(handle)
+            self.app = self._application(backend).connect(handle=handle)
+        elif path is not None:
+            self.app = self._application(backend).connect(path=path)
+        else:
+            matches = self.window_snapshot.find("win32" if backend == "auto" else backend, title_re=title_regex)
+            if not matches:
+                raise ElementNotFoundError({"title_re": title_regex})
+            if len(matches) > 1:
+                titles = ", ".join(repr(entry.title) for entry in matches)
+                raise ElementAmbiguousError(f"{len(matches)} windows match the title regex {title_regex!r}: {titles}.")
+            self.app = self._application(backend).connect(handle=matches[0].handle)
         return self.app
 
-    def connect_to_application(self, title_regex, backend="win32"):
-        """Connect to a running application using a window title regex."""
-        self.app = Application(backend).connect(title_re=title_regex)
+    def connect_or_launch(self, app_path, backend="win32"):
+        """Connect to a running instance of the executable at app_path, launching it if none is running.
+        app_path may contain arguments, which are only used for launching."""
+        try:
+            self.app = self._application(backend).connect(path=self._executable(app_path))
+        except ProcessNotFoundError:
+            self.app = self._application(backend).start(app_path)
         return self.app
 
+    def _application(self, backend):
+        """Create an application object for backend. "auto" connects both win32 and uia and routes each
+        control to the cheaper backend that can handle it."""
+        if backend == "auto":
+            return HybridApplication(self.backend_router)
+        return Application(backend)
+
+    def get_backend_statistics(self):
+        """Get the lookup counts and times per backend and the routes remembered with the auto backend."""
+        return self.backend_router.statistics()
+
+    @staticmethod
+    def _executable(command_line):
+        """Get the executable of a command line, which may be quoted and followed by arguments."""
+        command_line = command_line.strip()
+        if command_line.startswith('"'):
+            return command_line[1:].partition('"')[0]
+        # Like CreateProcess, try the parts before each space as the executable, shortest first,
+        # so unquoted paths containing spaces are found too.
+        parts = command_line.split(" ")
+        for end in range(1, len(parts) + 1):
+            candidate = " ".join(parts[:end])
+            if os.path.isfile(candidate) or os.path.isfile(candidate + ".exe"):
+                return candidate
+        return parts[0]
+
+    @staticmethod
+    def _find_process(name):
+        """Get the ID of the first running process whose executable file name matches name."""
+        name = name.lower()
+        for process_id, module_path, _ in process_get_modules():
+            if os.path.basename(module_path).lower() == name:
+                return process_id
+        raise ProcessNotFoundError(f"Could not find a running process named {name}.")
+
+    def set_window_snapshot_ttl(self, ttl):
+        """Set how long the shared list of top-level windows is reused before enumerating again."""
+        ttl = float(ttl)
+        if ttl < 0:
+            raise ValueError("ttl must not be negative.")
+        self.window_snapshot.ttl = ttl
+
     def close_application(self):
         """Close the current application."""
         if self.app:
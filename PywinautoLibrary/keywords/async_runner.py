@@ -0,0 +1,75 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _initialize_com():
+    """Initialize COM in a pool thread, as the uia backend needs it in every thread it is used from."""
+    import comtypes
+    comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+
+class AsyncRunner:
+    """Runs blocking keyword calls in a bounded thread pool so that they can be awaited concurrently.
+
+    Each call runs its waits within the poll scheduler's cancel_on, so cancelling the awaiting task,
+    e.g. by asyncio.wait_for timing out, ends its pollers at the next tick. Calls that don't poll
+    can't be interrupted and finish in the pool, their result discarded."""
+
+    def __init__(self, poll_scheduler, max_workers=4):
+        self.poll_scheduler = poll_scheduler
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        """Get the thread pool, creating it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="PywinautoLibrary async",
+                                                    initializer=_initialize_com)
+            return self._executor
+
+    async def run(self, function, *args, **kwargs):
+        """Call function in the thread pool and return its result."""
+        cancel = threading.Event()
+
+        def call():
+            with self.poll_scheduler.cancel_on(cancel):
+                return function(*args, **kwargs)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), call)
+        except asyncio.CancelledError:
+            cancel.set()
+            # Wake the poll driver so the cancelled waits end now rather than at their next poll.
+            self.poll_scheduler.wake()
+            raise
+
+    def close(self):
+        """Shut the thread pool down without waiting for running calls."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -18,30 +18,291 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import csv
+import ctypes
+import hashlib
+import itertools
+import json
+import re
+import time
+
+from pywinauto import handleprops, mouse, win32structures
 from pywinauto.keyboard import send_keys
+from pywinauto.remote_memory_block import RemoteMemoryBlock
+from pywinauto.sysinfo import is_x64_Python
+from pywinauto.timings import Timings
+
+from .image_compare import frame_array, frame_difference
+from .item_index import ItemIndex, ITEM_READERS
+from .menu_cache import MenuCache, clean_menu_text
+from .poll_scheduler import PollScheduler
+from .prefetch import PropertyPrefetcher, SUBTREE_CACHE_ROWS
+from .screenshot import ScreenshotPipeline
+from .template_match import TemplateMatcher
+from .tree_cache import TreeNodeCache, tree_node_text, tree_path_parts
+from .ui_snapshot import UISnapshot
+from .window_snapshot import compile_title_regex
+
+# List box messages used for selecting many items at once.
+LB_SETSEL = 0x0185
+LB_SETCURSEL = 0x0186
+LB_SELITEMRANGEEX = 0x0183
+LBN_SELCHANGE = 1
+
+# Messages used for scrolling items into view.
+LB_GETTOPINDEX = 0x018E
+LB_SETTOPINDEX = 0x0197
+LB_GETITEMHEIGHT = 0x01A1
+CB_GETTOPINDEX = 0x015B
+CB_SETTOPINDEX = 0x015C
+CB_SHOWDROPDOWN = 0x014F
+CB_GETITEMHEIGHT = 0x0154
+CB_GETDROPPEDSTATE = 0x0157
+LVM_GETTOPINDEX = 0x1027
+LVM_GETCOUNTPERPAGE = 0x1028
+LVM_GETITEMTEXTW = 0x1073
+# Maximum number of characters read from a list view cell.
+LISTVIEW_TEXT_LENGTH = 2000
+UIA_SCROLL_PATTERN_NO_SCROLL = -1
+# Maximum number of scroll positions tried when bisecting towards an item.
+SCROLL_BISECT_STEPS = 12
+
+# Line breaks of edit box text: CRLF in edit controls, CR in rich edit controls.
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+# Conditions of the states Wait For Control State can wait for.
+CONTROL_STATES = {
+    "exists": lambda wrapper: True,
+    "visible": lambda wrapper: wrapper.is_visible(),
+    "enabled": lambda wrapper: wrapper.is_enabled(),
+    "ready": lambda wrapper: wrapper.is_visible() and wrapper.is_enabled(),
+    "checked": lambda wrapper: wrapper.get_check_state() == 1,
+    "unchecked": lambda wrapper: wrapper.get_check_state() == 0,
+}
+
+
+def _is_truthy(value):
+    """Interpret a Robot Framework argument as a boolean."""
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "false", "no", "off", "0", "none")
+    return bool(value)
+
+
+def _item_key(item):
+    """Interpret an item argument as an index if it is made of digits, otherwise as a text."""
+    if isinstance(item, int):
+        return item
+    item = str(item)
+    return int(item) if item.isdigit() else item
+
+
+def _backend_name(wrapper):
+    """Get the name of the backend ("win32" or "uia") a wrapper was created with."""
+    backend = getattr(wrapper, "backend", None)
+    return getattr(backend, "name", "win32")
+
+
+def _split_lines(text):
+    """Yield the lines of a text one at a time."""
+    position = 0
+    for line_break in LINE_BREAK.finditer(text):
+        yield text[position:line_break.start()]
+        position = line_break.end()
+    yield text[position:]
+
+
+class _ObservedDialog:
+    """Dialog specification proxy passing each control resolved through it to the control hooks."""
+
+    def __init__(self, dialog, hooks):
+        self._dialog = dialog
+        self._hooks = hooks
+
+    def __getitem__(self, control_name):
+        return _ObservedSpecification(self._dialog[control_name], self._hooks)
+
+    def __getattr__(self, attribute):
+        return getattr(self._dialog, attribute)
+
+
+class _ObservedSpecification:
+    """Control specification proxy resolving the control once and passing it to the control hooks."""
+
+    def __init__(self, specification, hooks):
+        self._specification = specification
+        self._hooks = hooks
+        self._wrapper = None
+
+    def wrapper_object(self):
+        """Resolve the control and pass it to the control hooks."""
+        if self._wrapper is None:
+            self._wrapper = self._specification.wrapper_object()
+            for hook in self._hooks:
+                hook(self._wrapper)
+        return self._wrapper
+
+    def __getattr__(self, attribute):
+        specification = self._specification
+        if attribute in vars(specification) or hasattr(type(specification), attribute):
+            return getattr(specification, attribute)
+        return getattr(self.wrapper_object(), attribute)
+
+    def __getitem__(self, key):
+        return _ObservedSpecification(self._specification[key], self._hooks)
 
 
 class ControlKeywords:
     """Keywords for interacting with controls in dialogs."""
 
-    def __init__(self, dlg=None):
+    def __init__(self, dlg=None, menu_cache=None, poll_scheduler=None, screenshots=None, prefetcher=None,
+                 ui_snapshot=None):
+        self.lookup_hooks = []
+        self.control_hooks = []
         self.dlg = dlg
+        self.prefetcher = prefetcher if prefetcher is not None else PropertyPrefetcher()
+        self.ui_snapshot = ui_snapshot if ui_snapshot is not None else UISnapshot()
+        self.menu_cache = menu_cache if menu_cache is not None else MenuCache()
+        self.poll_scheduler = poll_scheduler if poll_scheduler is not None else PollScheduler()
+        self.screenshots = screenshots if screenshots is not None else ScreenshotPipeline()
+        self.template_matcher = TemplateMatcher()
+        self._item_indexes = {}
+        self._tree_caches = {}
+
+    @property
+    def dlg(self):
+        """The current dialog. Reading it runs the lookup hooks first, e.g. raising the failure of a
+        dialog watcher rule instead of waiting for a control the unexpected dialog is covering, or
+        following a dialog the application recreated with a new window handle.
+        If there are control hooks, each control resolved through the dialog is passed to them."""
+        for hook in self.lookup_hooks:
+            hook()
+        if self.control_hooks and self._dlg is not None:
+            return _ObservedDialog(self._dlg, self.control_hooks)
+        return self._dlg
+
+    @dlg.setter
+    def dlg(self, dlg):
+        self._dlg = dlg
 
     def set_dialog(self, dlg):
         """Set the dialog instance for the control keywords."""
         self.dlg = dlg
+        self.prefetcher.end()
+        self.ui_snapshot.invalidate()
+        self._item_indexes = {}
+        self._tree_caches = {}
+
+    def lookup_state(self):
+        """Get the current dialog and the control lookup state built for it."""
+        return self._dlg, self._item_indexes, self._tree_caches
+
+    def restore_lookup_state(self, state):
+        """Make a dialog current again along with the control lookup state returned by lookup_state."""
+        self.dlg, self._item_indexes, self._tree_caches = state
+        self.prefetcher.end()
+        self.ui_snapshot.invalidate()
+
+    def begin_property_prefetch(self, control=None):
+        """Fetch the properties of the current dialog, or of a specified control, and its descendants at once.
+
+        Returns the number of elements fetched."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        root = self.dlg.wrapper_object() if control is None else self.dlg[control].wrapper_object()
+        if _backend_name(root) != "uia":
+            raise RuntimeError("Property prefetching is only available with the uia backend.")
+        return self.prefetcher.begin(root)
+
+    def end_property_prefetch(self):
+        """Stop serving prefetched properties."""
+        self.prefetcher.end()
+
+    def _snapshot(self, control, kind, field, read):
+        """Read a value of a control, from the UI snapshot while one is active."""
+        return self.ui_snapshot.get(control, kind, field, lambda: self.dlg[control].wrapper_object(), read)
+
+    def _property(self, control, name, read):
+        """Read a property of a control, from the prefetched properties if a prefetch is active."""
+        if self.prefetcher.active:
+            return self.prefetcher.get(control, name, lambda: self.dlg[control].wrapper_object(), read)
+        return read()
+
+    def _item_index(self, kind, control):
+        """Get the item index of a control, creating an empty one on first use."""
+        item_index = self._item_indexes.get((kind, control))
+        if item_index is None:
+            item_index = self._item_indexes[(kind, control)] = ItemIndex(*ITEM_READERS[kind])
+        return item_index
+
+    def _find_item(self, kind, control, text, ignore_case=False, regex=False):
+        """Resolve a control once and look up the index of an item by its text.
+
+        The item index of each control is built on first use and reused for later lookups.
+        A miss or a changed item text forces one rebuild, so items added, replaced or reordered
+        since the index was built are still found."""
+        wrapper = self.dlg[control].wrapper_object()
+        index = self._item_index(kind, control).lookup(wrapper, text, _is_truthy(ignore_case), _is_truthy(regex))
+        if index is None:
+            raise ValueError(f"No item matching '{text}' found in {control}.")
+        return wrapper, index
 
     def get_control_text(self, control_name):
         """Retrieve the text of a specified control."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control_name].window_text()
+
+        def read():
+            return self._property(control_name, "text", lambda: self.dlg[control_name].wrapper_object().window_text())
+
+        return self._snapshot(control_name, "control", "text", read)
 
     def menu_select(self, menulocation):
         """Select a menu item by its location (e.g., 'File -> Save')."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg.menu_select(menulocation)
+        if _backend_name(self.dlg) == "uia":
+            self.dlg.menu_select(menulocation)
+            return
+        window = self.dlg.wrapper_object()
+        key = self.menu_cache.key(window, menulocation)
+        item_id = self.menu_cache.get(key)
+        if item_id is not None and self.menu_cache.is_enabled(window, item_id):
+            # Invoke the command directly instead of opening each submenu.
+            window.notify_menu_select(item_id)
+            return
+        self.menu_cache.invalidate(key)
+        window.verify_actionable()
+        item = window.menu_item(menulocation)
+        item.select()
+        if item.sub_menu() is None and item.item_id() > 0:
+            self.menu_cache.put(key, item.item_id())
+
+    def get_menu_structure(self):
+        """Get the menu bar items of the current dialog as nested dictionaries."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        if _backend_name(self.dlg) == "uia":
+            raise RuntimeError("Menu structure is only available with the win32 backend.")
+        window = self.dlg.wrapper_object()
+        menu = window.menu()
+        if menu is None:
+            raise RuntimeError("The current dialog has no menu.")
+        return self._menu_items(window, menu, ())
+
+    def _menu_items(self, window, menu, parts):
+        """Describe the items of a menu and its submenus, caching the command ID of each command item."""
+        items = []
+        for item in menu.items():
+            text = clean_menu_text(item.text())
+            sub_menu = item.sub_menu()
+            item_id = item.item_id()
+            entry = {"text": text, "id": item_id, "enabled": item.is_enabled(), "children": []}
+            if sub_menu is not None:
+                entry["children"] = self._menu_items(window, sub_menu, parts + (text,))
+            elif text and item_id > 0:
+                self.menu_cache.put(self.menu_cache.key(window, "->".join(parts + (text,))), item_id)
+            items.append(entry)
+        return items
 
     def type_text(self, control_name, text):
         """Type text into a specified control."""
@@ -106,6 +367,115 @@ class ControlKeywords:
 
         self.dlg[control_name].drag_mouse_input(dst=dst, src=src, button=button, pressed=pressed, absolute=absolute)
 
+    def capture_control_screenshot(self, control_name, path, scale=1.0, quality=90):
+        """Capture an image of a specified control and queue writing it to path."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        return self.screenshots.capture(self.dlg[control_name].wrapper_object(), path, scale, quality)
+
+    def wait_until_control_is_visually_stable(self, control_name, stable_time=0.5, tolerance=0.01,
+                                              timeout=None, max_side=64):
+        """Wait until the image of a specified control stops changing for stable_time seconds."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        stable_time = float(stable_time)
+        tolerance = float(tolerance)
+        max_side = int(max_side)
+        timeout = Timings.window_find_timeout if timeout is None else float(timeout)
+        control = self.dlg[control_name].wrapper_object()
+        capture = self.screenshots.capture_source
+        previous = frame_array(capture(control), max_side)
+        stable_since = time.monotonic()
+
+        def stable():
+            nonlocal previous, stable_since
+            frame = frame_array(capture(control), max_side)
+            now = time.monotonic()
+            if frame_difference(previous, frame) > tolerance:
+                stable_since = now
+            previous = frame
+            return now - stable_since >= stable_time
+
+        started = time.monotonic()
+        self.poll_scheduler.wait(stable, timeout, f"visually stable {control_name}")
+        return time.monotonic() - started
+
+    def wait_until_control_image_changes(self, control_name, tolerance=0.01, timeout=None, max_side=64):
+        """Wait until the image of a specified control differs from its image at the start of the wait."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        tolerance = float(tolerance)
+        max_side = int(max_side)
+        timeout = Timings.window_find_timeout if timeout is None else float(timeout)
+        control = self.dlg[control_name].wrapper_object()
+        capture = self.screenshots.capture_source
+        reference = frame_array(capture(control), max_side)
+
+        def changed():
+            difference = frame_difference(reference, frame_array(capture(control), max_side))
+            return difference if difference > tolerance else None
+
+        return self.poll_scheduler.wait(changed, timeout, f"image change {control_name}")
+
+    def find_image_in_control(self, control_name, template_path, confidence=0.9, scales=1.0):
+        """Find a template image in a specified control and get the screen coordinates of its center."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        confidence = float(confidence)
+        if isinstance(scales, str):
+            scales = scales.split(",")
+        elif not isinstance(scales, (list, tuple)):
+            scales = [scales]
+        scales = [float(scale) for scale in scales]
+        control = self.dlg[control_name].wrapper_object()
+        image = self.screenshots.capture_source(control)
+        score, position, size = self.template_matcher.find(image, template_path, confidence, scales)
+        assert position is not None and score >= confidence, \
+            f"{template_path} not found in {control_name}. Best match {score:.3f} is below {confidence}."
+        rect = control.rectangle()
+        return rect.left + position[0] + size[0] // 2, rect.top + position[1] + size[1] // 2
+
+    def click_image_in_control(self, control_name, template_path, confidence=0.9, scales=1.0, button="left",
+                               double=False):
+        """Click the center of a template image found in a specified control."""
+        coords = self.find_image_in_control(control_name, template_path, confidence, scales)
+        if _is_truthy(double):
+            mouse.double_click(button=button, coords=coords)
+        else:
+            mouse.click(button=button, coords=coords)
+        return coords
+
+    def control_exists(self, control_name, timeout=0):
+        """Check whether a specified control exists, waiting at most timeout seconds.
+
+        A control whose text or automation id equals control_name is found by enumerating the element infos
+        of the dialog, like count_controls. Only other names, e.g. "OKButton" or "Edit2", are looked up with
+        pywinauto's best match."""
+        dialog = self.dlg
+        if not dialog:
+            raise RuntimeError("No dialog is currently active.")
+        for element_info in dialog.wrapper_object().element_info.descendants():
+            if element_info.name == control_name or getattr(element_info, "automation_id", None) == control_name:
+                return True
+        return dialog[control_name].exists(timeout=float(timeout))
+
+    def count_controls(self, class_name=None, text_re=None, control_type=None):
+        """Count the controls of the current dialog matching all the given criteria."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        pattern = compile_title_regex(text_re) if text_re is not None else None
+        count = 0
+        # Only element infos are enumerated, the cheap properties are compared before the text.
+        for element_info in self.dlg.wrapper_object().element_info.descendants():
+            if class_name is not None and element_info.class_name != class_name:
+                continue
+            if control_type is not None and getattr(element_info, "control_type", None) != control_type:
+                continue
+            if pattern is not None and not pattern.match(element_info.name or ""):
+                continue
+            count += 1
+        return count
+
     def control_is_active(self, control_name):
         """Check if a control is active."""
         if not self.dlg:
@@ -136,6 +506,140 @@ class ControlKeywords:
             raise RuntimeError("No dialog is currently active.")
         self.dlg[control].scroll(direction, amount, count, retry_interval)
 
+    def scroll_to_item(self, control, item):
+        """Scroll a list box, list view, tree or combo box until an item is visible.
+
+        item is the text or, if it is made of digits, the index of the item; for trees it is the node path.
+        The control's native ensure-visible operation is used where there is one, otherwise the scroll
+        position is bisected towards the item. Either way the item is checked to be visible once at the end."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        wrapper = self.dlg[control].wrapper_object()
+        kind = wrapper.friendly_class_name()
+        if _backend_name(wrapper) == "uia":
+            visible = self._scroll_uia_item(control, wrapper, kind, str(item))
+        elif kind == "TreeView":
+            visible = self._scroll_tree_node(wrapper, self._get_tree_node(control, str(item)))
+        elif kind in ("ListBox", "ComboBox"):
+            index = self._item_position(kind.lower(), control, item)
+            self._check_item_index(control, index, wrapper.item_count())
+            scroll = self._scroll_listbox_item if kind == "ListBox" else self._scroll_combobox_item
+            visible = scroll(wrapper, index)
+        elif kind == "ListView":
+            visible = self._scroll_listview_item(wrapper, wrapper.get_item(_item_key(item)))
+        else:
+            raise RuntimeError(f"Scrolling to an item is not supported for {kind} controls.")
+        if not visible:
+            raise RuntimeError(f"Item {item} of {control} could not be scrolled into view.")
+
+    def _item_position(self, kind, control, item):
+        """Get the index of an item given by its index or its text."""
+        key = _item_key(item)
+        if isinstance(key, int):
+            return key
+        return self._find_item(kind, control, key)[1]
+
+    @staticmethod
+    def _check_item_index(control, index, count):
+        """Raise a ValueError if an item index given by the user is out of range."""
+        if not 0 <= index < count:
+            raise ValueError(f"Item index {index} is out of range for {control}, which has {count} items.")
+
+    @staticmethod
+    def _scroll_listbox_item(listbox, index):
+        """Scroll a list box by the least amount that shows the item, like ensure-visible would."""
+        top = listbox.send_message(LB_GETTOPINDEX)
+        rows = max(listbox.client_rect().height() // max(listbox.send_message(LB_GETITEMHEIGHT, index), 1), 1)
+        if index < top:
+            listbox.send_message(LB_SETTOPINDEX, index)
+        elif index >= top + rows:
+            listbox.send_message(LB_SETTOPINDEX, index - rows + 1)
+        top = listbox.send_message(LB_GETTOPINDEX)
+        return top <= index < top + rows
+
+    @staticmethod
+    def _scroll_combobox_item(combobox, index):
+        """Drop the list of a combo box down and scroll it by the least amount that shows the item."""
+        if not combobox.send_message(CB_GETDROPPEDSTATE):
+            combobox.send_message(CB_SHOWDROPDOWN, 1)
+        rows = max(combobox.dropped_rect().height() // max(combobox.send_message(CB_GETITEMHEIGHT, 0), 1), 1)
+        top = combobox.send_message(CB_GETTOPINDEX)
+        if index < top:
+            combobox.send_message(CB_SETTOPINDEX, index)
+        elif index >= top + rows:
+            combobox.send_message(CB_SETTOPINDEX, index - rows + 1)
+        top = combobox.send_message(CB_GETTOPINDEX)
+        return top <= index < top + rows
+
+    @staticmethod
+    def _scroll_listview_item(listview, list_item):
+        """Scroll a list view item into view with LVM_ENSUREVISIBLE."""
+        list_item.ensure_visible()
+        top = listview.send_message(LVM_GETTOPINDEX)
+        return top <= list_item.item_index < top + max(listview.send_message(LVM_GETCOUNTPERPAGE), 1)
+
+    @staticmethod
+    def _scroll_tree_node(tree, node):
+        """Scroll a tree node into view with TVM_ENSUREVISIBLE."""
+        node.ensure_visible()
+        try:
+            rect = node.client_rect()
+        except RuntimeError:
+            # The tree view doesn't report a rectangle for items that are not visible.
+            return False
+        return rect.top >= 0 and rect.bottom <= tree.client_rect().bottom
+
+    def _scroll_uia_item(self, control, container, kind, item):
+        """Scroll a UI Automation item into view with its ScrollItem pattern, or by bisecting the
+        scroll position of the container when the item doesn't support it."""
+        if kind == "TreeView" or container.element_info.control_type == "Tree":
+            target, index, count = self._get_tree_node(control, item), None, None
+        elif hasattr(container, "get_item"):
+            key = _item_key(item)
+            target = container.get_item(key)
+            index = key if isinstance(key, int) else None
+            count = container.item_count()
+        else:
+            # Combo boxes only expose their items while dropped down.
+            container.expand()
+            items = container.descendants(control_type="ListItem")
+            key = _item_key(item)
+            texts = [tree_node_text(element) for element in items]
+            if isinstance(key, int):
+                self._check_item_index(control, key, len(items))
+            elif key not in texts:
+                raise ValueError(f"No item matching '{key}' found in {control}.")
+            index = key if isinstance(key, int) else texts.index(key)
+            target, count = items[index], len(items)
+        try:
+            target.iface_scroll_item.ScrollIntoView()
+        except Exception:
+            self._bisect_scroll(container, target, index, count)
+        return target.is_visible()
+
+    @staticmethod
+    def _bisect_scroll(container, target, index=None, count=None):
+        """Bisect the vertical scroll position of container until target is inside its rectangle.
+
+        The first position tried is interpolated from the index and item count, when known."""
+        scroll = container.iface_scroll
+        low, high = 0.0, 100.0
+        percent = 100.0 * index / max(count - 1, 1) if index is not None and count else 50.0
+        for _ in range(SCROLL_BISECT_STEPS):
+            scroll.SetScrollPercent(UIA_SCROLL_PATTERN_NO_SCROLL, percent)
+            item_rect = target.rectangle()
+            view_rect = container.rectangle()
+            if not item_rect.height():
+                # Some providers report an empty rectangle for items out of view, which can't be bisected.
+                return
+            if item_rect.top < view_rect.top:
+                high = percent
+            elif item_rect.bottom > view_rect.bottom:
+                low = percent
+            else:
+                return
+            percent = (low + high) / 2
+
     def control_has_focus(self, control):
         """Check if the specified control has focus."""
         if not self.dlg:
@@ -149,7 +653,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 'CheckBox'
-        act = self.dlg[control].friendly_class_name()
+        act = self._snapshot(control, "control", "friendly_class_name", lambda: self.dlg[control].friendly_class_name())
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_button(self, control):
@@ -157,7 +661,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 'Button'
-        act = self.dlg[control].friendly_class_name()
+        act = self._snapshot(control, "control", "friendly_class_name", lambda: self.dlg[control].friendly_class_name())
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_radiobutton(self, control):
@@ -165,7 +669,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 'RadioButton'
-        act = self.dlg[control].friendly_class_name()
+        act = self._snapshot(control, "control", "friendly_class_name", lambda: self.dlg[control].friendly_class_name())
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_groupbox(self, control):
@@ -173,7 +677,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 'GroupBox'
-        act = self.dlg[control].friendly_class_name()
+        act = self._snapshot(control, "control", "friendly_class_name", lambda: self.dlg[control].friendly_class_name())
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_edit(self, control):
@@ -181,7 +685,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 'Edit'
-        act = self.dlg[control].friendly_class_name()
+        act = self._snapshot(control, "control", "friendly_class_name", lambda: self.dlg[control].friendly_class_name())
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_checked(self, control):
@@ -189,7 +693,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 1
-        act = self.dlg[control].get_check_state()
+        act = self._check_state(control)
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_unchecked(self, control):
@@ -197,7 +701,7 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 0
-        act = self.dlg[control].get_check_state()
+        act = self._check_state(control)
         assert act == exp, f"Expected {exp}. But got {act}."
 
     def control_is_indeterminate(self, control):
@@ -205,9 +709,17 @@ class ControlKeywords:
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         exp = 2
-        act = self.dlg[control].get_check_state()
+        act = self._check_state(control)
         assert act == exp, f"Expected {exp}. But got {act}."
 
+    def _check_state(self, control):
+        """Get the check state of a control: 0 unchecked, 1 checked or 2 indeterminate."""
+
+        def read():
+            return self._property(control, "toggle_state", lambda: self.dlg[control].wrapper_object().get_check_state())
+
+        return self._snapshot(control, "control", "check_state", read)
+
     def set_checkbox_to_checked(self, control):
         """Set the specified checkbox to checked."""
         if not self.dlg:
@@ -230,25 +742,25 @@ class ControlKeywords:
         """Get items of the specified combobox."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].item_texts()
+        return self._snapshot(control, "combobox", "items", lambda: self.dlg[control].item_texts())
 
     def get_combobox_item_count(self, control):
         """Get item count of the specified combobox."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].item_count()
+        return self._snapshot(control, "combobox", "item_count", lambda: self.dlg[control].item_count())
 
     def get_combobox_selected_index(self, control):
         """Get selected index of the specified combobox."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].selected_index()
+        return self._snapshot(control, "combobox", "selected_index", lambda: self.dlg[control].selected_index())
 
     def get_combobox_selected_value(self, control):
         """Get selected value of the specified combobox."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].texts()[0]
+        return self._snapshot(control, "combobox", "selected_value", lambda: self.dlg[control].texts()[0])
 
     def combobox_select_index(self, control, value):
         """Select item by index in the specified combobox."""
@@ -256,29 +768,97 @@ class ControlKeywords:
             raise RuntimeError("No dialog is currently active.")
         self.dlg[control].select(int(value))
 
-    def combobox_select_value(self, control, value):
+    def combobox_select_value(self, control, value, ignore_case=False, regex=False):
         """Select item by value in the specified combobox."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg[control].select(value)
+        combobox, index = self._find_item("combobox", control, value, ignore_case, regex)
+        combobox.select(index)
 
     def get_editbox_line_count(self, control):
         """Get line count of the specified edit box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].line_count()
+        return self._snapshot(control, "editbox", "line_count", lambda: self.dlg[control].line_count())
 
     def get_editbox_line_text(self, control, line_index):
         """Get line text of the specified edit box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].get_line(int(line_index))
+        line_index = int(line_index)
+        return self._snapshot(control, "editbox", ("line", line_index), lambda: self.dlg[control].get_line(line_index))
 
     def get_editbox_text(self, control):
         """Get text of the specified edit box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].text_block()
+        return self._snapshot(control, "editbox", "text", lambda: self.dlg[control].text_block())
+
+    def get_editbox_lines(self, control, start=0, end=None):
+        """Get the lines from start (inclusive) to end (exclusive) of the specified edit box."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        edit = self.dlg[control].wrapper_object()
+        return list(self._iter_editbox_lines(edit, start, end))
+
+    def export_editbox_text(self, control, path, chunk_size=1000, encoding="utf-8"):
+        """Write the text of the specified edit box to a file in chunks of lines.
+
+        Returns the number of lines written and the SHA-256 checksum of the file."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        edit = self.dlg[control].wrapper_object()
+        checksum = hashlib.sha256()
+        line_count = 0
+        chunk = []
+        with open(path, "wb") as output:
+            for line in self._iter_editbox_lines(edit):
+                chunk.append(line)
+                line_count += 1
+                if len(chunk) == chunk_size:
+                    self._write_chunk(output, checksum, chunk, encoding, line_count > chunk_size)
+                    chunk = []
+            if chunk:
+                self._write_chunk(output, checksum, chunk, encoding, line_count > len(chunk))
+        return line_count, checksum.hexdigest()
+
+    def search_editbox_text(self, control, pattern, max_matches=None):
+        """Get the indices of the lines in the specified edit box that match the regex pattern."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        regex = re.compile(pattern)
+        max_matches = int(max_matches) if max_matches is not None else None
+        edit = self.dlg[control].wrapper_object()
+        matches = []
+        for index, line in enumerate(self._iter_editbox_lines(edit)):
+            if regex.search(line):
+                matches.append(index)
+                if max_matches is not None and len(matches) >= max_matches:
+                    break
+        return matches
+
+    @staticmethod
+    def _iter_editbox_lines(edit, start=0, end=None):
+        """Get an iterator over the lines of an edit box from start to end, split from its text.
+
+        The text is read once (with WM_GETTEXT for win32) instead of sending EM_LINEINDEX,
+        EM_LINELENGTH and EM_GETLINE for every line."""
+        start = max(int(start), 0)
+        end = None if end is None else max(int(end), start)
+        return itertools.islice(_split_lines(edit.window_text()), start, end)
+
+    @staticmethod
+    def _write_chunk(output, checksum, chunk, encoding, needs_separator):
+        """Encode a chunk of lines, add it to the checksum and write it to the output file."""
+        data = "\n".join(chunk)
+        if needs_separator:
+            data = "\n" + data
+        data = data.encode(encoding)
+        checksum.update(data)
+        output.write(data)
 
     def set_editbox_text(self, control, textblock):
         """Set text of the specified edit box."""
@@ -290,31 +870,36 @@ class ControlKeywords:
         """Get items of the specified list box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].item_texts()
+        return self._snapshot(control, "listbox", "items", lambda: self.dlg[control].item_texts())
 
     def get_listbox_item_count(self, control):
         """Get item count of the specified list box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].item_count()
+        return self._snapshot(control, "listbox", "item_count", lambda: self.dlg[control].item_count())
 
     def get_listbox_selected_index(self, control):
         """Get selected index of the specified list box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].selected_indices()
+        return self._snapshot(control, "listbox", "selected_indices", lambda: self.dlg[control].selected_indices())
 
     def get_listbox_selected_value(self, control):
         """Get selected value of the specified list box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        texts = self.dlg[control].texts()
 
-        selected = []
-        for i in self.dlg[control].selected_indices():
-            # Select from the texts, the values of each selected item.
-            selected.append(texts[i+1])
-        return "|".join(selected)
+        def read():
+            listbox = self.dlg[control].wrapper_object()
+            item_index = self._item_index("listbox", control)
+
+            selected = []
+            for i in listbox.selected_indices():
+                # Read the text of each selected item only, rather than all items.
+                selected.append(item_index.item_text(listbox, i))
+            return "|".join(selected)
+
+        return self._snapshot(control, "listbox", "selected_value", read)
 
     def listbox_select_index(self, control, value):
         """Select item by index in the specified list box."""
@@ -322,53 +907,221 @@ class ControlKeywords:
             raise RuntimeError("No dialog is currently active.")
         self.dlg[control].select(int(value))
 
-    def listbox_select_value(self, control, value):
+    def listbox_select_value(self, control, value, ignore_case=False, regex=False):
         """Select item by value in the specified list box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg[control].select(value)
+        listbox, index = self._find_item("listbox", control, value, ignore_case, regex)
+        listbox.select(index)
 
     def listbox_deselect_all(self, control):
         """Deselect all items in the specified list box."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        for i in self.dlg[control].selected_indices():
-            item_rect = self.dlg[control].item_rect(i)
-            left = item_rect.left
-            top = item_rect.top
-            right = item_rect.right
-            bottom = item_rect.bottom
-            # Calculate the mid-point coordinates
-            mid_x = (left + right) // 2
-            mid_y = (top + bottom) // 2
-            self.dlg[control].click(coords=(mid_x, mid_y))
+        listbox = self.dlg[control].wrapper_object()
+        if _backend_name(listbox) == "uia":
+            for item in listbox.get_selection():
+                item.iface_selection_item.RemoveFromSelection()
+        else:
+            if listbox.is_single_selection():
+                listbox.send_message(LB_SETCURSEL, -1)
+            else:
+                # An index of -1 applies the selection state to every item in a single message.
+                listbox.send_message(LB_SETSEL, False, -1)
+            listbox.notify_parent(LBN_SELCHANGE)
+        selected = self._listbox_selected_indices(listbox)
+        assert not selected, f"Indices {selected} are still selected."
+
+    def listbox_select_indices(self, control, *indices):
+        """Add the items at the given indices to the selection of the specified list box."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        listbox = self.dlg[control].wrapper_object()
+        return self._listbox_select(listbox, [int(index) for index in indices])
+
+    def listbox_select_values(self, control, *values):
+        """Add the items with the given values to the selection of the specified list box."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        listbox = self.dlg[control].wrapper_object()
+        item_index = self._item_index("listbox", control)
+        indices = []
+        for value in values:
+            index = item_index.lookup(listbox, value)
+            if index is None:
+                raise ValueError(f"No item matching '{value}' found in {control}.")
+            indices.append(index)
+        return self._listbox_select(listbox, indices)
+
+    def listbox_select_range(self, control, first, last):
+        """Add the items from first to last (inclusive) to the selection of the specified list box."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        first = int(first)
+        last = int(last)
+        listbox = self.dlg[control].wrapper_object()
+        if _backend_name(listbox) == "uia" or listbox.is_single_selection():
+            return self._listbox_select(listbox, range(first, last + 1))
+        listbox.send_message(LB_SELITEMRANGEEX, first, last)
+        listbox.notify_parent(LBN_SELCHANGE)
+        return self._verify_listbox_selection(listbox, range(first, last + 1))
+
+    def _listbox_select(self, listbox, indices):
+        """Select the indices of a resolved list box in a single pass and verify the result."""
+        indices = list(indices)
+        if _backend_name(listbox) == "uia":
+            # get_item(index) walks the items on every call, so the items are listed once.
+            items = listbox.get_items()
+            for index in indices:
+                items[index].iface_selection_item.AddToSelection()
+        elif listbox.is_single_selection():
+            if len(indices) > 1:
+                raise ValueError("Only one item can be selected in a single selection list box.")
+            for index in indices:
+                listbox.send_message(LB_SETCURSEL, index)
+            listbox.notify_parent(LBN_SELCHANGE)
+        else:
+            for index in indices:
+                listbox.send_message(LB_SETSEL, True, index)
+            listbox.notify_parent(LBN_SELCHANGE)
+        return self._verify_listbox_selection(listbox, indices)
+
+    def _verify_listbox_selection(self, listbox, indices):
+        """Check that all indices are selected, reading the selection only once."""
+        selected = self._listbox_selected_indices(listbox)
+        missing = sorted(set(indices) - set(selected))
+        assert not missing, f"Indices {missing} are not selected."
+        return selected
+
+    def _listbox_selected_indices(self, listbox):
+        """Get the selected indices of a resolved list box. With uia, the selection state of every
+        item is read with one cache request."""
+        if _backend_name(listbox) == "uia":
+            states = self.prefetcher.provider.child_values(listbox, "is_selected")
+            return [index for index, selected in enumerate(states) if selected]
+        return list(listbox.selected_indices())
 
     def get_listview_column_count(self, control):
         """Get column count of the specified list view."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].column_count()
+        return self._snapshot(control, "listview", "column_count", lambda: self.dlg[control].column_count())
 
     def get_listview_item_count(self, control):
         """Get item count of the specified list view."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].item_count()
+        return self._snapshot(control, "listview", "item_count", lambda: self.dlg[control].item_count())
 
     def listview_header_text(self, control):
         """Get header text of the specified list view."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        texts = []
-        for i in self.dlg[control].columns():
-            texts.append(i["text"])
-        return texts
+
+        def read():
+            texts = []
+            for i in self.dlg[control].columns():
+                texts.append(i["text"])
+            return texts
+
+        return self._snapshot(control, "listview", "header_texts", read)
+
+    def get_listview_data(self, control, start=0, count=None, output=None, output_format="csv", encoding="utf-8"):
+        """Get the rows of the specified list view as dictionaries keyed by column header.
+
+        If output is given, the rows are streamed to that file instead and the number of rows written is returned."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        listview = self.dlg[control].wrapper_object()
+        headers = self._listview_column_names(listview)
+        return self._listview_data(listview, headers, start, count, output, output_format, encoding)
+
+    def _listview_data(self, listview, headers, start, count, output, output_format, encoding):
+        """Get the rows of a resolved list view, or stream them to output."""
+        rows = self._iter_listview_rows(listview, len(headers), start, count)
+        if output is None:
+            return [dict(zip(headers, row)) for row in rows]
+
+        output_format = output_format.lower()
+        if output_format not in ("csv", "jsonl"):
+            raise ValueError(f'{output_format} must be "csv" or "jsonl"')
+        row_count = 0
+        with open(output, "w", encoding=encoding, newline="") as stream:
+            if output_format == "csv":
+                writer = csv.writer(stream)
+                writer.writerow(headers)
+                for row in rows:
+                    writer.writerow(row)
+                    row_count += 1
+            else:
+                for row in rows:
+                    stream.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False) + "\n")
+                    row_count += 1
+        return row_count
+
+    @staticmethod
+    def _listview_column_names(listview):
+        """Get unique column names of a list view, falling back to 'Column N' for empty headers."""
+        names = []
+        for index, column in enumerate(listview.columns()):
+            # The win32 backend returns column dictionaries, uia returns header item wrappers.
+            name = column["text"] if isinstance(column, dict) else column.window_text()
+            if not name or name in names:
+                name = f"Column {index}"
+            names.append(name)
+        return names or ["Column 0"]
+
+    def _iter_listview_rows(self, listview, column_count, start=0, count=None):
+        """Yield the cell texts of list view rows one row at a time, reusing the resolved wrapper."""
+        item_count = listview.item_count()
+        start = max(int(start), 0)
+        end = item_count if count is None else min(start + int(count), item_count)
+        if _backend_name(listview) == "uia":
+            # get_item(row) walks the rows from the first one on every call, so the rows are walked once
+            # from cached elements instead. The whole subtree is cached with one request unless only a
+            # small part of the rows is read or the list is long, in which case just the requested rows'
+            # cells are cached one row at a time.
+            subtree = 2 * (end - start) >= item_count and item_count <= SUBTREE_CACHE_ROWS
+            rows = self.prefetcher.rows(listview, start, end, item_count, subtree)
+        else:
+            rows = self._iter_win32_listview_rows(listview, column_count, start, end)
+        for cells in rows:
+            cells += [""] * (column_count - len(cells))
+            yield cells[:column_count]
+
+    @staticmethod
+    def _iter_win32_listview_rows(listview, column_count, start, end):
+        """Yield the cell texts of win32 list view rows, read with LVM_GETITEMTEXTW through one block of
+        memory in the list view's process. LVM_GETITEMTEXTW is answered by the owner for virtual
+        (LVS_OWNERDATA) list views, so no scrolling is needed to read rows outside the viewport."""
+        # The item structure must match the bitness of the list view's process.
+        if handleprops.is64bitprocess(listview.process_id()) or not is_x64_Python():
+            item = win32structures.LVITEMW()
+        else:
+            item = win32structures.LVITEMW32()
+        text = ctypes.create_unicode_buffer(LISTVIEW_TEXT_LENGTH)
+        memory = RemoteMemoryBlock(listview, size=ctypes.sizeof(item) + ctypes.sizeof(text) + 16)
+        try:
+            item.cchTextMax = LISTVIEW_TEXT_LENGTH
+            item.pszText = memory.Address() + ctypes.sizeof(item) + 16
+            for row in range(start, end):
+                cells = []
+                for column in range(column_count):
+                    item.iSubItem = column
+                    memory.Write(item)
+                    length = listview.send_message(LVM_GETITEMTEXTW, row, memory)
+                    if length:
+                        memory.Read(text, item.pszText, ctypes.sizeof(ctypes.c_wchar) * length)
+                    cells.append(text[:length])
+                yield cells
+        finally:
+            memory.CleanUp()
 
     def listview_get_selected_count(self, control):
         """Get selected item count of the specified list view."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].get_selected_count()
+        return self._snapshot(control, "listview", "selected_count", lambda: self.dlg[control].get_selected_count())
 
     def listview_index_is_selected(self, control, index):
         """Check if the specified index is selected in the list view."""
@@ -422,49 +1175,116 @@ class ControlKeywords:
         """Get part count of the specified status bar."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].part_count()
+        return self._snapshot(control, "statusbar", "part_count", lambda: self.dlg[control].part_count())
 
     def get_statusbar_part_text(self, control, index):
         """Get part text of the specified status bar."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].get_part_text(int(index))
+        index = int(index)
+        return self._snapshot(control, "statusbar", ("part", index), lambda: self.dlg[control].get_part_text(index))
 
     def get_statusbar_text(self, control):
         """Get text of the specified status bar."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].texts()
+        return self._snapshot(control, "statusbar", "texts", lambda: self.dlg[control].texts())
+
+    def wait_for_statusbar_text(self, control, pattern, part=None, timeout=None):
+        """Wait until a part of the specified status bar matches the regex pattern.
+
+        Returns the matching text and the seconds it took to match."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        regex = re.compile(pattern)
+        part = int(part) if part is not None else None
+        timeout = Timings.window_find_timeout if timeout is None else float(timeout)
+        statusbar = None
+
+        def match():
+            nonlocal statusbar
+            if statusbar is None:
+                specification = self.dlg[control]
+                # Probe without waiting, a blocking lookup would hold up the other waits of the scheduler.
+                if not specification.exists(timeout=0):
+                    return None
+                # Resolved once and reused, unless reading fails because the control was recreated.
+                statusbar = specification.wrapper_object()
+            try:
+                texts = [statusbar.get_part_text(part)] if part is not None else statusbar.texts()
+            except Exception:
+                statusbar = None
+                raise
+            for text in texts:
+                if regex.search(text):
+                    return text
+            return None
+
+        started = time.monotonic()
+        text = self.poll_scheduler.wait(match, timeout, f"statusbar {control}")
+        return text, time.monotonic() - started
+
+    def wait_for_control_state(self, control, state, timeout=None):
+        """Wait until the specified control is in a state of CONTROL_STATES.
+
+        Returns the seconds it took to reach the state."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        check = CONTROL_STATES.get(str(state).lower())
+        if check is None:
+            raise ValueError(f"{state} must be one of {', '.join(CONTROL_STATES)}.")
+        timeout = Timings.window_find_timeout if timeout is None else float(timeout)
+        wrapper = None
+
+        def reached():
+            nonlocal wrapper
+            if wrapper is None:
+                specification = self.dlg[control]
+                if not specification.exists(timeout=0):
+                    return False
+                # Resolved once and reused, unless reading fails because the control was recreated.
+                wrapper = specification.wrapper_object()
+            try:
+                return check(wrapper)
+            except Exception:
+                wrapper = None
+                raise
+
+        started = time.monotonic()
+        self.poll_scheduler.wait(reached, timeout, f"{state} {control}")
+        return time.monotonic() - started
 
     def get_tab_count(self, control):
         """Get tab count of the specified tab control."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].tab_count()
+        return self._snapshot(control, "tab", "tab_count", lambda: self.dlg[control].tab_count())
 
     def get_selected_tab_index(self, control):
         """Get selected tab index of the specified tab control."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].get_selected_tab()
+        return self._snapshot(control, "tab", "selected_tab", lambda: self.dlg[control].get_selected_tab())
 
     def get_tab_text(self, control, index):
         """Retrieve the text of a specified tab."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].get_tab_text(int(index))
+        index = int(index)
+        return self._snapshot(control, "tab", ("tab", index), lambda: self.dlg[control].get_tab_text(index))
 
     def get_all_tab_texts(self, control):
         """Retrieve the texts of all tabs."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].texts()
+        return self._snapshot(control, "tab", "texts", lambda: self.dlg[control].texts())
 
-    def select_tab_by_text(self, control, text):
+    def select_tab_by_text(self, control, text, ignore_case=False, regex=False):
         """Select a tab by its text."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg[control].select(text)
+        tab, index = self._find_item("tab", control, text, ignore_case, regex)
+        tab.select(index)
 
     def select_tab_by_index(self, control, index):
         """Select a tab by its index."""
@@ -476,51 +1296,139 @@ class ControlKeywords:
         """Retrieve the number of buttons in a toolbar."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].button_count()
+        return self._snapshot(control, "toolbar", "button_count", lambda: self.dlg[control].button_count())
 
     def get_toolbar_button_text(self, control, index):
         """Retrieve the text of a specified toolbar button."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].get_button(int(index)).text
+        index = int(index)
+        return self._snapshot(control, "toolbar", ("button", index), lambda: self.dlg[control].get_button(index).text)
 
-    def click_toolbar_button(self, control, text):
+    def click_toolbar_button(self, control, text, ignore_case=False, regex=False):
         """Click a toolbar button by its text."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg[control].press_button(text)
+        toolbar, index = self._find_item("toolbar", control, text, ignore_case, regex)
+        toolbar.press_button(index)
 
     def get_tree_text(self, control):
         """Retrieve the text of a tree control."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg[control].texts()
+        return self._snapshot(control, "tree", "texts", lambda: self.dlg[control].texts())
 
     def click_tree_element(self, control, path):
         """Click a tree element by its path."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        path = '\\' + path.replace('->', '\\')
-        print(path)
-        self.dlg[control].get_item(path).click()
+        self._get_tree_node(control, path).click()
 
     def right_click_tree_element(self, control, path):
         """Right-click a tree element by its path."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        path = '\\' + path.replace('->', '\\')
-        self.dlg[control].get_item(path).click(button='right')
+        self._get_tree_node(control, path).click(button='right')
 
     def double_click_tree_element(self, control, path):
         """Double-click a tree element by its path."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        path = '\\' + path.replace('->', '\\')
-
-        self.dlg[control].get_item(path).click(double=True)
+        self._get_tree_node(control, path).click(double=True)
 
     def expand_tree_element(self, control, path):
         """Expand a tree element by its path."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg[control].get_item(path).expand()
+        self._get_tree_node(control, path).expand()
+
+    def collapse_tree_element(self, control, path):
+        """Collapse a tree element by its path."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        node = self._get_tree_node(control, path)
+        node.collapse()
+        # Applications may delete or recreate the children of collapsed nodes.
+        parts = tree_path_parts(path)
+        cache = self._tree_caches[control]
+        cache.invalidate(parts)
+        cache.put(parts, node)
+
+    def get_tree_structure(self, control, depth=None, output=None, expand=True, encoding="utf-8"):
+        """Get the nodes of the specified tree as nested dictionaries.
+
+        If output is given, one JSON object per node is streamed to that file instead
+        and the number of nodes written is returned."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        tree = self.dlg[control]
+        cache = self._get_tree_cache(control, tree)
+        depth = int(depth) if depth is not None else None
+        expand = _is_truthy(expand)
+        if output is None:
+            return [self._tree_node_dict(cache, parts, node, depth, expand)
+                    for parts, node in self._tree_roots(cache, tree)]
+
+        node_count = 0
+        with open(output, "w", encoding=encoding) as stream:
+            for parts, node in self._walk_tree(cache, tree, depth, expand):
+                stream.write(json.dumps({"path": "->".join(parts), "depth": len(parts), "text": parts[-1]},
+                                        ensure_ascii=False) + "\n")
+                node_count += 1
+        return node_count
+
+    def _get_tree_cache(self, control, tree):
+        """Get the node cache of a tree control, starting a new one if the control was recreated."""
+        handle = getattr(tree, "handle", None)
+        cache = self._tree_caches.get(control)
+        if cache is None or cache.handle != handle:
+            cache = self._tree_caches[control] = TreeNodeCache(handle)
+        return cache
+
+    def _get_tree_node(self, control, path):
+        """Resolve a tree node by its path, reusing previously resolved nodes of the tree."""
+        tree = self.dlg[control]
+        return self._get_tree_cache(control, tree).resolve(tree, tree_path_parts(path))
+
+    @staticmethod
+    def _tree_roots(cache, tree):
+        """Get the paths and nodes of the tree roots, caching each of them."""
+        roots = []
+        for node in tree.roots():
+            parts = (tree_node_text(node),)
+            cache.put(parts, node)
+            roots.append((parts, node))
+        return roots
+
+    @staticmethod
+    def _tree_children(cache, parts, node, expand):
+        """Get the paths and nodes of the children of a tree node, caching each of them.
+
+        The node is only expanded if its children are not loaded yet."""
+        children = node.children()
+        if not children and expand:
+            node.expand()
+            children = node.children()
+        paths = []
+        for child in children:
+            child_parts = parts + (tree_node_text(child),)
+            cache.put(child_parts, child)
+            paths.append((child_parts, child))
+        return paths
+
+    def _tree_node_dict(self, cache, parts, node, depth, expand):
+        """Build the nested dictionary of a tree node down to the given depth."""
+        children = []
+        if depth is None or len(parts) < depth:
+            children = [self._tree_node_dict(cache, child_parts, child, depth, expand)
+                        for child_parts, child in self._tree_children(cache, parts, node, expand)]
+        return {"text": parts[-1], "children": children}
+
+    def _walk_tree(self, cache, tree, depth, expand):
+        """Yield the path and node of every tree node depth first, without building the whole tree."""
+        stack = list(reversed(self._tree_roots(cache, tree)))
+        while stack:
+            parts, node = stack.pop()
+            yield parts, node
+            if depth is None or len(parts) < depth:
+                stack.extend(reversed(self._tree_children(cache, parts, node, expand)))
@@ -0,0 +1,161 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import json
+
+from pywinauto import findbestmatch
+
+FIELDS = ("class_name", "text", "auto_id", "control_id", "rect", "identifiers")
+
+
+def _rect_tuple(rect):
+    return rect.left, rect.top, rect.right, rect.bottom
+
+
+class ControlNode:
+    """Compact description of a control in a control tree."""
+
+    __slots__ = FIELDS + ("children",)
+
+    def __init__(self, class_name, text, auto_id, control_id, rect, identifiers=(), children=()):
+        self.class_name = class_name
+        self.text = text
+        self.auto_id = auto_id
+        self.control_id = control_id
+        self.rect = rect
+        self.identifiers = tuple(identifiers)
+        self.children = list(children)
+
+    @classmethod
+    def from_element_info(cls, element_info, identifiers=()):
+        """Describe a control from its lightweight element info, without building a wrapper."""
+        return cls(element_info.class_name, element_info.name or "", getattr(element_info, "automation_id", "") or "",
+                   getattr(element_info, "control_id", None), _rect_tuple(element_info.rectangle), identifiers)
+
+    def to_dict(self):
+        """Convert the node and its children to nested dictionaries."""
+        node = {field: getattr(self, field) for field in FIELDS}
+        node["rect"] = list(self.rect)
+        node["identifiers"] = list(self.identifiers)
+        node["children"] = [child.to_dict() for child in self.children]
+        return node
+
+    @classmethod
+    def from_dict(cls, node):
+        """Create a node and its children from nested dictionaries."""
+        return cls(node["class_name"], node["text"], node["auto_id"], node["control_id"], tuple(node["rect"]),
+                   node["identifiers"], [cls.from_dict(child) for child in node["children"]])
+
+
+def element_key(element_info):
+    """Get a hashable identity of an element info, which pywinauto's element infos are not:
+    the runtime ID for uia and the window handle for win32."""
+    runtime_id = getattr(element_info, "runtime_id", None)
+    if runtime_id:
+        return tuple(runtime_id)
+    return element_info.handle
+
+
+def control_identifiers(wrapper):
+    """Get the names each control of a dialog can be looked up with, keyed by element_key."""
+    controls = [wrapper] + wrapper.descendants()
+    names = {}
+    for name, control in findbestmatch.build_unique_dict(controls).items():
+        names.setdefault(element_key(control.element_info), []).append(name)
+    return names
+
+
+def build_control_tree(element_info, depth=None, identifiers=None):
+    """Build the control tree below an element info down to depth levels (None for all levels)."""
+    names = identifiers.get(element_key(element_info), ()) if identifiers else ()
+    node = ControlNode.from_element_info(element_info, sorted(names))
+    if depth is None or depth > 0:
+        node.children = [build_control_tree(child, None if depth is None else depth - 1, identifiers)
+                         for child in element_info.children()]
+    return node
+
+
+def structure_fingerprint(element_info):
+    """Get a fingerprint of the controls below an element info from the fields a control tree records
+    without building wrappers: handles, class names, texts and rectangles."""
+    return hash(tuple((child.handle, child.class_name, child.name or "", _rect_tuple(child.rectangle))
+                      for child in [element_info] + element_info.descendants()))
+
+
+def _node_key(node):
+    """Get the key of a node among its siblings: its class name and its automation id, control id or text."""
+    own = node.auto_id or (str(node.control_id) if node.control_id else "") or node.text
+    return f"{node.class_name}[{own}]"
+
+
+def flatten_control_tree(root):
+    """Map the stable identity of each node to the node, in depth first order.
+
+    The identity is the path of node keys from the root, numbered among siblings with the same key,
+    so inserting or reordering unrelated siblings does not change it."""
+    nodes = {}
+    # The root is keyed by its class only, as dialog titles often contain variable parts.
+    stack = [(root.class_name, root)]
+    while stack:
+        key, node = stack.pop()
+        nodes[key] = node
+        seen = {}
+        children = []
+        for child in node.children:
+            base = _node_key(child)
+            occurrence = seen.get(base, 0)
+            seen[base] = occurrence + 1
+            children.append((f"{key}/{base}" + (f"#{occurrence}" if occurrence else ""), child))
+        stack.extend(reversed(children))
+    return nodes
+
+
+def compare_control_trees(old, new, fields=("class_name", "text", "auto_id", "control_id", "identifiers")):
+    """Diff two control trees by stable identity. Returns the added, removed and changed controls."""
+    old_nodes = flatten_control_tree(old)
+    new_nodes = flatten_control_tree(new)
+    changed = []
+    for key in old_nodes.keys() & new_nodes.keys():
+        for field in fields:
+            old_value = getattr(old_nodes[key], field)
+            new_value = getattr(new_nodes[key], field)
+            if old_value != new_value:
+                changed.append({"control": key, "field": field, "old": old_value, "new": new_value})
+    return {"added": sorted(new_nodes.keys() - old_nodes.keys()),
+            "removed": sorted(old_nodes.keys() - new_nodes.keys()),
+            "changed": sorted(changed, key=lambda change: (change["control"], change["field"]))}
+
+
+def write_control_tree(node, path, output_format="json", encoding="utf-8"):
+    """Write a control tree as one JSON document or as one JSON object per control (jsonl)."""
+    with open(path, "w", encoding=encoding) as stream:
+        if output_format == "json":
+            json.dump(node.to_dict(), stream, ensure_ascii=False)
+            return
+        for key, control in flatten_control_tree(node).items():
+            record = {field: getattr(control, field) for field in FIELDS}
+            record["key"] = key
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_control_tree(path, encoding="utf-8"):
+    """Read a control tree written in the json format."""
+    with open(path, encoding=encoding) as stream:
+        return ControlNode.from_dict(json.load(stream))
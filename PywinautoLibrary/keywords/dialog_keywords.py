@@ -18,84 +18,309 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+from pywinauto import handleprops
+from pywinauto.findwindows import ElementNotFoundError
+from pywinauto.timings import Timings, TimeoutError
+
+from .control_tree import (build_control_tree, compare_control_trees, control_identifiers, read_control_tree,
+                           structure_fingerprint, write_control_tree)
+from .menu_cache import MenuCache
+from .poll_scheduler import PollScheduler
+from .screenshot import ScreenshotPipeline
+from .window_snapshot import WindowSnapshot
+
+
 class DialogKeywords:
     """Keywords for interacting with dialogs in Windows applications."""
 
-    def __init__(self, app=None):
+    def __init__(self, app=None, menu_cache=None, window_snapshot=None, poll_scheduler=None, screenshots=None):
         self.app = app
         self.dlg = None
+        self.on_dialog_change = None
+        self.dialog_reuses = 0
+        self.dialog_re_resolutions = 0
+        self._dialog_wrapper = None
+        self._dialog_criteria = None
+        self._dialog_stack = []
+        self.screenshots = screenshots if screenshots is not None else ScreenshotPipeline()
+        self._control_trees = {}
+        self.menu_cache = menu_cache if menu_cache is not None else MenuCache()
+        self.window_snapshot = window_snapshot if window_snapshot is not None else WindowSnapshot()
+        if poll_scheduler is None:
+            poll_scheduler = PollScheduler(snapshot_hooks=[self.window_snapshot.invalidate])
+        self.poll_scheduler = poll_scheduler
 
     def get_dialog_from_regex(self, title_re):
         """Get the dialog matching the regex from the application."""
         if not self.app:
             raise RuntimeError("No application is currently connected.")
-        self.dlg = self.app.window(title_re=title_re)
+        self._activate(self._find_dialog(title_re=title_re), {"title_re": title_re})
 
     def get_dialog(self, title):
         """Get the dialog by its exact title."""
         if not self.app:
             raise RuntimeError("No application is currently connected.")
-        self.dlg = self.app.window(title=title)
+        self._activate(self._find_dialog(title=title), {"title": title})
+
+    def wait_for_any_dialog(self, *title_res, timeout=None):
+        """Wait for a dialog matching any of the regexes and get it. Returns the regex that matched."""
+        if not self.app:
+            raise RuntimeError("No application is currently connected.")
+        if not title_res:
+            raise ValueError("At least one title regex is required.")
+        criteria = [{"title_re": title_re} for title_re in title_res]
+        index, dlg = self._find_any_dialog(criteria, timeout)
+        self._activate(dlg, criteria[index])
+        return title_res[index]
+
+    def push_dialog(self, title, control_state=None):
+        """Keep the current dialog, along with the control lookup state given, and get the dialog by its title."""
+        if not self.app:
+            raise RuntimeError("No application is currently connected.")
+        dlg = self._find_dialog(title=title)
+        self._dialog_stack.append((self.dlg, self._dialog_wrapper, self._dialog_criteria, control_state))
+        self._activate(dlg, {"title": title})
+
+    def pop_dialog(self):
+        """Make the dialog kept by the last push_dialog current again.
+
+        The kept wrapper is reused if its window still exists, which costs two window queries and no
+        enumeration. Returns the control lookup state pushed with it, or None if the dialog was destroyed
+        and had to be looked up again, in which case that state no longer applies."""
+        if not self._dialog_stack:
+            raise RuntimeError("No dialog has been pushed.")
+        self.dlg, self._dialog_wrapper, self._dialog_criteria, control_state = self._dialog_stack.pop()
+        if self._dialog_wrapper is None or self._is_alive(self._dialog_wrapper):
+            return control_state
+        self._dialog_wrapper = None
+        if self._dialog_criteria is not None:
+            self.dialog_re_resolutions += 1
+            self._activate(self._find_any_dialog([self._dialog_criteria])[1], self._dialog_criteria)
+        return None
+
+    def _activate(self, dlg, criteria):
+        """Make a dialog the current one, resolving it to a wrapper once."""
+        self.dlg = dlg
+        self._dialog_criteria = criteria
+        self._dialog_wrapper = dlg.wrapper_object()
+
+    def _dialog(self):
+        """Get the wrapper of the current dialog.
+
+        The wrapper resolved at activation is reused while its window handle is still a window of the
+        application. If the window was destroyed or recreated, the dialog is looked up again by the
+        criteria it was activated with, and on_dialog_change is called with the new dialog."""
+        wrapper = self._dialog_wrapper
+        if wrapper is not None and self._is_alive(wrapper):
+            self.dialog_reuses += 1
+            return wrapper
+        if self._dialog_criteria is None:
+            # The dialog was not activated by this library, resolve it as pywinauto would.
+            return self.dlg.wrapper_object()
+        self._re_resolve(self._find_any_dialog([self._dialog_criteria])[1])
+        return self._dialog_wrapper
+
+    def refresh_dialog(self):
+        """Follow the current dialog, without waiting, if its window was destroyed and recreated.
+
+        The dialog is specified by its window handle, and so are the controls looked up in it, so this
+        runs before control lookups: if the window is gone and another window matches the criteria the
+        dialog was activated with, that one becomes current and on_dialog_change is called. Checking a
+        live window costs two window queries. Without a matching window the dialog is kept as it is.
+
+        The windows are matched directly instead of through the poll scheduler, as control lookups
+        also run within the conditions the scheduler is evaluating."""
+        wrapper = self._dialog_wrapper
+        if wrapper is None or self._dialog_criteria is None or self._is_alive(wrapper):
+            return
+        matches = [entry for entry in self.window_snapshot.find(self.app.backend.name, process=self.app.process,
+                                                                refresh=True, **self._dialog_criteria)
+                   if entry.handle != wrapper.handle]
+        if matches:
+            self._re_resolve(self.app.window(handle=matches[0].handle))
+
+    def _re_resolve(self, dlg):
+        """Make the window found again for the current criteria the current dialog."""
+        self.dialog_re_resolutions += 1
+        self._activate(dlg, self._dialog_criteria)
+        if self.on_dialog_change is not None:
+            self.on_dialog_change(self.dlg)
+
+    def _is_alive(self, wrapper):
+        """Check whether the window of a wrapper still exists and belongs to the application."""
+        handle = wrapper.handle
+        return handleprops.iswindow(handle) and handleprops.processid(handle) == self.app.process
+
+    def _find_dialog(self, title=None, title_re=None):
+        """Wait for a top-level window of the application matching the title criteria."""
+        criteria = {"title": title} if title is not None else {"title_re": title_re}
+        return self._find_any_dialog([criteria])[1]
+
+    def _find_any_dialog(self, criteria, timeout=None):
+        """Wait for a top-level window of the application matching any of the criteria.
+
+        The wait runs on the shared poll scheduler, which enumerates the top-level windows once
+        per tick, and all criteria are evaluated against that snapshot. The dialog is then specified
+        by its handle, so later lookups don't enumerate windows. Returns the index of the matching
+        criteria and the dialog."""
+        backend = self.app.backend.name
+        timeout = Timings.window_find_timeout if timeout is None else float(timeout)
+
+        def find():
+            for index, criterion in enumerate(criteria):
+                matches = self.window_snapshot.find(backend, process=self.app.process, **criterion)
+                if matches:
+                    return index, matches[0].handle
+            return None
+
+        try:
+            index, handle = self.poll_scheduler.wait(find, timeout, "dialog")
+        except TimeoutError:
+            raise ElementNotFoundError(criteria[0] if len(criteria) == 1 else {"any_of": criteria}) from None
+        return index, self.app.window(handle=handle)
+
+    def active_handle(self):
+        """Get the window handle of the current dialog, or None if no dialog is active."""
+        if self._dialog_wrapper is None:
+            return None
+        return self._dialog_wrapper.handle
+
+    def active_criteria(self):
+        """Get the criteria the current dialog was activated with, or None."""
+        return self._dialog_criteria
 
     def disconnect_from_dialog(self):
         """Disconnect from the current dialog."""
         self.dlg = None
+        self._dialog_wrapper = None
+        self._dialog_criteria = None
 
     def get_number_of_children(self):
         """Get the number of child elements in the current dialog."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return len(self.dlg.children())
+        # Element infos are counted instead of building a wrapper for every child.
+        return len(self._dialog().element_info.children())
 
     def outline_dialog(self):
         """Outline the current dialog."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg.draw_outline()
+        self._dialog().draw_outline()
 
     def maximize_window(self):
         """Maximize the current dialog window."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg.maximize()
+        self._dialog().maximize()
 
     def minimize_window(self):
         """Minimize the current dialog window."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg.minimize()
+        self._dialog().minimize()
 
     def close_window(self):
         """Close the current dialog window."""
         if self.dlg:
-            self.dlg.close()
-        self.dlg = None
+            self._dialog().close()
+        self.disconnect_from_dialog()
 
     def restore_window(self):
         """Restore the current dialog window."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg.restore()
+        self._dialog().restore()
 
     def get_window_text(self):
         """Get the text of the current dialog window."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        return self.dlg.window_text()
+        return self._dialog().window_text()
 
     def set_window_focus(self):
         """Set focus to the current dialog window."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.dlg.set_focus()
+        self._dialog().set_focus()
+
+    def capture_dialog_screenshot(self, path, scale=1.0, quality=90):
+        """Capture an image of the current dialog and queue writing it to path."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        return self.screenshots.capture(self._dialog(), path, scale, quality)
 
     def print_control_identifiers(self):
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
         return self.dlg.print_control_identifiers()
 
+    def export_control_tree(self, path, output_format="json", depth=None, identifiers=True, encoding="utf-8"):
+        """Write the control tree of the current dialog to a file. Returns the number of controls written."""
+        if not self.dlg:
+            raise RuntimeError("No dialog is currently active.")
+        output_format = output_format.lower()
+        if output_format not in ("json", "jsonl"):
+            raise ValueError(f'{output_format} must be "json" or "jsonl"')
+        depth = int(depth) if depth is not None else None
+        identifiers = str(identifiers).lower() not in ("false", "no", "off", "0", "none", "")
+        tree = self.get_control_tree(depth, identifiers)
+        write_control_tree(tree, path, output_format, encoding)
+        return self._count_controls(tree)
+
+    def get_control_tree(self, depth=None, identifiers=True):
+        """Get the control tree of the current dialog, reusing the last one while no control of the dialog
+        was added, removed, renamed, moved or resized."""
+        wrapper = self._dialog()
+        element_info = wrapper.element_info
+        fingerprint = structure_fingerprint(element_info)
+        key = (element_info.handle, depth, identifiers)
+        cached = self._control_trees.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        names = control_identifiers(wrapper) if identifiers else None
+        tree = build_control_tree(element_info, depth, names)
+        self._control_trees[key] = (fingerprint, tree)
+        return tree
+
+    @staticmethod
+    def compare_control_trees(old_path, new_path, encoding="utf-8"):
+        """Compare two control trees written in the json format."""
+        return compare_control_trees(read_control_tree(old_path, encoding), read_control_tree(new_path, encoding))
+
+    @staticmethod
+    def _count_controls(node):
+        """Count the controls of a control tree."""
+        count = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        return count
+
     def popup_menu_select(self, menulocation):
         """Select a menu item from a popup menu by its location."""
         if not self.dlg:
             raise RuntimeError("No dialog is currently active.")
-        self.app.PopupMenu.menu_select(menulocation)
+        popup = self.app.PopupMenu.wrapper_object()
+        if popup.backend.name == "uia":
+            popup.menu_select(menulocation)
+            return
+        key = self.menu_cache.key(self._dialog(), menulocation, popup=True)
+        cached = self.menu_cache.get(key)
+        if cached is not None:
+            index_path, texts = cached
+            try:
+                items = popup.menu().get_menu_path(index_path)
+            except (IndexError, RuntimeError):
+                items = None
+            # Context menus may change with the selection, so only trust the path if its texts are unchanged.
+            if items is not None and tuple(item.text() for item in items) == texts:
+                items[-1].select()
+                return
+            self.menu_cache.invalidate(key)
+        items = popup.menu().get_menu_path(menulocation)
+        texts = tuple(item.text() for item in items)
+        items[-1].select()
+        self.menu_cache.put(key, ("->".join(f"#{item.index}" for item in items), texts))
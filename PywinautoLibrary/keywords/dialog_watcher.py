@@ -0,0 +1,220 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import collections
+import threading
+import time
+
+from .window_snapshot import compile_title_regex
+
+ACTIONS = ("close", "fail", "click", "keys")
+
+
+class UnexpectedDialogError(RuntimeError):
+    """Raised when the watcher saw a dialog matching a rule with the fail action."""
+
+
+class DialogRule:
+    """Criteria of an unexpected dialog and the action taken when it appears.
+
+    The action is "close", "fail", "click:<control>" to click a control of the dialog,
+    or "keys:<keys>" to type keys into it."""
+
+    def __init__(self, name, title_re=None, class_name=None, text_re=None, action="close"):
+        kind, _, argument = action.partition(":")
+        if kind not in ACTIONS or (kind in ("click", "keys")) != bool(argument):
+            raise ValueError(f'{action} must be "close", "fail", "click:<control>" or "keys:<keys>"')
+        self.name = name
+        self.title_re = compile_title_regex(title_re) if title_re else None
+        self.class_name = class_name
+        self.text_re = compile_title_regex(text_re) if text_re else None
+        self.action = kind
+        self.argument = argument
+
+    def matches(self, entry, texts):
+        """Check whether a window entry matches the rule. texts is called only if the rule needs them."""
+        if self.class_name is not None and entry.element_info.class_name != self.class_name:
+            return False
+        if self.title_re is not None and not self.title_re.match(entry.title):
+            return False
+        if self.text_re is not None and not any(self.text_re.search(text) for text in texts()):
+            return False
+        return True
+
+
+class DialogWatcher:
+    """Background thread that handles unexpected top-level windows of the application.
+
+    Each scan diffs the application's top-level windows against the previous scan, so only
+    windows that appeared since then are matched against the rules. The active dialog of the
+    main thread is never acted upon. If the scans take more than budget (a fraction of the
+    time between scans), the interval is stretched to stay within it."""
+
+    def __init__(self, window_snapshot, interval=0.5, budget=0.02):
+        self.window_snapshot = window_snapshot
+        self.interval = float(interval)
+        self.budget = float(budget)
+        self.rules = {}
+        self.events = collections.deque(maxlen=100)
+        self.scans = 0
+        self.scan_time = 0.0
+        self._app = None
+        self._active_handle = None
+        self._known = None
+        self._failure = None
+        self._failure_raised = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_rule(self, rule):
+        """Register a rule, replacing any rule with the same name."""
+        with self._lock:
+            self.rules[rule.name] = rule
+
+    def remove_rule(self, name):
+        """Remove a rule by its name."""
+        with self._lock:
+            self.rules.pop(name, None)
+
+    def start(self, app, active_handle, interval=None):
+        """Start watching the top-level windows of app. active_handle returns the main thread's dialog handle."""
+        self.stop()
+        if interval is not None:
+            self.interval = float(interval)
+        self._app = app
+        self._active_handle = active_handle
+        self._known = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PywinautoLibrary dialog watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self):
+        """Whether the watcher thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def check(self):
+        """Raise UnexpectedDialogError on the calling thread if a fail rule matched.
+
+        The failure stays latched until keyword_failed() is called after it was raised, so a check on
+        another thread (e.g. the poll scheduler's driving thread or an async job) doesn't consume it
+        before the keyword waiting on that thread sees it."""
+        with self._lock:
+            failure = self._failure
+            if failure is not None:
+                self._failure_raised = True
+        if failure is not None:
+            raise UnexpectedDialogError(failure)
+
+    def keyword_failed(self):
+        """Clear the latched failure if it was raised, as the failing keyword has reported it."""
+        with self._lock:
+            if self._failure_raised:
+                self._failure = None
+                self._failure_raised = False
+
+    def statistics(self):
+        """Get the number of scans, their total and mean duration and the current interval."""
+        mean = self.scan_time / self.scans if self.scans else 0.0
+        return {"scans": self.scans, "scan_time": self.scan_time, "mean_scan_time": mean,
+                "interval": self.interval, "events": list(self.events)}
+
+    def _run(self):
+        if self._app.backend.name == "uia":
+            import comtypes
+            comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        interval = self.interval
+        while not self._stop.wait(interval):
+            started = time.perf_counter()
+            try:
+                self.scan()
+            except Exception as error:
+                self._record("watcher", None, f"scan failed: {error}")
+            elapsed = time.perf_counter() - started
+            self.scans += 1
+            self.scan_time += elapsed
+            interval = max(self.interval, elapsed / self.budget) if self.budget > 0 else self.interval
+
+    def scan(self):
+        """Diff the application's top-level windows and handle the new ones matching a rule."""
+        app = self._app
+        entries = [entry for entry in self.window_snapshot.windows(app.backend.name)
+                   if entry.process_id == app.process]
+        handles = {entry.handle for entry in entries}
+        known, self._known = self._known, handles
+        if known is None:
+            # Windows present when watching started are expected.
+            return
+        active = self._active_handle()
+        with self._lock:
+            rules = list(self.rules.values())
+        for entry in entries:
+            if entry.handle in known or entry.handle == active:
+                continue
+            window = app.window(handle=entry.handle)
+            texts = _lazy_texts(window)
+            for rule in rules:
+                if rule.matches(entry, texts):
+                    self._handle(rule, entry, window)
+                    break
+
+    def _handle(self, rule, entry, window):
+        """Run the action of a matching rule on a new window."""
+        if rule.action == "fail":
+            self._record(rule.name, entry.title, "fail")
+            with self._lock:
+                self._failure = f"Unexpected dialog '{entry.title}' matched watcher rule '{rule.name}'."
+                self._failure_raised = False
+            return
+        try:
+            if rule.action == "close":
+                window.close()
+            elif rule.action == "click":
+                window[rule.argument].click()
+            else:
+                window.type_keys(rule.argument, with_spaces=True)
+            self._record(rule.name, entry.title, rule.action)
+        except Exception as error:
+            self._record(rule.name, entry.title, f"{rule.action} failed: {error}")
+
+    def _record(self, rule_name, title, outcome):
+        """Keep a record of a handled window."""
+        self.events.append({"rule": rule_name, "title": title, "outcome": outcome, "time": time.time()})
+
+
+def _lazy_texts(window):
+    """Return a function reading the texts of a window and its descendants once, on first call."""
+    texts = []
+
+    def read():
+        if not texts:
+            wrapper = window.wrapper_object()
+            texts.extend(wrapper.texts())
+            texts.extend(text for child in wrapper.descendants() for text in child.texts())
+        return texts
+    return read
@@ -0,0 +1,122 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import time
+
+
+class FlightRecorder:
+    """Ring buffer of the last keyword calls of the library, cheap enough to stay always on.
+
+    The slots are preallocated as one list per field and recording a call only stores references
+    and integers into them: nothing is formatted until the records are dumped. The time spent in
+    start(), control() and end() themselves is measured and reported by statistics()."""
+
+    def __init__(self, size=256):
+        if int(size) < 1:
+            raise ValueError("size must be at least 1.")
+        self.size = int(size)
+        self._keywords = [None] * self.size
+        self._args = [None] * self.size
+        self._dialogs = [None] * self.size
+        self._handles = [None] * self.size
+        self._controls = [None] * self.size
+        self._started = [0] * self.size
+        self._durations = [0] * self.size
+        self._statuses = [None] * self.size
+        self._pending = None
+        self.total = 0
+        self._dumped = 0
+        self.overhead_ns = 0
+        # Converts perf_counter_ns timestamps to wall-clock time when dumping.
+        self._epoch = time.time() - time.perf_counter_ns() / 1e9
+
+    def start(self, keyword, args, dialog, handle):
+        """Record the start of a keyword call along with the current dialog criteria and handle."""
+        now = time.perf_counter_ns()
+        slot = self.total % self.size
+        self._keywords[slot] = keyword
+        self._args[slot] = args
+        self._dialogs[slot] = dialog
+        self._handles[slot] = handle
+        self._controls[slot] = None
+        self._started[slot] = now
+        self._durations[slot] = 0
+        self._statuses[slot] = None
+        self._pending = slot
+        self.total += 1
+        self.overhead_ns += time.perf_counter_ns() - now
+
+    def end(self, status):
+        """Record the duration and outcome of the keyword call started last."""
+        now = time.perf_counter_ns()
+        slot = self._pending
+        if slot is not None:
+            self._durations[slot] = now - self._started[slot]
+            self._statuses[slot] = status
+            self._pending = None
+        self.overhead_ns += time.perf_counter_ns() - now
+
+    def control(self, wrapper):
+        """Record the handle, class name and backend of a control resolved by the keyword call started last.
+        The last control resolved by a call is kept."""
+        now = time.perf_counter_ns()
+        slot = self._pending
+        if slot is not None:
+            element_info = wrapper.element_info
+            self._controls[slot] = (element_info.handle, element_info.class_name, wrapper.backend.name)
+        self.overhead_ns += time.perf_counter_ns() - now
+
+    def records(self, since_last_dump=False):
+        """Get the recorded calls from oldest to newest as dictionaries."""
+        count = min(self.total - self._dumped if since_last_dump else self.total, self.size)
+        records = []
+        for position in range(self.total - count, self.total):
+            slot = position % self.size
+            control = self._controls[slot]
+            records.append({"time": self._epoch + self._started[slot] / 1e9, "keyword": self._keywords[slot],
+                            "args": list(self._args[slot] or ()), "dialog": self._dialogs[slot],
+                            "handle": self._handles[slot],
+                            "control": dict(zip(("handle", "class_name", "backend"), control)) if control else None,
+                            "duration": self._durations[slot] / 1e9, "status": self._statuses[slot] or "RUNNING"})
+        return records
+
+    def dump(self, since_last_dump=False):
+        """Format the recorded calls as lines of text and mark them as dumped."""
+        lines = [_format_record(record) for record in self.records(since_last_dump)]
+        self._dumped = self.total
+        return lines
+
+    def statistics(self):
+        """Get the number of recorded calls, the buffer size and the mean recording overhead per call."""
+        return {"records": self.total, "size": self.size,
+                "overhead_us": self.overhead_ns / self.total / 1000 if self.total else 0.0}
+
+
+def _format_record(record):
+    """Format a recorded call as one line of text."""
+    stamp = time.strftime("%H:%M:%S", time.localtime(record["time"])) + f".{int(record['time'] * 1000) % 1000:03d}"
+    handle = f" handle={record['handle']:#x}" if record["handle"] else ""
+    control = record["control"]
+    if control:
+        handle += f" control={control['class_name']}/{control['backend']}"
+        if control["handle"]:
+            handle += f"@{control['handle']:#x}"
+    return (f"{stamp} {record['status']:<7} {record['duration'] * 1000:9.3f} ms  {record['keyword']}"
+            f"  {'  '.join(record['args'])}  dialog={record['dialog']}{handle}")
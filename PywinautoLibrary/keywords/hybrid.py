@@ -0,0 +1,161 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import time
+
+from pywinauto import Application, handleprops
+
+BACKENDS = ("win32", "uia")
+
+
+class BackendRouter:
+    """Remembers which backend handles each control of each dialog class and times the lookups per backend.
+
+    A control is first probed with win32, which is the cheaper backend, and only with uia if win32
+    can't find it. The decision is kept, so the probing cost is paid once per dialog class and control."""
+
+    def __init__(self):
+        self.routes = {}
+        self.lookups = dict.fromkeys(BACKENDS, 0)
+        self.lookup_time = dict.fromkeys(BACKENDS, 0.0)
+
+    def route(self, dialog_class, control_name, dialogs):
+        """Get the backend for a control, probing the backends in order of cost if it is not known yet."""
+        key = (dialog_class, control_name)
+        backend = self.routes.get(key)
+        if backend is None:
+            for candidate in BACKENDS:
+                started = time.perf_counter()
+                found = dialogs[candidate][control_name].exists(timeout=0)
+                self.record(candidate, time.perf_counter() - started)
+                if found:
+                    backend = self.routes[key] = candidate
+                    break
+            else:
+                # Not present yet in either backend. Let win32 wait for it without remembering the decision.
+                backend = "win32"
+        return backend
+
+    def record(self, backend, seconds, lookups=1):
+        """Record the duration of a lookup done with a backend. Further time spent on an already counted
+        lookup is recorded with lookups=0."""
+        self.lookups[backend] += lookups
+        self.lookup_time[backend] += seconds
+
+    def statistics(self):
+        """Get the lookup counts and times per backend and the remembered routes."""
+        statistics = {backend: {"lookups": self.lookups[backend], "time": self.lookup_time[backend]}
+                      for backend in BACKENDS}
+        statistics["routes"] = {f"{dialog_class}/{control}": backend
+                                for (dialog_class, control), backend in self.routes.items()}
+        return statistics
+
+
+class _TimedSpecification:
+    """Window specification proxy recording how long resolving the control takes with its backend.
+
+    The control is resolved once per proxy, and that resolution (or an exists/wait on the specification)
+    is what gets timed. It counts as one lookup however many attributes are used afterwards."""
+
+    def __init__(self, specification, backend, router):
+        self._specification = specification
+        self._backend = backend
+        self._router = router
+        self._wrapper = None
+        self._counted = False
+
+    def wrapper_object(self):
+        """Resolve the control, timing the resolution with the backend of the control."""
+        if self._wrapper is None:
+            self._wrapper = self._timed(self._specification.wrapper_object)
+        return self._wrapper
+
+    def exists(self, *args, **kwargs):
+        return self._timed(self._specification.exists, *args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        return self._timed(self._specification.wait, *args, **kwargs)
+
+    def wait_not(self, *args, **kwargs):
+        return self._timed(self._specification.wait_not, *args, **kwargs)
+
+    def _timed(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self._router.record(self._backend, time.perf_counter() - started, lookups=0 if self._counted else 1)
+            self._counted = True
+
+    def __getattr__(self, attribute):
+        specification = self._specification
+        if attribute in vars(specification) or hasattr(type(specification), attribute):
+            return getattr(specification, attribute)
+        return getattr(self.wrapper_object(), attribute)
+
+    def __getitem__(self, key):
+        return _TimedSpecification(self._specification[key], self._backend, self._router)
+
+
+class HybridDialog:
+    """Dialog specification for both backends. Controls are looked up with the backend routed to them,
+    anything else is done with win32."""
+
+    def __init__(self, win32_dialog, uia_dialog, router):
+        self._dialogs = {"win32": win32_dialog, "uia": uia_dialog}
+        self._router = router
+        self._class_name = None
+
+    def __getitem__(self, control_name):
+        if self._class_name is None:
+            self._class_name = handleprops.classname(self._dialogs["win32"].wrapper_object().handle)
+        backend = self._router.route(self._class_name, control_name, self._dialogs)
+        return _TimedSpecification(self._dialogs[backend][control_name], backend, self._router)
+
+    def __getattr__(self, attribute):
+        return getattr(self._dialogs["win32"], attribute)
+
+
+class HybridApplication:
+    """Application connected with both the win32 and the uia backend to the same process."""
+
+    def __init__(self, router):
+        self.win32 = Application("win32")
+        self.uia = Application("uia")
+        self.router = router
+
+    def start(self, *args, **kwargs):
+        """Start the application with win32 and connect uia to its process."""
+        self.win32.start(*args, **kwargs)
+        self.uia.connect(process=self.win32.process)
+        return self
+
+    def connect(self, **kwargs):
+        """Connect win32 to the application and uia to the same process."""
+        self.win32.connect(**kwargs)
+        self.uia.connect(process=self.win32.process)
+        return self
+
+    def window(self, **criteria):
+        """Specify a top-level window for both backends."""
+        return HybridDialog(self.win32.window(**criteria), self.uia.window(**criteria), self.router)
+
+    def __getattr__(self, attribute):
+        return getattr(self.win32, attribute)
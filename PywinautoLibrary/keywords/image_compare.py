@@ -0,0 +1,42 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def frame_array(image, max_side=64):
+    """Downsample a PIL image to a grayscale array whose longer side is at most max_side pixels."""
+    if numpy is None:
+        raise RuntimeError("Comparing images requires NumPy to be installed.")
+    image = image.convert("L")
+    factor = max(image.width, image.height) / float(max_side)
+    if factor > 1:
+        image = image.resize((max(1, round(image.width / factor)), max(1, round(image.height / factor))))
+    return numpy.asarray(image, dtype=numpy.int16)
+
+
+def frame_difference(first, second):
+    """Get the mean absolute pixel difference of two frames, from 0 (identical) to 1."""
+    if first.shape != second.shape:
+        return 1.0
+    return float(numpy.abs(first - second).mean()) / 255
@@ -0,0 +1,139 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import ctypes
+import re
+
+# Messages reading a single item text of a standard list box or combo box.
+LB_GETTEXT = 0x0189
+LB_GETTEXTLEN = 0x018A
+CB_GETLBTEXT = 0x0148
+CB_GETLBTEXTLEN = 0x0149
+
+
+class ItemIndex:
+    """Text to index lookup table for the items of a list-like control.
+
+    The item texts are read once and the index is only rebuilt when the fingerprint
+    of the control (its handle and item count) changes, or when a refresh is forced.
+    Items replaced or reordered without changing the count are caught by lookup(),
+    which reads the text of the found item back before trusting the index."""
+
+    def __init__(self, read_count, read_texts, read_text):
+        self._read_count = read_count
+        self._read_texts = read_texts
+        self._read_text = read_text
+        self._fingerprint = None
+        self.texts = []
+        self._exact = {}
+        self._folded = {}
+
+    def refresh(self, wrapper, force=False):
+        """Rebuild the index from the control wrapper if forced or if its fingerprint changed."""
+        fingerprint = self._fingerprint_of(wrapper)
+        if force or fingerprint != self._fingerprint:
+            self._rebuild(wrapper, fingerprint)
+        return self
+
+    def lookup(self, wrapper, text, ignore_case=False, regex=False):
+        """Get the index of the first item matching text, or None if there is no match.
+
+        If the fingerprint is unchanged, the text of the found item is read back from the control;
+        the index is rebuilt once if it differs or if nothing matched."""
+        fingerprint = self._fingerprint_of(wrapper)
+        if fingerprint == self._fingerprint:
+            index = self.find(text, ignore_case, regex)
+            if index is not None and self.item_text(wrapper, index) == self.texts[index]:
+                return index
+        self._rebuild(wrapper, fingerprint)
+        return self.find(text, ignore_case, regex)
+
+    def item_text(self, wrapper, index):
+        """Read the current text of one item from the control."""
+        return self._read_text(wrapper, index)
+
+    def _fingerprint_of(self, wrapper):
+        return getattr(wrapper, "handle", None), self._read_count(wrapper)
+
+    def _rebuild(self, wrapper, fingerprint):
+        self.texts = list(self._read_texts(wrapper))
+        self._exact = {}
+        self._folded = {}
+        for index, text in enumerate(self.texts):
+            self._exact.setdefault(text, index)
+            self._folded.setdefault(text.casefold(), index)
+        self._fingerprint = fingerprint
+
+    def find(self, text, ignore_case=False, regex=False):
+        """Get the index of the first item matching text, or None if there is no match."""
+        if regex:
+            pattern = re.compile(text, re.IGNORECASE if ignore_case else 0)
+            for index, item_text in enumerate(self.texts):
+                if pattern.fullmatch(item_text):
+                    return index
+            return None
+        if ignore_case:
+            return self._folded.get(text.casefold())
+        return self._exact.get(text)
+
+
+def _is_uia(wrapper):
+    return getattr(getattr(wrapper, "backend", None), "name", "win32") == "uia"
+
+
+def _message_text(wrapper, length_message, text_message, index):
+    """Read one item text with the list box or combo box messages, which the system marshals across processes."""
+    length = wrapper.send_message(length_message, index, 0)
+    if length < 0:
+        return None
+    text = ctypes.create_unicode_buffer(length + 1)
+    wrapper.send_message(text_message, index, ctypes.addressof(text))
+    return text.value
+
+
+def _combobox_text(combobox, index):
+    if _is_uia(combobox):
+        texts = combobox.item_texts()
+        return texts[index] if index < len(texts) else None
+    return _message_text(combobox, CB_GETLBTEXTLEN, CB_GETLBTEXT, index)
+
+
+def _listbox_text(listbox, index):
+    if _is_uia(listbox):
+        return listbox.get_item(index).window_text()
+    return _message_text(listbox, LB_GETTEXTLEN, LB_GETTEXT, index)
+
+
+def _tab_texts(tab):
+    return [tab.get_tab_text(index) for index in range(tab.tab_count())]
+
+
+def _toolbar_texts(toolbar):
+    return [toolbar.get_button(index).text for index in range(toolbar.button_count())]
+
+
+# Item count, item texts and single item text readers for each kind of indexed control.
+ITEM_READERS = {
+    "combobox": (lambda combobox: combobox.item_count(), lambda combobox: combobox.item_texts(), _combobox_text),
+    "listbox": (lambda listbox: listbox.item_count(), lambda listbox: listbox.item_texts(), _listbox_text),
+    "tab": (lambda tab: tab.tab_count(), _tab_texts, lambda tab, index: tab.get_tab_text(index)),
+    "toolbar": (lambda toolbar: toolbar.button_count(), _toolbar_texts,
+                lambda toolbar, index: toolbar.get_button(index).text),
+}
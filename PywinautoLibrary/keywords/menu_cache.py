@@ -0,0 +1,82 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import os
+
+import win32gui
+from pywinauto.application import process_module
+
+MF_BYCOMMAND = 0x0000
+MF_GRAYED = 0x0001
+MF_DISABLED = 0x0002
+
+
+def menu_path_parts(path):
+    """Split a menu path such as "File -> Save As" into its item texts."""
+    return tuple(part.strip() for part in path.split('->'))
+
+
+def clean_menu_text(text):
+    """Remove accelerator markers and shortcut text from a menu item text."""
+    return text.split('\t')[0].replace('&', '').strip()
+
+
+class MenuCache:
+    """Resolved menu items, keyed by application build, dialog class and menu path.
+
+    Menu bar items are stored as command IDs so they can be invoked with WM_COMMAND
+    directly. Popup menu items are stored as index paths ("#0->#3") along with the texts
+    of the items on the path, which skips the text matching at each level when the popup
+    menu is walked again; the texts are compared before the cached path is used."""
+
+    def __init__(self):
+        self._items = {}
+        self._builds = {}
+
+    def _build(self, window):
+        """Identify the build of the application owning a window by its executable path and modification time."""
+        process_id = window.process_id()
+        build = self._builds.get(process_id)
+        if build is None:
+            path = process_module(process_id)
+            build = self._builds[process_id] = (path, os.path.getmtime(path))
+        return build
+
+    def key(self, window, path, popup=False):
+        """Get the cache key of a menu path of a window."""
+        return self._build(window), window.class_name(), popup, menu_path_parts(path)
+
+    def get(self, key):
+        """Get the cached command ID or index path of a menu item, or None on a cache miss."""
+        return self._items.get(key)
+
+    def put(self, key, item):
+        """Cache the command ID or index path of a menu item."""
+        self._items[key] = item
+
+    def invalidate(self, key):
+        """Drop a cached menu item."""
+        self._items.pop(key, None)
+
+    @staticmethod
+    def is_enabled(window, item_id):
+        """Check whether a command ID is present and enabled in the menu bar of a window."""
+        state = win32gui.GetMenuState(win32gui.GetMenu(window.handle), item_id, MF_BYCOMMAND)
+        return state not in (-1, 0xFFFFFFFF) and not state & (MF_GRAYED | MF_DISABLED)
@@ -0,0 +1,195 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import collections
+import contextlib
+import threading
+import time
+
+from pywinauto.timings import TimeoutError
+
+
+class WaitCancelledError(Exception):
+    """Raised by a wait that was cancelled before its condition was met."""
+
+
+class _Waiter:
+    """A condition registered with the scheduler, with its own adaptive poll interval."""
+
+    def __init__(self, condition, timeout, name, interval, cancel=None):
+        self.condition = condition
+        self.cancel = cancel
+        self.name = name
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        self.interval = interval
+        self.next_poll = self.started
+        self.polls = 0
+        self.result = None
+        self.error = None
+        self.detected_at = None
+        self.done = threading.Event()
+
+
+class PollScheduler:
+    """Polls the conditions of all active waits together.
+
+    One thread at a time drives the polling. Each tick first runs the snapshot hooks
+    (e.g. dropping the window snapshot so it is enumerated once for the tick) and then
+    evaluates every waiter that is due. The interval of each waiter starts at
+    min_interval and grows by backoff after every unsuccessful poll, up to max_interval."""
+
+    def __init__(self, min_interval=0.02, max_interval=0.5, backoff=1.5, snapshot_hooks=None, history=1000):
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.backoff = float(backoff)
+        self.snapshot_hooks = list(snapshot_hooks or [])
+        self.ticks = 0
+        self.statistics = collections.deque(maxlen=history)
+        self._waiters = []
+        self._lock = threading.Lock()
+        self._driver = threading.Lock()
+        # Signalled whenever a waiter is added or finishes, or the driver stops, with _version counting
+        # the signals so that a signal sent between a check and the wait on the condition isn't lost.
+        self._changed = threading.Condition()
+        self._version = 0
+        self._local = threading.local()
+
+    def set_intervals(self, min_interval, max_interval, backoff=None):
+        """Set the initial and maximum poll intervals and optionally the backoff factor."""
+        min_interval = float(min_interval)
+        max_interval = float(max_interval)
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Intervals must be positive and min_interval must not exceed max_interval.")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        if backoff is not None:
+            backoff = float(backoff)
+            if backoff < 1:
+                raise ValueError("backoff must be at least 1.")
+            self.backoff = backoff
+
+    @contextlib.contextmanager
+    def cancel_on(self, event):
+        """Make the waits started by the current thread within the block stop when event is set."""
+        previous = getattr(self._local, "cancel", None)
+        self._local.cancel = event
+        try:
+            yield
+        finally:
+            self._local.cancel = previous
+
+    def wait(self, condition, timeout, name="wait"):
+        """Wait until condition returns a truthy value and return it.
+
+        Exceptions raised by the condition count as unsuccessful polls. If the timeout
+        expires, pywinauto's TimeoutError is raised from the last such exception.
+        If the wait runs within cancel_on and its event is set, WaitCancelledError is raised
+        at the next tick and the waiter is removed."""
+        cancel = getattr(self._local, "cancel", None)
+        if cancel is not None and cancel.is_set():
+            raise WaitCancelledError(f"{name} was cancelled.")
+        waiter = _Waiter(condition, float(timeout), name, self.min_interval, cancel)
+        with self._lock:
+            self._waiters.append(waiter)
+        # Wake the driving thread so the new waiter gets its first poll right away.
+        self.wake()
+        try:
+            while not waiter.done.is_set():
+                if self._driver.acquire(blocking=False):
+                    try:
+                        self._drive(waiter)
+                    finally:
+                        self._driver.release()
+                        self.wake()
+                else:
+                    # Another thread polls on behalf of this waiter. It is woken when the waiter finishes
+                    # or the driver stops, in which case it takes over.
+                    with self._changed:
+                        if not waiter.done.is_set():
+                            self._changed.wait(waiter.interval)
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
+        detected = waiter.detected_at is not None
+        end = waiter.detected_at if detected else time.monotonic()
+        self.statistics.append({"name": name, "polls": waiter.polls, "detected": detected,
+                                "latency": end - waiter.started})
+        if not detected and waiter.cancel is not None and waiter.cancel.is_set():
+            raise WaitCancelledError(f"{name} was cancelled.")
+        if not detected:
+            raise TimeoutError(f"{name} timed out after {timeout} seconds.") from waiter.error
+        return waiter.result
+
+    def wake(self):
+        """Wake the threads waiting on the scheduler, e.g. after a waiter was added or cancelled."""
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def _drive(self, until):
+        """Run ticks until the given waiter is done, sleeping until the next poll is due or the waiters change."""
+        while not until.done.is_set():
+            with self._changed:
+                version = self._version
+            self._tick()
+            with self._lock:
+                pending = [waiter.next_poll for waiter in self._waiters if not waiter.done.is_set()]
+            if until.done.is_set() or not pending:
+                break
+            with self._changed:
+                if self._version == version:
+                    self._changed.wait(max(min(pending) - time.monotonic(), 0))
+
+    def _tick(self):
+        """Take one snapshot and evaluate every due waiter against it, ending the cancelled ones."""
+        now = time.monotonic()
+        with self._lock:
+            cancelled = [waiter for waiter in self._waiters
+                         if waiter.cancel is not None and waiter.cancel.is_set() and not waiter.done.is_set()]
+            for waiter in cancelled:
+                waiter.done.set()
+            due = [waiter for waiter in self._waiters if not waiter.done.is_set() and waiter.next_poll <= now]
+        if cancelled:
+            self.wake()
+        if not due:
+            return
+        self.ticks += 1
+        for hook in self.snapshot_hooks:
+            hook()
+        for waiter in due:
+            waiter.polls += 1
+            try:
+                result = waiter.condition()
+            except Exception as error:
+                waiter.error = error
+                result = None
+            now = time.monotonic()
+            if result:
+                waiter.result = result
+                waiter.detected_at = now
+                waiter.done.set()
+            elif now >= waiter.deadline:
+                waiter.done.set()
+            else:
+                waiter.next_poll = min(now + waiter.interval, waiter.deadline)
+                waiter.interval = min(waiter.interval * self.backoff, self.max_interval)
+        if any(waiter.done.is_set() for waiter in due):
+            self.wake()
@@ -0,0 +1,290 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import collections
+import time
+
+# UI Automation property IDs of the properties that can be prefetched.
+UIA_PROPERTY_IDS = {
+    "runtime_id": 30000,
+    "control_type": 30003,
+    "name": 30005,
+    "is_enabled": 30010,
+    "automation_id": 30011,
+    "class_name": 30012,
+    "is_content_element": 30017,
+    "text_pattern": 30040,
+    "is_selected": 30079,
+    "toggle_state": 30086,
+}
+# The text served for window_text() is derived from these properties.
+TEXT_PROPERTIES = ("name", "class_name", "text_pattern")
+PREFETCH_PROPERTIES = tuple(name for name in UIA_PROPERTY_IDS if name != "runtime_id") + ("text",)
+TREE_SCOPE_ELEMENT = 1
+TREE_SCOPE_CHILDREN = 2
+TREE_SCOPE_SUBTREE = 7
+# List views with more rows than this are never cached as a whole subtree, to bound the memory held by the cache.
+SUBTREE_CACHE_ROWS = 1000
+
+
+def _is_not_supported(value, not_supported):
+    """Check whether a cached property value is UI Automation's not-supported sentinel."""
+    return not_supported is not None and isinstance(value, type(not_supported)) and value == not_supported
+
+
+def _cached_text(element, not_supported=None):
+    """Get the text window_text() returns for a cached element, or None if it must be read from the
+    element's text pattern (e.g. for Edit and Document controls), which can't be cached, or if the
+    element doesn't support the name property."""
+    value = element.GetCachedPropertyValue
+    if value(UIA_PROPERTY_IDS["class_name"]) and value(UIA_PROPERTY_IDS["text_pattern"]):
+        return None
+    name = value(UIA_PROPERTY_IDS["name"])
+    if _is_not_supported(name, not_supported):
+        return None
+    return name or ""
+
+
+class UIACacheProvider:
+    """Element provider fetching the properties of a whole subtree with one UI Automation cache request."""
+
+    def key(self, wrapper):
+        """Get the key identifying the element of a wrapper: its runtime ID."""
+        return tuple(wrapper.element_info.runtime_id)
+
+    @staticmethod
+    def _cache_request(properties, scope=None):
+        """Create a cache request for properties over the raw view, as walked by pywinauto's children()."""
+        from pywinauto.uia_defines import IUIA
+
+        iuia = IUIA()
+        request = iuia.iuia.CreateCacheRequest()
+        for name in properties:
+            request.AddProperty(UIA_PROPERTY_IDS[name])
+        request.TreeFilter = iuia.true_condition
+        if scope is not None:
+            request.TreeScope = scope
+        return iuia, request
+
+    def fetch(self, root, properties):
+        """Get the properties of root and all its descendants, keyed by runtime ID.
+        The "text" property is the text window_text() returns, where it can be served from the cache.
+        Properties an element doesn't support are left out, so their reads fall back to the element."""
+        requested = set(properties) - {"text"}
+        if "text" in properties:
+            requested.update(TEXT_PROPERTIES)
+        iuia, request = self._cache_request(["runtime_id"] + sorted(requested))
+        not_supported = iuia.iuia.ReservedNotSupportedValue
+        elements = root.element_info.element.FindAllBuildCache(TREE_SCOPE_SUBTREE, iuia.true_condition, request)
+        values = {}
+        for index in range(elements.Length):
+            element = elements.GetElement(index)
+            key = tuple(element.GetCachedPropertyValue(UIA_PROPERTY_IDS["runtime_id"]))
+            values[key] = {}
+            for name in requested:
+                value = element.GetCachedPropertyValue(UIA_PROPERTY_IDS[name])
+                if not _is_not_supported(value, not_supported):
+                    values[key][name] = value
+            if "text" in properties:
+                text = _cached_text(element, not_supported)
+                if text is not None:
+                    values[key]["text"] = text
+        return values
+
+    def child_values(self, wrapper, name):
+        """Get a property of each content child of a wrapper's element with one cache request,
+        in the order of children(content_only=True)."""
+        _, request = self._cache_request(("is_content_element", name), TREE_SCOPE_ELEMENT | TREE_SCOPE_CHILDREN)
+        found = wrapper.element_info.element.BuildUpdatedCache(request).GetCachedChildren()
+        children = [found.GetElement(index) for index in range(found.Length)] if found else []
+        return [child.GetCachedPropertyValue(UIA_PROPERTY_IDS[name]) for child in children
+                if child.GetCachedPropertyValue(UIA_PROPERTY_IDS["is_content_element"])]
+
+    def rows(self, listview, start, end, item_count, subtree=True):
+        """Get the cell texts of the rows start to end of a list view with item_count rows, walking cached elements.
+
+        With subtree, one request caches every row and cell. Otherwise one request caches the rows
+        and one more per requested row caches its cells, which is cheaper for a few rows of a long list.
+        A virtualized list view only has the rows near its viewport as children, so if there are fewer
+        children than item_count the rows are found with the ItemContainer pattern and realized with the
+        VirtualizedItem pattern, which may scroll the list view. Raises RuntimeError if the requested
+        rows can't all be found."""
+        from pywinauto.uia_defines import IUIA
+        from pywinauto.uia_element_info import UIAElementInfo
+
+        iuia = IUIA()
+        header = iuia.known_control_types["Header"]
+        not_supported = iuia.iuia.ReservedNotSupportedValue
+        scope = TREE_SCOPE_SUBTREE if subtree else TREE_SCOPE_ELEMENT | TREE_SCOPE_CHILDREN
+        _, request = self._cache_request(TEXT_PROPERTIES + ("control_type", "is_content_element"), scope)
+        _, cells_request = self._cache_request(TEXT_PROPERTIES, TREE_SCOPE_ELEMENT | TREE_SCOPE_CHILDREN)
+
+        def children(element):
+            found = element.GetCachedChildren()
+            return [found.GetElement(index) for index in range(found.Length)] if found else []
+
+        def text(element):
+            cached = _cached_text(element, not_supported)
+            return cached if cached is not None else UIAElementInfo(element).rich_text
+
+        element = listview.element_info.element
+        items = [item for item in children(element.BuildUpdatedCache(request))
+                 if item.GetCachedPropertyValue(UIA_PROPERTY_IDS["is_content_element"])
+                 and item.GetCachedPropertyValue(UIA_PROPERTY_IDS["control_type"]) != header]
+        if len(items) < item_count:
+            realized = len(items)
+            items = self._container_items(element, start, end)
+            subtree = False
+            if items is None:
+                raise RuntimeError(f"The list view has {item_count} rows, but only {realized} can be read "
+                                   f"as it doesn't support the ItemContainer pattern.")
+        else:
+            items = items[start:end]
+        if len(items) < end - start:
+            raise RuntimeError(f"The list view has {item_count} rows, but only {start + len(items)} could be found.")
+        for item in items:
+            if not subtree:
+                item = self._realize(item).BuildUpdatedCache(cells_request)
+            yield [text(cell) for cell in children(item)] or [text(item)]
+
+    @staticmethod
+    def _container_items(element, start, end):
+        """Find the rows start to end of a virtualized list view element with the ItemContainer pattern,
+        or return None if the pattern is not supported."""
+        from pywinauto.uia_defines import NoPatternInterfaceError, get_elem_interface
+
+        try:
+            container = get_elem_interface(element, "ItemContainer")
+        except NoPatternInterfaceError:
+            return None
+        items = []
+        item = None
+        for index in range(end):
+            # With property ID 0, FindItemByProperty returns the item after the given one.
+            item = container.FindItemByProperty(item, 0, None)
+            if not item:
+                break
+            if index >= start:
+                items.append(item)
+        return items
+
+    @staticmethod
+    def _realize(item):
+        """Realize a virtualized item so its cells can be read; other items are returned as they are."""
+        from pywinauto.uia_defines import NoPatternInterfaceError, get_elem_interface
+
+        try:
+            get_elem_interface(item, "VirtualizedItem").Realize()
+        except NoPatternInterfaceError:
+            pass
+        return item
+
+
+class PropertyPrefetcher:
+    """Serves property reads from one bulk fetch of a subtree while a prefetch is active.
+
+    The provider must have key(wrapper), returning a hashable element identity, and
+    fetch(root, properties), returning the properties of the subtree as {key: {name: value}}.
+    The element key of each control is resolved once per fetch and kept by the control's name.
+    Reads of elements or properties that were not fetched fall back to the given read function.
+    invalidate() makes the next read fetch the subtree again; it must be called whenever the UI may have changed."""
+
+    def __init__(self, provider=None):
+        self.provider = provider if provider is not None else UIACacheProvider()
+        self.hits = 0
+        self.control_hits = collections.Counter()
+        self.misses = 0
+        self.fetches = 0
+        self.fetch_time = 0.0
+        self._values = None
+        self._keys = {}
+        self._root = None
+        self._properties = ()
+        self._stale = False
+
+    @property
+    def active(self):
+        """Whether prefetched values are currently served."""
+        return self._values is not None
+
+    def begin(self, root, properties=PREFETCH_PROPERTIES):
+        """Fetch the properties of root and its descendants in one call and serve reads from them."""
+        self._root = root
+        self._properties = [name for name in properties if name != "runtime_id"]
+        self._fetch()
+        return len(self._values)
+
+    def _fetch(self):
+        started = time.perf_counter()
+        self._values = self.provider.fetch(self._root, self._properties)
+        self._keys = {}
+        self._stale = False
+        self.fetch_time += time.perf_counter() - started
+        self.fetches += 1
+
+    def end(self):
+        """Stop serving prefetched values."""
+        self._values = None
+        self._keys = {}
+        self._root = None
+
+    def invalidate(self):
+        """Fetch the subtree again before the next read, keeping the prefetch active."""
+        if self._values is not None:
+            self._stale = True
+
+    def get(self, control, name, resolve, read):
+        """Get a property of a control from the prefetched values, or by calling read.
+
+        resolve returns the wrapper of the control; it is only called for the first read of the control."""
+        if self._values is not None:
+            if self._stale:
+                self._fetch()
+            key = self._keys.get(control)
+            if key is None:
+                key = self._keys[control] = self.provider.key(resolve())
+            element = self._values.get(key)
+            if element is not None and name in element:
+                self.hits += 1
+                self.control_hits[control, name] += 1
+                return element[name]
+        self.misses += 1
+        return read()
+
+    def rows(self, listview, start, end, item_count, subtree=True):
+        """Yield the cell texts of list view rows read with the provider's bulk reads, counted as one fetch."""
+        self.fetches += 1
+        rows = iter(self.provider.rows(listview, start, end, item_count, subtree))
+        while True:
+            started = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            finally:
+                self.fetch_time += time.perf_counter() - started
+            yield row
+
+    def statistics(self):
+        """Get the number of cache hits, also per "control/property", misses, bulk fetches and the seconds
+        spent fetching."""
+        return {"hits": self.hits, "misses": self.misses, "fetches": self.fetches, "fetch_time": self.fetch_time,
+                "active": self.active,
+                "control_hits": {f"{control}/{name}": count for (control, name), count in self.control_hits.items()}}
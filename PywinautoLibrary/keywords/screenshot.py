@@ -0,0 +1,135 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".bmp": "BMP"}
+ENCODED_CACHE_SIZE = 16
+
+
+def capture_wrapper_image(wrapper):
+    """Capture the pixels of a control wrapper as a PIL image."""
+    image = wrapper.capture_as_image()
+    if image is None:
+        raise RuntimeError("Capturing images requires Pillow to be installed.")
+    return image
+
+
+class ScreenshotPipeline:
+    """Captures images on the calling thread and encodes, scales and writes them in a thread pool.
+
+    capture is called with the capture target and must return a PIL image, so the pipeline can be fed
+    synthetic images. Identical captures encoded with the same settings are only encoded once, but every
+    capture is written to its own path. A failed write is raised by the next capture or flush."""
+
+    def __init__(self, capture=capture_wrapper_image, max_workers=2):
+        self.capture_source = capture
+        self.written = 0
+        self.duplicates = 0
+        self._encoded = OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PywinautoLibrary screenshot")
+
+    def capture(self, target, path, scale=1.0, quality=90):
+        """Capture target and queue writing it to path. Returns the path.
+        Raises the error of an earlier write that failed since the last capture."""
+        scale = float(scale)
+        if not 0 < scale <= 1:
+            raise ValueError("scale must be greater than 0 and at most 1.")
+        image_format = FORMATS.get(os.path.splitext(path)[1].lower())
+        if image_format is None:
+            raise ValueError(f"{path} must end with one of {', '.join(FORMATS)}")
+        self._raise_failed_writes()
+        image = self.capture_source(target)
+        digest = hashlib.sha1(image.tobytes())
+        digest.update(f"{image.mode}{image.size}{image_format}{scale}{quality}".encode())
+        key = digest.hexdigest()
+        with self._lock:
+            encoded = self._encoded.get(key)
+            if encoded is not None and not (encoded.done() and encoded.exception()):
+                self.duplicates += 1
+                self._encoded.move_to_end(key)
+            else:
+                encoded = self._executor.submit(self._encode, image, image_format, scale, int(quality))
+                self._encoded[key] = encoded
+                if len(self._encoded) > ENCODED_CACHE_SIZE:
+                    self._encoded.popitem(last=False)
+            self._pending.append((path, self._executor.submit(self._write, encoded, path)))
+        return path
+
+    @staticmethod
+    def _encode(image, image_format, scale, quality):
+        """Scale and encode an image to bytes. Runs in the thread pool."""
+        if scale < 1:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size)
+        options = {}
+        if image_format == "JPEG":
+            image = image.convert("RGB")
+            options["quality"] = quality
+        data = io.BytesIO()
+        image.save(data, image_format, **options)
+        return data.getvalue()
+
+    def _write(self, encoded, path):
+        """Write the encoded image to path. Runs in the thread pool after the encoding was queued."""
+        data = encoded.result()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+        with self._lock:
+            self.written += 1
+
+    def _raise_failed_writes(self):
+        """Forget the finished writes and raise the errors of the failed ones."""
+        with self._lock:
+            done = [(path, future) for path, future in self._pending if future.done()]
+            self._pending = [(path, future) for path, future in self._pending if not future.done()]
+        self._raise_errors(done)
+
+    @staticmethod
+    def _raise_errors(writes):
+        """Raise a RuntimeError naming every failed write."""
+        errors = [f"{path}: {future.exception()}" for path, future in writes if future.exception()]
+        if errors:
+            raise RuntimeError("Writing screenshots failed: " + "; ".join(errors))
+
+    def flush(self):
+        """Wait until all queued images are written, raising the write errors."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for _, future in pending:
+            future.exception()
+        self._raise_errors(pending)
+
+    def close(self):
+        """Write the queued images and stop the thread pool."""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
@@ -0,0 +1,122 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def gray_array(image):
+    """Convert a PIL image to a grayscale float array."""
+    if numpy is None:
+        raise RuntimeError("Locating images requires NumPy to be installed.")
+    return numpy.asarray(image.convert("L"), dtype=numpy.float64)
+
+
+def match_template(image, template):
+    """Find the best normalized cross-correlation match of a template in an image (both 2-D arrays).
+
+    The correlation of all positions is computed at once with FFTs and normalized with integral
+    images. Returns the score, from -1 to 1, and the (x, y) position of the top left corner,
+    or (-1.0, None) if the template is larger than the image."""
+    height, width = image.shape
+    rows, columns = template.shape
+    if rows > height or columns > width:
+        return -1.0, None
+    centered = template - template.mean()
+    template_norm = numpy.sqrt((centered ** 2).sum())
+
+    shape = (height, width)
+    correlation = numpy.fft.irfft2(numpy.fft.rfft2(image) * numpy.conj(numpy.fft.rfft2(centered, shape)), shape)
+    correlation = correlation[:height - rows + 1, :width - columns + 1]
+
+    def window_sums(values):
+        integral = numpy.zeros((height + 1, width + 1))
+        integral[1:, 1:] = values.cumsum(0).cumsum(1)
+        return (integral[rows:, columns:] - integral[:-rows, columns:]
+                - integral[rows:, :-columns] + integral[:-rows, :-columns])
+
+    count = rows * columns
+    sums = window_sums(image)
+    variance = numpy.maximum(window_sums(image ** 2) - sums ** 2 / count, 0)
+    denominator = numpy.sqrt(variance) * template_norm
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        scores = numpy.where(denominator > 1e-6, correlation / denominator, 0.0)
+    y, x = numpy.unravel_index(numpy.argmax(scores), scores.shape)
+    return float(scores[y, x]), (int(x), int(y))
+
+
+class TemplateMatcher:
+    """Locates template images in captures, trying the region of the previous match of a template first."""
+
+    def __init__(self, margin=16):
+        self.margin = margin
+        self._templates = {}
+        self._last_matches = {}
+
+    def template(self, path):
+        """Load a template image file once and keep it for later searches."""
+        template = self._templates.get(path)
+        if template is None:
+            if Image is None:
+                raise RuntimeError("Locating images requires Pillow to be installed.")
+            with Image.open(path) as image:
+                template = self._templates[path] = image.convert("L")
+        return template
+
+    def find(self, image, template_path, threshold, scales=(1.0,)):
+        """Find a template image file in an image (a PIL image) at several scales.
+
+        Returns the score, the (x, y) top left position and the (width, height) of the best match.
+        The position is None if the template is larger than the image at every scale."""
+        template = self.template(template_path)
+        template_key = template_path
+        image_array = gray_array(image)
+        last = self._last_matches.get(template_key)
+        if last is not None:
+            (x, y), (width, height), scale = last
+            left = max(x - self.margin, 0)
+            top = max(y - self.margin, 0)
+            region = image_array[top:y + height + self.margin, left:x + width + self.margin]
+            score, position = match_template(region, self._scaled(template, scale))
+            if position is not None and score >= threshold:
+                return score, (position[0] + left, position[1] + top), (width, height)
+        best = (-1.0, None, None)
+        for scale in scales:
+            scaled = self._scaled(template, scale)
+            score, position = match_template(image_array, scaled)
+            if position is not None and score > best[0]:
+                best = (score, position, scaled.shape[::-1])
+                if score >= threshold:
+                    self._last_matches[template_key] = (position, best[2], scale)
+        return best
+
+    @staticmethod
+    def _scaled(template, scale):
+        """Get the grayscale array of a template resized by scale."""
+        if scale != 1.0:
+            template = template.resize((max(1, round(template.width * scale)), max(1, round(template.height * scale))))
+        return gray_array(template)
@@ -0,0 +1,83 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+def tree_path_parts(path):
+    """Split a tree path such as "Tree->Node2->SubNode1" into its node texts."""
+    return tuple(path.replace('->', '\\').strip('\\').split('\\'))
+
+
+def tree_node_text(node):
+    """Get the text of a tree node from either backend."""
+    if hasattr(node, "window_text"):
+        return node.window_text()
+    return node.text()
+
+
+class TreeNodeCache:
+    """Resolved tree nodes of one tree control, keyed by the path of node texts leading to them."""
+
+    def __init__(self, handle=None):
+        self.handle = handle
+        self._nodes = {}
+
+    def get(self, parts):
+        """Get the cached node for a path if it is still valid, dropping it otherwise."""
+        entry = self._nodes.get(parts)
+        if entry is None:
+            return None
+        node, text = entry
+        try:
+            valid = tree_node_text(node) == text
+        except Exception:
+            valid = False
+        if not valid:
+            self.invalidate(parts)
+            return None
+        return node
+
+    def put(self, parts, node):
+        """Cache a resolved node together with its current text for later validation."""
+        self._nodes[parts] = (node, tree_node_text(node))
+
+    def invalidate(self, parts=()):
+        """Drop the node at parts and all nodes below it. An empty path drops all nodes."""
+        size = len(parts)
+        for cached in [cached for cached in self._nodes if cached[:size] == parts]:
+            del self._nodes[cached]
+
+    def resolve(self, tree, parts):
+        """Resolve the node at parts, walking only from the longest valid cached prefix."""
+        node = None
+        resolved = len(parts)
+        while resolved > 0:
+            node = self.get(parts[:resolved])
+            if node is not None:
+                break
+            resolved -= 1
+        if node is None:
+            node = tree.get_item('\\' + parts[0])
+            resolved = 1
+            self.put(parts[:1], node)
+        for depth in range(resolved, len(parts)):
+            # Expanding is sometimes required for the tree view to load the branch.
+            node.expand()
+            node = node.get_child(parts[depth])
+            self.put(parts[:depth + 1], node)
+        return node
@@ -0,0 +1,159 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# Bulk readers of the values served by the UI snapshot, per kind of control.
+SNAPSHOT_FIELDS = {
+    "control": {
+        "text": lambda wrapper: wrapper.window_text(),
+        "friendly_class_name": lambda wrapper: wrapper.friendly_class_name(),
+    },
+    "combobox": {
+        "items": lambda wrapper: wrapper.item_texts(),
+        "item_count": lambda wrapper: wrapper.item_count(),
+        "selected_index": lambda wrapper: wrapper.selected_index(),
+        "selected_value": lambda wrapper: wrapper.texts()[0],
+    },
+    "editbox": {
+        # The text isn't part of the bulk read: it can be large, so it is only read and kept when asked for.
+        "line_count": lambda wrapper: wrapper.line_count(),
+    },
+    "listbox": {
+        "items": lambda wrapper: wrapper.item_texts(),
+        "item_count": lambda wrapper: wrapper.item_count(),
+        "selected_indices": lambda wrapper: wrapper.selected_indices(),
+    },
+    "listview": {
+        "column_count": lambda wrapper: wrapper.column_count(),
+        "item_count": lambda wrapper: wrapper.item_count(),
+        "header_texts": lambda wrapper: [column["text"] for column in wrapper.columns()],
+        "selected_count": lambda wrapper: wrapper.get_selected_count(),
+    },
+    "statusbar": {
+        "part_count": lambda wrapper: wrapper.part_count(),
+        "texts": lambda wrapper: wrapper.texts(),
+    },
+    "tab": {
+        "tab_count": lambda wrapper: wrapper.tab_count(),
+        "selected_tab": lambda wrapper: wrapper.get_selected_tab(),
+        "texts": lambda wrapper: wrapper.texts(),
+    },
+    "toolbar": {
+        "button_count": lambda wrapper: wrapper.button_count(),
+    },
+    "tree": {
+        "texts": lambda wrapper: wrapper.texts(),
+    },
+}
+
+# Keywords that don't change the UI. Any other keyword of the library invalidates the snapshot
+# and the prefetched properties.
+READ_ONLY_KEYWORDS = frozenset({
+    "begin_ui_snapshot", "end_ui_snapshot", "begin_property_prefetch", "end_property_prefetch",
+    "get_control_text", "control_exists", "count_controls", "control_is_active", "control_is_visible",
+    "control_is_enabled", "control_has_focus", "control_is_checkbox", "control_is_button",
+    "control_is_radiobutton", "control_is_groupbox", "control_is_edit", "control_is_checked",
+    "control_is_unchecked", "control_is_indeterminate",
+    "get_combobox_items", "get_combobox_item_count", "get_combobox_selected_index", "get_combobox_selected_value",
+    "get_editbox_line_count", "get_editbox_line_text", "get_editbox_text", "get_editbox_lines",
+    "export_editbox_text", "search_editbox_text",
+    "get_listbox_items", "get_listbox_item_count", "get_listbox_selected_index", "get_listbox_selected_value",
+    "get_listview_column_count", "get_listview_item_count", "listview_header_text", "get_listview_data",
+    "listview_get_selected_count", "listview_index_is_selected", "listview_index_is_not_selected",
+    "listview_index_is_checked", "listview_index_is_not_checked",
+    "get_statusbar_part_count", "get_statusbar_part_text", "get_statusbar_text",
+    "get_tab_count", "get_selected_tab_index", "get_tab_text", "get_all_tab_texts",
+    "get_toolbar_button_count", "get_toolbar_button_text", "get_tree_text", "get_menu_structure",
+    "capture_control_screenshot", "capture_dialog_screenshot", "find_image_in_control",
+    "get_poll_statistics", "get_prefetch_statistics", "get_backend_statistics",
+    "get_dialog_resolution_statistics", "get_dialog_watcher_statistics",
+    "get_control_text_async", "get_editbox_text_async", "get_statusbar_text_async",
+    "dump_flight_recorder", "get_flight_recorder_statistics",
+})
+
+
+def keyword_method_name(keyword_name):
+    """Get the method name of a keyword name as reported to listeners, e.g. Get Tab Text -> get_tab_text."""
+    return keyword_name.strip().lower().replace(" ", "_")
+
+
+class UISnapshot:
+    """Memoizes reads of controls while the UI is known not to change.
+
+    While active, the first read of a control reads all the values of its kind at once and later reads
+    are served from them. Values that aren't part of the bulk read are read once and kept as well.
+    invalidate() drops everything read so far; it must be called whenever the UI may have changed."""
+
+    def __init__(self):
+        self.hits = 0
+        self.bulk_reads = 0
+        self.invalidations = 0
+        self._controls = None
+
+    @property
+    def active(self):
+        """Whether reads are currently memoized."""
+        return self._controls is not None
+
+    def begin(self):
+        """Start memoizing reads, dropping any values read before."""
+        self._controls = {}
+
+    def end(self):
+        """Stop memoizing reads."""
+        self._controls = None
+
+    def invalidate(self):
+        """Drop the values read so far, keeping the snapshot active."""
+        if self._controls:
+            self.invalidations += 1
+        if self._controls is not None:
+            self._controls = {}
+
+    def get(self, control, kind, field, resolve, read):
+        """Get a value of a control, from the snapshot if one is active or by calling read.
+
+        resolve returns the wrapper of the control for the bulk read of its kind."""
+        if self._controls is None:
+            return read()
+        values = self._controls.get((control, kind))
+        if values is None:
+            values = self._controls[(control, kind)] = self._bulk_read(kind, resolve())
+        if field in values:
+            self.hits += 1
+        else:
+            values[field] = read()
+        return values[field]
+
+    def _bulk_read(self, kind, wrapper):
+        """Read all the values of a control of a kind. Values the control doesn't support are left out
+        and read on demand, so the error surfaces from the keyword that asks for them."""
+        self.bulk_reads += 1
+        values = {}
+        for field, read in SNAPSHOT_FIELDS[kind].items():
+            try:
+                values[field] = read(wrapper)
+            except Exception:
+                pass
+        return values
+
+    def statistics(self):
+        """Get the number of memoized reads, bulk reads and invalidations."""
+        return {"hits": self.hits, "bulk_reads": self.bulk_reads, "invalidations": self.invalidations,
+                "active": self.active}
@@ -0,0 +1,104 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import functools
+import re
+import threading
+import time
+
+from pywinauto.backend import registry
+
+
+@functools.lru_cache(maxsize=256)
+def compile_title_regex(title_re):
+    """Compile a window title regex, reusing the compiled pattern for repeated lookups."""
+    return re.compile(title_re)
+
+
+class WindowEntry:
+    """A top-level window of a snapshot. The title is read on first use and then kept."""
+
+    __slots__ = ("element_info", "process_id", "_title")
+
+    def __init__(self, element_info):
+        self.element_info = element_info
+        self.process_id = element_info.process_id
+        self._title = None
+
+    @property
+    def handle(self):
+        """The window handle."""
+        return self.element_info.handle
+
+    @property
+    def title(self):
+        """The window title."""
+        if self._title is None:
+            self._title = self.element_info.name or ""
+        return self._title
+
+    def is_visible(self):
+        """Check whether the window is visible."""
+        return self.element_info.visible
+
+
+class WindowSnapshot:
+    """Shared list of top-level windows, enumerated at most once per ttl seconds for each backend."""
+
+    def __init__(self, ttl=0.05):
+        self.ttl = float(ttl)
+        self.enumerations = 0
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def windows(self, backend="win32", refresh=False):
+        """Get the top-level windows, enumerating them again if the snapshot is older than the ttl."""
+        with self._lock:
+            taken, entries = self._snapshots.get(backend, (None, None))
+            now = time.monotonic()
+            if refresh or entries is None or now - taken > self.ttl:
+                root = registry.backends[backend].element_info_class()
+                entries = [WindowEntry(element_info) for element_info in root.children()]
+                self._snapshots[backend] = (now, entries)
+                self.enumerations += 1
+            return entries
+
+    def find(self, backend="win32", title=None, title_re=None, process=None, visible_only=True, refresh=False):
+        """Get the windows matching the criteria in the current snapshot.
+
+        The cheap process filter is applied before the titles are read and matched."""
+        pattern = compile_title_regex(title_re) if title_re is not None else None
+        matches = []
+        for entry in self.windows(backend, refresh):
+            if process is not None and entry.process_id != process:
+                continue
+            if title is not None and entry.title != title:
+                continue
+            if pattern is not None and not pattern.match(entry.title):
+                continue
+            if visible_only and not entry.is_visible():
+                continue
+            matches.append(entry)
+        return matches
+
+    def invalidate(self):
+        """Drop all snapshots so the next lookup enumerates the windows again."""
+        with self._lock:
+            self._snapshots = {}
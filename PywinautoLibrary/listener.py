@@ -0,0 +1,79 @@
+# MIT License
+# Copyright (c) 2024 Anoop G R
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from robot.libraries.BuiltIn import BuiltIn
+
+from .keywords.ui_snapshot import READ_ONLY_KEYWORDS, keyword_method_name
+
+
+class LibraryListener:
+    """Robot Framework listener registered by PywinautoLibrary to react to its own keywords."""
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, library):
+        self.library = library
+        # Whether each library name seen in the current suite refers to this library instance.
+        self._names = {}
+
+    def _is_own(self, attrs):
+        """Check whether a keyword belongs to this library instance, whatever name it was imported with,
+        e.g. with an alias or by path, and even if the library is imported more than once."""
+        name = attrs.get("libname")
+        if not name:
+            return False
+        own = self._names.get(name)
+        if own is None:
+            try:
+                own = BuiltIn().get_library_instance(name) is self.library
+            except RuntimeError:
+                own = False
+            self._names[name] = own
+        return own
+
+    def start_suite(self, name, attrs):
+        """Forget the library names, which may refer to other libraries in another suite."""
+        self._names = {}
+
+    def start_keyword(self, name, attrs):
+        """Record the keyword in the flight recorder and invalidate the UI snapshot and the prefetched
+        properties before any keyword of the library that may change the UI."""
+        if not self._is_own(attrs):
+            return
+        self.library._record_keyword_start(attrs["kwname"], attrs["args"])
+        if keyword_method_name(attrs["kwname"]) not in READ_ONLY_KEYWORDS:
+            self.library.ui_snapshot.invalidate()
+            self.library.prefetcher.invalidate()
+
+    def end_keyword(self, name, attrs):
+        """Record the outcome of the keyword, and dump the flight recorder and capture a screenshot
+        when a keyword of the library fails. A failed keyword also reports the dialog watcher's failure."""
+        if not self._is_own(attrs):
+            return
+        self.library.flight_recorder.end(attrs["status"])
+        if attrs["status"] == "FAIL":
+            self.library.dialog_watcher.keyword_failed()
+            self.library._dump_flight_recorder_on_failure()
+            self.library._capture_failure_screenshot()
+
+    def close(self):
+        """Write the queued screenshots and stop the async thread pool when the library goes out of scope."""
+        self.library.screenshots.close()
+        self.library.async_runner.close()
@@ -9,9 +9,15 @@ setup(
     url='https://github.com/AnoopGR/robotframework-pywinautolibrary',
     packages=find_packages(),
     install_requires=[
-        'robotframework',
+        'robotframework>=7.1',
         'pywinauto'
     ],
+    extras_require={
+        'images': [
+            'numpy',
+            'Pillow'
+        ]
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
@@ -0,0 +1,72 @@
+"""Stand-ins for the Windows-only modules pywinauto and the library import, so that the keyword classes
+can be imported and tested on any platform. The real modules are used wherever they can be imported;
+tests replace the functions they rely on with monkeypatch."""
+import importlib
+import sys
+import types
+
+
+class _NotConnected:
+    """Placeholder for pywinauto.Application, which tests replace with a fake."""
+
+    def __init__(self, backend="win32"):
+        self.backend = types.SimpleNamespace(name=backend)
+
+
+class _ElementNotFoundError(Exception):
+    pass
+
+
+class _ElementAmbiguousError(Exception):
+    pass
+
+
+class _ProcessNotFoundError(Exception):
+    pass
+
+
+def _no_op(*args, **kwargs):
+    return None
+
+
+STUBS = {
+    "pywinauto.findwindows": {"ElementNotFoundError": _ElementNotFoundError,
+                              "ElementAmbiguousError": _ElementAmbiguousError},
+    "pywinauto.handleprops": {"iswindow": lambda handle: False, "processid": lambda handle: 0,
+                              "classname": lambda handle: "", "is64bitprocess": lambda process: True},
+    "pywinauto.application": {"ProcessNotFoundError": _ProcessNotFoundError, "process_get_modules": lambda: [],
+                              "process_module": lambda process: ""},
+    "pywinauto.backend": {"registry": types.SimpleNamespace(backends={})},
+    "pywinauto.mouse": {"__getattr__": lambda name: _no_op},
+    "pywinauto.keyboard": {"send_keys": _no_op},
+    "pywinauto.remote_memory_block": {"RemoteMemoryBlock": None},
+    "pywinauto.sysinfo": {"is_x64_Python": lambda: True},
+    "pywinauto.win32structures": {"LVITEMW": None, "LVITEMW32": None},
+    "pywinauto.uia_defines": {"IUIA": None, "NoPatternInterfaceError": type("NoPatternInterfaceError", (Exception,), {}),
+                              "get_elem_interface": _no_op},
+    "pywinauto.uia_element_info": {"UIAElementInfo": None},
+    "win32gui": {"__getattr__": lambda name: _no_op},
+    "comtypes": {"CoInitializeEx": _no_op, "COINIT_MULTITHREADED": 0},
+}
+
+
+def _install_stubs():
+    import pywinauto
+
+    for name, attributes in STUBS.items():
+        try:
+            importlib.import_module(name)
+            continue
+        except Exception:
+            pass
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        sys.modules[name] = module
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+    if not hasattr(pywinauto, "Application"):
+        pywinauto.Application = _NotConnected
+
+
+_install_stubs()
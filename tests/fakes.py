@@ -0,0 +1,124 @@
+"""Fake pywinauto applications, window specifications and wrappers shared by the keyword tests."""
+import types
+
+from PywinautoLibrary.keywords.prefetch import UIA_PROPERTY_IDS
+
+
+class FakeWrapper:
+    """A resolved control or window. Keyword arguments become attributes; methods are added by tests."""
+
+    def __init__(self, handle=0, backend="win32", **attributes):
+        self.handle = handle
+        self.backend = types.SimpleNamespace(name=backend)
+        self.element_info = types.SimpleNamespace(handle=handle, control_type=None)
+        self.__dict__.update(attributes)
+
+
+class FakeSpecification:
+    """A window specification resolving to a wrapper. Controls are looked up in a dictionary."""
+
+    def __init__(self, wrapper, controls=None, present=True):
+        self.wrapper = wrapper
+        self.controls = controls if controls is not None else {}
+        self.present = present
+        self.lookups = []
+
+    @property
+    def handle(self):
+        return self.wrapper.handle
+
+    @property
+    def backend(self):
+        return self.wrapper.backend
+
+    def wrapper_object(self):
+        return self.wrapper
+
+    def exists(self, timeout=None):
+        return self.present
+
+    def __getitem__(self, name):
+        self.lookups.append(name)
+        return self.controls[name]
+
+    def __getattr__(self, name):
+        return getattr(self.wrapper, name)
+
+
+class FakeApplication:
+    """An application with windows keyed by handle."""
+
+    def __init__(self, windows=None, process=42, backend="win32"):
+        self.windows = windows if windows is not None else {}
+        self.process = process
+        self.backend = types.SimpleNamespace(name=backend)
+
+    def window(self, handle):
+        return self.windows[handle]
+
+
+class FakeWindowSnapshot:
+    """Window snapshot returning the entries of the handles listed in windows, with titles."""
+
+    def __init__(self, titles=None):
+        self.titles = titles if titles is not None else {}
+        self.refreshes = 0
+
+    def find(self, backend="win32", title=None, title_re=None, process=None, visible_only=True, refresh=False):
+        self.refreshes += bool(refresh)
+        return [types.SimpleNamespace(handle=handle, title=text) for handle, text in self.titles.items()
+                if (title is None or text == title) and (title_re is None or text.startswith(title_re))]
+
+    def invalidate(self):
+        pass
+
+
+class FakeUIAElement:
+    """UI Automation element with cached properties, content and list item by default, and cached children."""
+
+    def __init__(self, name="", children=(), realizable=False, **properties):
+        self.name = name
+        self.children = list(children)
+        self.realizable = realizable
+        self.realized = False
+        self.cache_builds = []
+        self.properties = {"name": name, "is_content_element": True, "control_type": 50007}
+        self.properties.update(properties)
+
+    def GetCachedPropertyValue(self, property_id):
+        return {UIA_PROPERTY_IDS[name]: value for name, value in self.properties.items()}.get(property_id)
+
+    def BuildUpdatedCache(self, request):
+        self.cache_builds.append(request.TreeScope)
+        return self
+
+    def GetCachedChildren(self):
+        return types.SimpleNamespace(Length=len(self.children), GetElement=self.children.__getitem__)
+
+    def FindAllBuildCache(self, scope, condition, request):
+        elements = [self]
+        for element in elements:
+            elements.extend(element.children)
+        return types.SimpleNamespace(Length=len(elements), GetElement=elements.__getitem__)
+
+
+class FakeCacheRequest:
+    TreeScope = None
+
+    def AddProperty(self, property_id):
+        pass
+
+
+class NotSupported:
+    """Type of UI Automation's not-supported sentinel, returned for properties an element doesn't support."""
+
+
+NOT_SUPPORTED = NotSupported()
+
+
+class FakeIUIA:
+    """Stand-in for pywinauto's IUIA singleton, creating fake cache requests."""
+
+    iuia = types.SimpleNamespace(CreateCacheRequest=FakeCacheRequest, ReservedNotSupportedValue=NOT_SUPPORTED)
+    true_condition = True
+    known_control_types = {"Header": 50034}
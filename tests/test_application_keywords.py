@@ -0,0 +1,103 @@
+import pytest
+
+from fakes import FakeWindowSnapshot
+from pywinauto.application import ProcessNotFoundError
+from pywinauto.findwindows import ElementAmbiguousError, ElementNotFoundError
+from PywinautoLibrary.keywords import application_keywords
+from PywinautoLibrary.keywords.application_keywords import ApplicationKeywords
+
+
+class FakeApplication:
+    """Application recording how it was connected or started. running holds the executables it can connect to."""
+
+    running = []
+
+    def __init__(self, backend="win32"):
+        self.backend = backend
+        self.connected = None
+        self.started = None
+
+    def connect(self, **criteria):
+        if "path" in criteria and criteria["path"] not in self.running:
+            raise ProcessNotFoundError(criteria["path"])
+        self.connected = criteria
+        return self
+
+    def start(self, command_line):
+        self.started = command_line
+        return self
+
+
+@pytest.fixture
+def keywords(monkeypatch):
+    FakeApplication.running = []
+    monkeypatch.setattr(application_keywords, "Application", FakeApplication)
+    return ApplicationKeywords(FakeWindowSnapshot({0x10: "Notepad - Untitled", 0x20: "Notepad - notes.txt",
+                                                   0x30: "Calculator"}))
+
+
+def test_connect_by_pid(keywords):
+    assert keywords.connect_to_application(pid="1234").connected == {"process": 1234}
+
+
+@pytest.mark.parametrize("handle, expected", [("0x1A2B", 0x1A2B), ("0X00ff", 0xFF), ("0123", 123), ("66", 66),
+                                              (0x20, 0x20)])
+def test_connect_by_handle(keywords, handle, expected):
+    assert keywords.connect_to_application(handle=handle).connected == {"handle": expected}
+
+
+def test_connect_by_path(keywords):
+    FakeApplication.running = [r"C:\Windows\notepad.exe"]
+    assert keywords.connect_to_application(path=r"C:\Windows\notepad.exe").connected == {
+        "path": r"C:\Windows\notepad.exe"}
+
+
+def test_connect_by_process_name(keywords, monkeypatch):
+    monkeypatch.setattr(application_keywords, "process_get_modules",
+                        lambda: [(5, "C:/Windows/explorer.exe", ""), (7, "C:/Windows/notepad.exe", "")])
+    assert keywords.connect_to_application(process="Notepad.exe").connected == {"process": 7}
+    with pytest.raises(ProcessNotFoundError):
+        keywords.connect_to_application(process="calc.exe")
+
+
+def test_connect_by_title(keywords):
+    assert keywords.connect_to_application("Calc").connected == {"handle": 0x30}
+    with pytest.raises(ElementNotFoundError):
+        keywords.connect_to_application("Paint")
+
+
+def test_connect_by_ambiguous_title_fails(keywords):
+    with pytest.raises(ElementAmbiguousError, match="2 windows match"):
+        keywords.connect_to_application("Notepad")
+
+
+def test_connect_needs_exactly_one_selector(keywords):
+    with pytest.raises(ValueError):
+        keywords.connect_to_application("Calc", pid=1)
+    with pytest.raises(ValueError):
+        keywords.connect_to_application()
+
+
+@pytest.mark.parametrize("command_line, executable", [
+    ("notepad.exe notes.txt", "notepad.exe"),
+    ('"C:\\Program Files\\App\\app.exe" /safe', "C:\\Program Files\\App\\app.exe"),
+    ("notepad.exe", "notepad.exe"),
+])
+def test_connect_or_launch_connects_to_the_executable_of_a_command_line(keywords, command_line, executable):
+    FakeApplication.running = [executable]
+    app = keywords.connect_or_launch(command_line)
+    assert app.connected == {"path": executable}
+    assert app.started is None
+
+
+def test_connect_or_launch_finds_unquoted_executable_with_spaces(keywords, tmp_path):
+    executable = tmp_path / "My App" / "app.exe"
+    executable.parent.mkdir()
+    executable.write_text("")
+    FakeApplication.running = [str(executable)]
+    assert keywords.connect_or_launch(f"{executable} --verbose").connected == {"path": str(executable)}
+
+
+def test_connect_or_launch_launches_with_the_arguments(keywords):
+    app = keywords.connect_or_launch("notepad.exe notes.txt")
+    assert app.started == "notepad.exe notes.txt"
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from PywinautoLibrary.keywords.async_runner import AsyncRunner
+from PywinautoLibrary.keywords.poll_scheduler import PollScheduler, WaitCancelledError
+
+
+@pytest.fixture
+def runner():
+    runner = AsyncRunner(PollScheduler(min_interval=0.01, max_interval=0.05))
+    yield runner
+    runner.close()
+
+
+def test_concurrent_waits_are_awaited_together(runner):
+    scheduler = runner.poll_scheduler
+    ready = {"client": threading.Event(), "server": threading.Event()}
+    for event in ready.values():
+        threading.Timer(0.05, event.set).start()
+
+    async def main():
+        return await asyncio.gather(*(runner.run(scheduler.wait, lambda name=name: ready[name].is_set() and name, 2)
+                                      for name in ready))
+
+    assert asyncio.run(main()) == ["client", "server"]
+
+
+def test_cancelled_task_ends_its_wait(runner):
+    scheduler = runner.poll_scheduler
+    outcome = []
+
+    def wait():
+        try:
+            scheduler.wait(lambda: False, 30, "never")
+        except WaitCancelledError as error:
+            outcome.append(error)
+            raise
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(runner.run(wait), 0.1)
+
+    started = time.monotonic()
+    asyncio.run(main())
+    while not outcome and time.monotonic() - started < 5:
+        time.sleep(0.01)
+    assert len(outcome) == 1
+    # The wait would poll for 30 seconds if the cancellation didn't reach it.
+    assert time.monotonic() - started < 1
+    assert scheduler._waiters == []
+
+
+def test_errors_are_raised_to_the_awaiting_task(runner):
+    def fail():
+        raise ValueError("no such control")
+
+    with pytest.raises(ValueError, match="no such control"):
+        asyncio.run(runner.run(fail))
@@ -0,0 +1,36 @@
+import types
+
+from fakes import FakeSpecification, FakeWrapper
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+
+
+def _element(name, automation_id=""):
+    return types.SimpleNamespace(name=name, automation_id=automation_id, class_name="Button")
+
+
+def _keywords(names, controls=None):
+    dialog = FakeWrapper(handle=1)
+    dialog.element_info.descendants = lambda: [_element(*name) for name in names]
+    return ControlKeywords(FakeSpecification(dialog, controls))
+
+
+def test_exact_text_or_automation_id_is_found_without_best_match():
+    keywords = _keywords([("Cancel",), ("OK", "okButton")])
+    assert keywords.control_exists("OK")
+    assert keywords.control_exists("okButton")
+    assert keywords.dlg.lookups == []
+
+
+def test_fuzzy_name_falls_back_to_best_match():
+    timeouts = []
+
+    class Control(FakeSpecification):
+        def exists(self, timeout=None):
+            timeouts.append(timeout)
+            return self.present
+
+    keywords = _keywords([("OK",)], {"OKButton": Control(FakeWrapper()), "Edit2": Control(FakeWrapper(), present=False)})
+    assert keywords.control_exists("OKButton")
+    assert not keywords.control_exists("Edit2", timeout="0.5")
+    assert keywords.dlg.lookups == ["OKButton", "Edit2"]
+    assert timeouts == [0.0, 0.5]
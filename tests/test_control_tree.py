@@ -0,0 +1,119 @@
+from collections import namedtuple
+
+from PywinautoLibrary.keywords.control_tree import (ControlNode, build_control_tree, compare_control_trees,
+                                                    control_identifiers, read_control_tree, structure_fingerprint,
+                                                    write_control_tree)
+
+Rect = namedtuple("Rect", "left top right bottom")
+
+
+class FakeElementInfo:
+    def __init__(self, class_name, name="", handle=0, rect=(0, 0, 10, 10), children=()):
+        self.class_name = class_name
+        self.name = name
+        self.handle = handle
+        self.automation_id = ""
+        self.control_id = None
+        self.rectangle = Rect(*rect)
+        self._children = list(children)
+
+    def children(self):
+        return self._children
+
+    def descendants(self):
+        found = []
+        for child in self._children:
+            found.append(child)
+            found.extend(child.descendants())
+        return found
+
+
+def _dialog():
+    ok = FakeElementInfo("Button", "OK", 2)
+    return FakeElementInfo("#32770", "Dialog", 1, children=[FakeElementInfo("Edit", "", 3), ok]), ok
+
+
+def test_build_control_tree_depth():
+    dialog, _ = _dialog()
+    assert [child.class_name for child in build_control_tree(dialog).children] == ["Edit", "Button"]
+    assert build_control_tree(dialog, depth=0).children == []
+
+
+def test_fingerprint_changes_with_text_and_rectangle():
+    dialog, ok = _dialog()
+    fingerprint = structure_fingerprint(dialog)
+    assert structure_fingerprint(dialog) == fingerprint
+    ok.name = "Cancel"
+    renamed = structure_fingerprint(dialog)
+    assert renamed != fingerprint
+    ok.rectangle = Rect(5, 5, 20, 20)
+    assert structure_fingerprint(dialog) != renamed
+
+
+def test_compare_control_trees_by_identity():
+    old = ControlNode("#32770", "v1", "", None, (0, 0, 1, 1), children=[
+        ControlNode("Button", "OK", "", 1, (0, 0, 1, 1)),
+        ControlNode("Edit", "a", "name", None, (0, 0, 1, 1))])
+    new = ControlNode("#32770", "v2", "", None, (0, 0, 1, 1), children=[
+        ControlNode("Static", "Label", "", None, (0, 0, 1, 1)),
+        ControlNode("Edit", "b", "name", None, (0, 0, 1, 1))])
+    diff = compare_control_trees(old, new)
+    assert diff["added"] == ["#32770/Static[Label]"]
+    assert diff["removed"] == ["#32770/Button[1]"]
+    assert {(change["control"], change["field"]) for change in diff["changed"]} == {
+        ("#32770", "text"), ("#32770/Edit[name]", "text")}
+
+
+def test_write_and_read_control_tree(tmp_path):
+    dialog, _ = _dialog()
+    tree = build_control_tree(dialog)
+    path = tmp_path / "tree.json"
+    write_control_tree(tree, str(path))
+    assert read_control_tree(str(path)).to_dict() == tree.to_dict()
+    write_control_tree(tree, str(tmp_path / "tree.jsonl"), "jsonl")
+    assert len((tmp_path / "tree.jsonl").read_text().splitlines()) == 3
+
+
+class UnhashableElementInfo(FakeElementInfo):
+    """Like pywinauto's element infos, which define __eq__ without __hash__."""
+
+    def __eq__(self, other):
+        return isinstance(other, UnhashableElementInfo) and self.handle == other.handle
+
+    __hash__ = None
+
+
+class FakeControl:
+    can_be_label = True
+    has_title = True
+
+    def __init__(self, element_info, friendly_class_name, children=()):
+        self.element_info = element_info
+        self._friendly_class_name = friendly_class_name
+        self._children = list(children)
+
+    def window_text(self):
+        return self.element_info.name
+
+    def texts(self):
+        return [self.element_info.name]
+
+    def friendly_class_name(self):
+        return self._friendly_class_name
+
+    def is_visible(self):
+        return True
+
+    def descendants(self):
+        return self._children
+
+
+def test_control_identifiers_of_unhashable_element_infos():
+    ok = UnhashableElementInfo("Button", "OK", 2)
+    dialog = UnhashableElementInfo("#32770", "Dialog", 1, children=[ok])
+    wrapper = FakeControl(dialog, "Dialog", [FakeControl(ok, "Button")])
+    names = control_identifiers(wrapper)
+    assert "OKButton" in names[2]
+    tree = build_control_tree(dialog, identifiers=names)
+    assert "OKButton" in tree.children[0].identifiers
+    assert "Dialog" in tree.identifiers
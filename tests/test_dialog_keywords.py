@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+
+from fakes import FakeApplication, FakeSpecification, FakeWindowSnapshot, FakeWrapper
+from pywinauto.findwindows import ElementNotFoundError
+from PywinautoLibrary.keywords import control_keywords, dialog_keywords
+from PywinautoLibrary.keywords.poll_scheduler import PollScheduler
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    """The live window handles of the fake application."""
+    alive = set()
+    monkeypatch.setattr(dialog_keywords.handleprops, "iswindow", lambda handle: handle in alive)
+    monkeypatch.setattr(dialog_keywords.handleprops, "processid", lambda handle: 42)
+    return alive
+
+
+def _dialogs(windows, titles):
+    specifications = {handle: FakeSpecification(FakeWrapper(handle)) for handle in titles}
+    snapshot = FakeWindowSnapshot(dict(titles))
+    scheduler = PollScheduler(min_interval=0.01)
+    dialogs = dialog_keywords.DialogKeywords(FakeApplication(specifications), window_snapshot=snapshot,
+                                             poll_scheduler=scheduler)
+    windows.update(titles)
+    return dialogs, snapshot, scheduler
+
+
+def _control_keywords(dialogs, scheduler):
+    controls = control_keywords.ControlKeywords(dialogs.dlg, poll_scheduler=scheduler)
+    dialogs.on_dialog_change = controls.set_dialog
+    controls.lookup_hooks.append(dialogs.refresh_dialog)
+    return controls
+
+
+def _run(function, timeout=5):
+    """Run function in a thread, failing instead of hanging if it doesn't return."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", function()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "the call did not return"
+    return result.get("value")
+
+
+def test_get_dialog_resolves_once_and_reuses(windows):
+    dialogs, _, _ = _dialogs(windows, {1: "Editor"})
+    dialogs.get_dialog("Editor")
+    assert dialogs.active_handle() == 1
+    assert dialogs._dialog().handle == 1
+    assert dialogs.dialog_reuses == 1
+
+
+def test_control_lookup_in_a_scheduler_condition_follows_a_recreated_dialog(windows):
+    dialogs, snapshot, scheduler = _dialogs(windows, {1: "Editor"})
+    dialogs.get_dialog("Editor")
+    controls = _control_keywords(dialogs, scheduler)
+    # The application destroys the dialog and creates it again with a new handle.
+    windows.discard(1)
+    windows.add(2)
+    dialogs.app.windows[2] = FakeSpecification(FakeWrapper(2))
+    snapshot.titles = {1: "Editor", 2: "Editor"}
+
+    handle = _run(lambda: scheduler.wait(lambda: controls.dlg.handle, 1))
+    assert handle == 2
+    assert dialogs.active_handle() == 2
+    assert dialogs.dialog_re_resolutions == 1
+
+
+def test_destroyed_dialog_without_replacement_is_kept(windows):
+    dialogs, snapshot, scheduler = _dialogs(windows, {1: "Editor"})
+    dialogs.get_dialog("Editor")
+    controls = _control_keywords(dialogs, scheduler)
+    windows.discard(1)
+    snapshot.titles = {}
+
+    assert _run(lambda: scheduler.wait(lambda: controls.dlg.handle, 1)) == 1
+    assert dialogs.dialog_re_resolutions == 0
+
+
+def test_live_dialog_is_not_looked_up_again(windows):
+    dialogs, snapshot, scheduler = _dialogs(windows, {1: "Editor"})
+    dialogs.get_dialog("Editor")
+    controls = _control_keywords(dialogs, scheduler)
+    controls.dlg
+    assert snapshot.refreshes == 0
+
+
+def test_wait_for_any_dialog_returns_the_matching_regex(windows):
+    dialogs, snapshot, _ = _dialogs(windows, {1: "Editor", 2: "Saved"})
+    assert dialogs.wait_for_any_dialog("Error", "Saved", timeout=1) == "Saved"
+    assert dialogs.active_handle() == 2
+    assert dialogs.active_criteria() == {"title_re": "Saved"}
+
+
+def test_wait_for_any_dialog_polls_until_one_appears(windows):
+    dialogs, snapshot, _ = _dialogs(windows, {1: "Editor", 3: "Error: disk full"})
+    snapshot.titles = {1: "Editor"}
+    timer = threading.Timer(0.1, lambda: snapshot.titles.update({3: "Error: disk full"}))
+    timer.start()
+    try:
+        assert dialogs.wait_for_any_dialog("Saved", "Error", timeout=2) == "Error"
+    finally:
+        timer.cancel()
+    assert dialogs.active_handle() == 3
+
+
+def test_wait_for_any_dialog_times_out_with_all_criteria(windows):
+    dialogs, _, _ = _dialogs(windows, {1: "Editor"})
+    with pytest.raises(ElementNotFoundError) as error:
+        dialogs.wait_for_any_dialog("Saved", "Error", timeout=0.1)
+    assert error.value.args[0] == {"any_of": [{"title_re": "Saved"}, {"title_re": "Error"}]}
+    with pytest.raises(ValueError):
+        dialogs.wait_for_any_dialog()
+
+
+def test_pop_dialog_returns_to_the_kept_dialog_and_lookup_state(windows):
+    dialogs, _, scheduler = _dialogs(windows, {1: "Editor", 2: "Options"})
+    dialogs.get_dialog("Editor")
+    controls = _control_keywords(dialogs, scheduler)
+    controls._item_indexes[("listbox", "Files")] = "index built for Editor"
+    dialogs.push_dialog("Options", controls.lookup_state())
+    controls.set_dialog(dialogs.dlg)
+    assert dialogs.active_handle() == 2
+    assert controls._item_indexes == {}
+
+    controls.restore_lookup_state(dialogs.pop_dialog())
+    assert dialogs.active_handle() == 1
+    assert controls._item_indexes == {("listbox", "Files"): "index built for Editor"}
+    assert dialogs.dialog_re_resolutions == 0
+
+
+def test_pop_dialog_looks_a_destroyed_dialog_up_again(windows):
+    dialogs, snapshot, _ = _dialogs(windows, {1: "Editor", 2: "Options"})
+    dialogs.get_dialog("Editor")
+    dialogs.push_dialog("Options", "lookup state")
+    # The application recreates the main window while the modal dialog is open.
+    windows.discard(1)
+    windows.add(3)
+    dialogs.app.windows[3] = FakeSpecification(FakeWrapper(3))
+    snapshot.titles = {2: "Options", 3: "Editor"}
+    assert dialogs.pop_dialog() is None
+    assert dialogs.active_handle() == 3
+    assert dialogs.dialog_re_resolutions == 1
+
+
+def test_pop_dialog_without_push_fails(windows):
+    dialogs, _, _ = _dialogs(windows, {1: "Editor"})
+    with pytest.raises(RuntimeError, match="No dialog has been pushed"):
+        dialogs.pop_dialog()
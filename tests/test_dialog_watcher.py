@@ -0,0 +1,57 @@
+import threading
+import types
+
+import pytest
+
+from fakes import FakeWindowSnapshot
+from PywinautoLibrary.keywords.dialog_watcher import DialogRule, DialogWatcher, UnexpectedDialogError
+from PywinautoLibrary.keywords.poll_scheduler import PollScheduler
+
+
+def _fail(watcher):
+    """Let the watcher handle a new window matching a rule with the fail action."""
+    entry = types.SimpleNamespace(handle=7, title="Error", element_info=types.SimpleNamespace(class_name="#32770"))
+    watcher._handle(DialogRule("errors", title_re="Error", action="fail"), entry, None)
+
+
+def test_failure_stays_latched_until_a_failed_keyword_reports_it():
+    watcher = DialogWatcher(FakeWindowSnapshot())
+    watcher.check()
+    watcher.keyword_failed()
+    _fail(watcher)
+    for _ in range(2):
+        with pytest.raises(UnexpectedDialogError, match="'Error' matched watcher rule 'errors'"):
+            watcher.check()
+    watcher.keyword_failed()
+    watcher.check()
+
+
+def test_failure_not_raised_yet_is_kept_by_an_unrelated_failed_keyword():
+    watcher = DialogWatcher(FakeWindowSnapshot())
+    _fail(watcher)
+    watcher.keyword_failed()
+    with pytest.raises(UnexpectedDialogError):
+        watcher.check()
+
+
+def test_failure_during_scheduler_wait_fails_every_waiting_thread():
+    watcher = DialogWatcher(FakeWindowSnapshot())
+    scheduler = PollScheduler(min_interval=0.01, max_interval=0.01, snapshot_hooks=[watcher.check])
+    errors = {}
+
+    def wait(name):
+        try:
+            scheduler.wait(lambda: False, timeout=5, name=name)
+        except Exception as error:
+            errors[name] = error
+
+    # An async job drives the scheduler while the main keyword waits on it.
+    threads = [threading.Thread(target=wait, args=(name,), daemon=True) for name in ("job", "keyword")]
+    for thread in threads:
+        thread.start()
+    _fail(watcher)
+    for thread in threads:
+        thread.join(2)
+        assert not thread.is_alive()
+    assert {name: type(error) for name, error in errors.items()} == {"job": UnexpectedDialogError,
+                                                                      "keyword": UnexpectedDialogError}
@@ -0,0 +1,59 @@
+import hashlib
+
+import pytest
+
+from fakes import FakeSpecification, FakeWrapper
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+
+TEXT = "first\r\nsecond\r\n\r\nfourth line\r\nlast"
+LINES = ["first", "second", "", "fourth line", "last"]
+
+
+def _get_line(index):
+    raise AssertionError("lines must not be read one message at a time")
+
+
+@pytest.fixture
+def edit():
+    reads = []
+
+    def window_text():
+        reads.append(TEXT)
+        return TEXT
+
+    return FakeWrapper(handle=3, window_text=window_text, get_line=_get_line, line_count=lambda: len(LINES)), reads
+
+
+def _keywords(edit):
+    return ControlKeywords(FakeSpecification(FakeWrapper(handle=1), {"Edit": FakeSpecification(edit)}))
+
+
+@pytest.mark.parametrize("start, end, expected", [(0, None, LINES), (1, 3, LINES[1:3]), ("3", "10", LINES[3:]),
+                                                  (4, 2, []), (-2, 1, LINES[:1])])
+def test_line_ranges_are_split_from_one_read(edit, start, end, expected):
+    wrapper, reads = edit
+    assert _keywords(wrapper).get_editbox_lines("Edit", start, end) == expected
+    assert len(reads) == 1
+
+
+def test_rich_edit_and_bare_line_feeds_are_split():
+    edit = FakeWrapper(window_text=lambda: "one\rtwo\nthree\r\n")
+    assert _keywords(edit).get_editbox_lines("Edit") == ["one", "two", "three", ""]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_export_writes_lines_and_checksum(edit, tmp_path, chunk_size):
+    wrapper, reads = edit
+    path = tmp_path / "edit.txt"
+    line_count, checksum = _keywords(wrapper).export_editbox_text("Edit", str(path), chunk_size)
+    content = path.read_bytes()
+    assert content == "\n".join(LINES).encode()
+    assert (line_count, checksum) == (5, hashlib.sha256(content).hexdigest())
+    assert len(reads) == 1
+
+
+def test_search_returns_matching_line_indices(edit):
+    wrapper, _ = edit
+    keywords = _keywords(wrapper)
+    assert keywords.search_editbox_text("Edit", "^(first|last)$") == [0, 4]
+    assert keywords.search_editbox_text("Edit", "t", max_matches=2) == [0, 3]
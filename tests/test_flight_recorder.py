@@ -0,0 +1,86 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from fakes import FakeSpecification, FakeWrapper
+from PywinautoLibrary import listener
+from PywinautoLibrary.PywinautoLibrary import PywinautoLibrary
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+from PywinautoLibrary.keywords.flight_recorder import FlightRecorder
+
+
+def test_records_calls_in_order():
+    recorder = FlightRecorder()
+    recorder.start("Click", ["OK"], "Dialog", 0x1234)
+    recorder.end("PASS")
+    recorder.start("Type Text", ["Edit", "hello"], None, None)
+    records = recorder.records()
+    assert [record["keyword"] for record in records] == ["Click", "Type Text"]
+    assert records[0]["status"] == "PASS"
+    assert records[0]["args"] == ["OK"]
+    assert records[1]["status"] == "RUNNING"
+
+
+def test_ring_buffer_keeps_the_last_calls():
+    recorder = FlightRecorder(size=3)
+    for index in range(5):
+        recorder.start(f"Keyword {index}", [], None, None)
+        recorder.end("PASS")
+    assert [record["keyword"] for record in recorder.records()] == ["Keyword 2", "Keyword 3", "Keyword 4"]
+    assert recorder.statistics()["records"] == 5
+
+
+def test_dump_since_last_dump():
+    recorder = FlightRecorder()
+    recorder.start("Click", ["OK"], "Dialog", 0x10)
+    recorder.end("FAIL")
+    lines = recorder.dump()
+    assert len(lines) == 1
+    assert "FAIL" in lines[0] and "Click  OK" in lines[0] and "handle=0x10" in lines[0]
+    assert recorder.dump(since_last_dump=True) == []
+    recorder.start("Close", [], None, None)
+    assert len(recorder.dump(since_last_dump=True)) == 1
+
+
+def test_end_without_start_is_ignored():
+    recorder = FlightRecorder()
+    recorder.end("PASS")
+    assert recorder.records() == []
+    assert recorder.statistics()["overhead_us"] == 0.0
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        FlightRecorder(size=0)
+
+
+def test_control_resolved_by_the_call_is_recorded():
+    recorder = FlightRecorder()
+    keywords = ControlKeywords(FakeSpecification(FakeWrapper(handle=1), {
+        "OK": FakeSpecification(FakeWrapper(handle=0x20, element_info=SimpleNamespace(handle=0x20, class_name="Button"),
+                                            set_focus=lambda: None))}))
+    keywords.control_hooks.append(recorder.control)
+    recorder.start("Set Control Focus", ["OK"], "Dialog", 0x10)
+    keywords.set_control_focus("OK")
+    recorder.end("PASS")
+    recorder.start("Close", [], None, None)
+    records = recorder.records()
+    assert records[0]["control"] == {"handle": 0x20, "class_name": "Button", "backend": "win32"}
+    assert records[1]["control"] is None
+    assert "control=Button/win32@0x20" in recorder.dump()[0]
+
+
+def test_listener_round_trip_stays_in_the_microsecond_range(monkeypatch):
+    library = PywinautoLibrary()
+    monkeypatch.setattr(listener.BuiltIn, "get_library_instance", lambda self, name: library)
+    own = library.ROBOT_LIBRARY_LISTENER
+    attrs = {"libname": "PywinautoLibrary", "kwname": "Click Button", "args": ["OK"], "status": "PASS"}
+    calls = 2000
+    started = time.perf_counter()
+    for _ in range(calls):
+        own.start_keyword("PywinautoLibrary.Click Button", attrs)
+        own.end_keyword("PywinautoLibrary.Click Button", attrs)
+    round_trip_us = (time.perf_counter() - started) / calls * 1e6
+    assert library.flight_recorder.statistics()["records"] == calls
+    assert round_trip_us < 100, f"{round_trip_us:.1f} us per keyword"
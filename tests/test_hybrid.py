@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from PywinautoLibrary.keywords import hybrid
+from PywinautoLibrary.keywords.hybrid import BackendRouter, HybridDialog
+from fakes import FakeSpecification, FakeWrapper
+
+
+class SlowSpecification(FakeSpecification):
+    """Specification whose resolution takes a noticeable time."""
+
+    resolutions = 0
+
+    def wrapper_object(self):
+        self.resolutions += 1
+        time.sleep(0.05)
+        return self.wrapper
+
+
+@pytest.fixture(autouse=True)
+def classname(monkeypatch):
+    monkeypatch.setattr(hybrid.handleprops, "classname", lambda handle: "#32770")
+
+
+def _dialog(router, win32_controls, uia_controls):
+    return HybridDialog(FakeSpecification(FakeWrapper(handle=1), win32_controls),
+                        FakeSpecification(FakeWrapper(handle=1, backend="uia"), uia_controls), router)
+
+
+def _control(name, backend="win32", present=True, specification=FakeSpecification):
+    wrapper = FakeWrapper(backend=backend, window_text=lambda: name)
+    return specification(wrapper, present=present)
+
+
+def test_control_found_with_win32_is_routed_to_win32():
+    router = BackendRouter()
+    dialog = _dialog(router, {"OK": _control("OK")}, {"OK": _control("OK", "uia")})
+    assert dialog["OK"].wrapper_object().backend.name == "win32"
+    assert router.statistics()["routes"] == {"#32770/OK": "win32"}
+
+
+def test_control_only_found_with_uia_is_remembered():
+    router = BackendRouter()
+    win32_control = _control("Grid", present=False)
+    dialog = _dialog(router, {"Grid": win32_control}, {"Grid": _control("Grid", "uia")})
+    assert dialog["Grid"].window_text() == "Grid"
+    win32_control.present = True
+    assert dialog["Grid"].wrapper_object().backend.name == "uia"
+    assert router.statistics()["routes"] == {"#32770/Grid": "uia"}
+
+
+def test_control_missing_in_both_backends_is_not_remembered():
+    router = BackendRouter()
+    dialog = _dialog(router, {"Later": _control("Later", present=False)},
+                     {"Later": _control("Later", "uia", present=False)})
+    assert dialog["Later"].wrapper_object().backend.name == "win32"
+    assert router.routes == {}
+
+
+def test_one_lookup_is_counted_per_control_and_its_resolution_is_timed():
+    router = BackendRouter()
+    specification = _control("OK", specification=SlowSpecification)
+    dialog = _dialog(router, {"OK": specification}, {})
+    dialog["OK"]
+    probes = router.lookups["win32"]
+    control = dialog["OK"]
+    assert control.window_text() == "OK"
+    assert control.window_text() == "OK"
+    assert control.exists()
+    assert router.lookups["win32"] == probes + 1
+    assert router.lookup_time["win32"] >= 0.05
+    assert specification.resolutions == 1
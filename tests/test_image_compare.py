@@ -0,0 +1,27 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from PywinautoLibrary.keywords.image_compare import frame_array, frame_difference
+
+
+def test_frame_array_downsamples_to_max_side():
+    frame = frame_array(Image.new("RGB", (200, 100), "white"), max_side=64)
+    assert frame.shape == (32, 64)
+    assert frame.dtype == numpy.int16
+
+
+def test_frame_array_keeps_small_images():
+    assert frame_array(Image.new("L", (10, 20))).shape == (20, 10)
+
+
+def test_frame_difference():
+    black = frame_array(Image.new("L", (8, 8), 0))
+    white = frame_array(Image.new("L", (8, 8), 255))
+    assert frame_difference(black, black) == 0.0
+    assert frame_difference(black, white) == 1.0
+
+
+def test_frame_difference_of_different_sizes():
+    assert frame_difference(numpy.zeros((4, 4)), numpy.zeros((4, 5))) == 1.0
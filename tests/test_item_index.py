@@ -0,0 +1,66 @@
+import pytest
+
+from PywinautoLibrary.keywords.item_index import ItemIndex
+
+
+class FakeList:
+    def __init__(self, texts, handle=1):
+        self.texts = list(texts)
+        self.handle = handle
+        self.bulk_reads = 0
+
+
+def _read_texts(wrapper):
+    wrapper.bulk_reads += 1
+    return wrapper.texts
+
+
+@pytest.fixture
+def index():
+    return ItemIndex(lambda wrapper: len(wrapper.texts), _read_texts, lambda wrapper, i: wrapper.texts[i])
+
+
+def test_lookup_reads_texts_once(index):
+    items = FakeList(["Apple", "Banana", "Cherry"])
+    assert index.lookup(items, "Banana") == 1
+    assert index.lookup(items, "Cherry") == 2
+    assert items.bulk_reads == 1
+
+
+def test_lookup_ignore_case_and_regex(index):
+    items = FakeList(["Apple", "Banana", "apple"])
+    assert index.lookup(items, "APPLE", ignore_case=True) == 0
+    assert index.lookup(items, "b.*a", regex=True) is None
+    assert index.lookup(items, "b.*a", ignore_case=True, regex=True) == 1
+
+
+def test_reordered_items_rebuild_the_index(index):
+    items = FakeList(["Apple", "Banana"])
+    assert index.lookup(items, "Banana") == 1
+    items.texts.reverse()
+    assert index.lookup(items, "Banana") == 0
+    assert items.bulk_reads == 2
+
+
+def test_changed_count_or_handle_rebuilds_the_index(index):
+    items = FakeList(["Apple"])
+    assert index.lookup(items, "Banana") is None
+    items.texts.append("Banana")
+    assert index.lookup(items, "Banana") == 1
+    assert index.lookup(FakeList(["Banana", "Apple"], handle=2), "Banana") == 0
+
+
+def test_missing_item_rebuilds_once(index):
+    items = FakeList(["Apple"])
+    index.refresh(items)
+    assert index.lookup(items, "Cherry") is None
+    assert items.bulk_reads == 2
+
+
+def test_refresh_only_rebuilds_when_needed(index):
+    items = FakeList(["Apple"])
+    index.refresh(items)
+    index.refresh(items)
+    assert items.bulk_reads == 1
+    index.refresh(items, force=True)
+    assert items.bulk_reads == 2
@@ -0,0 +1,73 @@
+import types
+
+import pytest
+
+from fakes import FakeIUIA, FakeSpecification, FakeUIAElement, FakeWrapper
+from pywinauto import uia_defines
+from PywinautoLibrary.keywords import control_keywords
+from PywinautoLibrary.keywords.prefetch import TREE_SCOPE_CHILDREN, TREE_SCOPE_ELEMENT
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+
+
+def _keywords(listbox):
+    return ControlKeywords(FakeSpecification(FakeWrapper(handle=1), {"List": FakeSpecification(listbox)}))
+
+
+@pytest.fixture
+def uia_listbox(monkeypatch):
+    monkeypatch.setattr(uia_defines, "IUIA", FakeIUIA, raising=False)
+    elements = [FakeUIAElement(f"Item {index}", is_selected=False) for index in range(50)]
+    calls = []
+
+    def item(element):
+        select = types.SimpleNamespace(AddToSelection=lambda: element.properties.update(is_selected=True))
+        return FakeWrapper(iface_selection_item=select)
+
+    def get_items():
+        calls.append("get_items")
+        return [item(element) for element in elements]
+
+    def get_item(index):
+        raise AssertionError("get_item walks the items on every call")
+
+    header = FakeUIAElement("Header", is_content_element=False)
+    listbox = FakeWrapper(handle=2, backend="uia", get_items=get_items, get_item=get_item,
+                          element_info=types.SimpleNamespace(element=FakeUIAElement(children=[header] + elements)))
+    return listbox, elements, calls
+
+
+def test_uia_indices_are_selected_from_one_item_list(uia_listbox):
+    listbox, elements, calls = uia_listbox
+    assert _keywords(listbox).listbox_select_indices("List", 3, "10", 49) == [3, 10, 49]
+    assert calls == ["get_items"]
+
+
+def test_uia_range_is_selected_and_verified_with_one_cache_request(uia_listbox):
+    listbox, elements, calls = uia_listbox
+    elements[0].properties["is_selected"] = True
+    assert _keywords(listbox).listbox_select_range("List", 20, 24) == [0, 20, 21, 22, 23, 24]
+    assert calls == ["get_items"]
+    assert listbox.element_info.element.cache_builds == [TREE_SCOPE_ELEMENT | TREE_SCOPE_CHILDREN]
+
+
+def test_uia_selection_that_did_not_take_fails(uia_listbox):
+    listbox, elements, _ = uia_listbox
+    elements[5].properties["is_selected"] = None
+    listbox.get_items = lambda: [FakeWrapper(iface_selection_item=types.SimpleNamespace(AddToSelection=lambda: None))
+                                 for _ in elements]
+    with pytest.raises(AssertionError, match=r"Indices \[5\] are not selected"):
+        _keywords(listbox).listbox_select_indices("List", 5)
+
+
+def test_win32_range_is_selected_with_one_message():
+    messages = []
+    selected = set()
+
+    def send_message(message, first, last):
+        messages.append(message)
+        selected.update(range(first, last + 1))
+
+    listbox = FakeWrapper(handle=2, is_single_selection=lambda: False, send_message=send_message,
+                          notify_parent=lambda code: None, selected_indices=lambda: sorted(selected))
+    assert _keywords(listbox).listbox_select_range("List", 2, 4) == [2, 3, 4]
+    assert messages == [control_keywords.LB_SELITEMRANGEEX]
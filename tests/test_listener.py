@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from PywinautoLibrary import listener
+from PywinautoLibrary.keywords.ui_snapshot import UISnapshot
+
+
+class FakeLibrary:
+    def __init__(self):
+        self.ui_snapshot = UISnapshot()
+        self.ui_snapshot.begin()
+        self.prefetcher = SimpleNamespace(invalidate=lambda: None)
+        self.started = []
+
+    def _record_keyword_start(self, name, args):
+        self.started.append(name)
+
+
+@pytest.fixture
+def libraries(monkeypatch):
+    libraries = {"Win": FakeLibrary(), "Other": FakeLibrary()}
+    lookups = []
+
+    def get_library_instance(self, name):
+        lookups.append(name)
+        if name not in libraries:
+            raise RuntimeError(f"No library '{name}' found.")
+        return libraries[name]
+
+    monkeypatch.setattr(listener.BuiltIn, "get_library_instance", get_library_instance)
+    return libraries, lookups
+
+
+def test_only_keywords_of_the_own_instance_are_handled(libraries):
+    instances, lookups = libraries
+    own = listener.LibraryListener(instances["Win"])
+    for libname in ("Win", "Other", "BuiltIn", "Win", None):
+        own.start_keyword("", {"libname": libname, "kwname": "Click", "args": []})
+    assert instances["Win"].started == ["Click", "Click"]
+    assert instances["Other"].started == []
+    assert lookups == ["Win", "Other", "BuiltIn"]
+
+
+def test_read_only_keywords_keep_the_snapshot(libraries):
+    instances, _ = libraries
+    snapshot = instances["Win"].ui_snapshot
+    snapshot.get("OK", "control", "text", lambda: None, lambda: "OK")
+    own = listener.LibraryListener(instances["Win"])
+    own.start_keyword("", {"libname": "Win", "kwname": "Get Control Text", "args": []})
+    own.start_keyword("", {"libname": "Other", "kwname": "Click", "args": []})
+    assert snapshot.invalidations == 0
+    own.start_keyword("", {"libname": "Win", "kwname": "Click", "args": []})
+    assert snapshot.invalidations == 1
+
+
+def test_suite_start_forgets_names(libraries):
+    instances, lookups = libraries
+    own = listener.LibraryListener(instances["Win"])
+    own.start_keyword("", {"libname": "Win", "kwname": "Click", "args": []})
+    own.start_suite("", {})
+    own.start_keyword("", {"libname": "Win", "kwname": "Click", "args": []})
+    assert lookups == ["Win", "Win"]
@@ -0,0 +1,159 @@
+import ctypes
+import types
+
+import pytest
+
+from fakes import FakeIUIA, FakeSpecification, FakeUIAElement, FakeWrapper
+from pywinauto import uia_defines
+from PywinautoLibrary.keywords import control_keywords, prefetch
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+
+ROWS = [[f"Item {row}", f"{row * 10}"] for row in range(5)]
+
+
+def _keywords(listview):
+    return ControlKeywords(FakeSpecification(FakeWrapper(handle=1), {"List": FakeSpecification(listview)}))
+
+
+class FakeItem(ctypes.Structure):
+    _fields_ = [("iSubItem", ctypes.c_int), ("cchTextMax", ctypes.c_int), ("pszText", ctypes.c_size_t)]
+
+
+class FakeMemory:
+    """Remote memory block holding the text of the last cell the list view was asked for."""
+
+    blocks = []
+
+    def __init__(self, control, size=4096):
+        self.size = size
+        self.sub_item = None
+        self.text = ""
+        self.cleaned_up = False
+        FakeMemory.blocks.append(self)
+
+    def Address(self):
+        return 0x10000
+
+    def Write(self, item):
+        self.sub_item = item.iSubItem
+
+    def Read(self, data, address=None, size=None):
+        ctypes.memmove(data, ctypes.create_unicode_buffer(self.text), size)
+
+    def CleanUp(self):
+        self.cleaned_up = True
+
+
+@pytest.fixture
+def win32_listview(monkeypatch):
+    FakeMemory.blocks = []
+    monkeypatch.setattr(control_keywords, "RemoteMemoryBlock", FakeMemory)
+    monkeypatch.setattr(control_keywords.win32structures, "LVITEMW", FakeItem, raising=False)
+    monkeypatch.setattr(control_keywords.handleprops, "is64bitprocess", lambda process: True, raising=False)
+    messages = []
+
+    def send_message(message, row, memory):
+        messages.append((message, row, memory.sub_item))
+        memory.text = ROWS[row][memory.sub_item]
+        return len(memory.text)
+
+    listview = FakeWrapper(handle=2, item_count=lambda: len(ROWS), process_id=lambda: 42, send_message=send_message,
+                           columns=lambda: [{"text": "Name"}, {"text": "Size"}])
+    return listview, messages
+
+
+def test_win32_rows_are_read_through_one_memory_block(win32_listview):
+    listview, messages = win32_listview
+    rows = _keywords(listview).get_listview_data("List", start=1, count=2)
+    assert rows == [{"Name": "Item 1", "Size": "10"}, {"Name": "Item 2", "Size": "20"}]
+    assert messages == [(control_keywords.LVM_GETITEMTEXTW, 1, 0), (control_keywords.LVM_GETITEMTEXTW, 1, 1),
+                        (control_keywords.LVM_GETITEMTEXTW, 2, 0), (control_keywords.LVM_GETITEMTEXTW, 2, 1)]
+    assert len(FakeMemory.blocks) == 1
+    assert FakeMemory.blocks[0].cleaned_up
+
+
+def test_win32_rows_are_exported(win32_listview, tmp_path):
+    listview, _ = win32_listview
+    output = tmp_path / "rows.csv"
+    assert _keywords(listview).get_listview_data("List", output=str(output)) == 5
+    assert output.read_text().splitlines() == ["Name,Size"] + [f"Item {row},{row * 10}" for row in range(5)]
+    assert FakeMemory.blocks[0].cleaned_up
+
+
+class FakeContainer:
+    """ItemContainer pattern returning the item after the given one."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def FindItemByProperty(self, after, property_id, value):
+        index = 0 if after is None else self.items.index(after) + 1
+        return self.items[index] if index < len(self.items) else None
+
+
+def _row(row):
+    return FakeUIAElement(children=[FakeUIAElement(text) for text in ROWS[row]], realizable=True)
+
+
+@pytest.fixture
+def uia(monkeypatch):
+    """Patterns supported by elements, keyed by element and pattern name."""
+    patterns = {}
+    def get_elem_interface(element, pattern_name):
+        if pattern_name == "VirtualizedItem" and getattr(element, "realizable", False):
+            return types.SimpleNamespace(Realize=lambda: setattr(element, "realized", True))
+        if (id(element), pattern_name) not in patterns:
+            raise uia_defines.NoPatternInterfaceError()
+        return patterns[id(element), pattern_name]
+
+    monkeypatch.setattr(uia_defines, "IUIA", FakeIUIA, raising=False)
+    monkeypatch.setattr(uia_defines, "get_elem_interface", get_elem_interface, raising=False)
+    return patterns
+
+
+def _uia_listview(element, item_count=len(ROWS)):
+    return FakeWrapper(handle=2, backend="uia", element_info=types.SimpleNamespace(element=element),
+                       item_count=lambda: item_count,
+                       columns=lambda: [FakeWrapper(window_text=lambda: "Name"), FakeWrapper(window_text=lambda: "Size")])
+
+
+def test_uia_rows_are_read_from_one_subtree_cache(uia):
+    rows = [_row(row) for row in range(5)]
+    element = FakeUIAElement(children=rows)
+    data = _keywords(_uia_listview(element)).get_listview_data("List")
+    assert [list(row.values()) for row in data] == ROWS
+    assert element.cache_builds == [prefetch.TREE_SCOPE_SUBTREE]
+    assert not any(row.cache_builds for row in rows)
+
+
+def test_uia_rows_of_a_long_list_are_cached_one_row_at_a_time(uia, monkeypatch):
+    monkeypatch.setattr(control_keywords, "SUBTREE_CACHE_ROWS", 3)
+    rows = [_row(row) for row in range(5)]
+    element = FakeUIAElement(children=rows)
+    data = _keywords(_uia_listview(element)).get_listview_data("List")
+    assert [list(row.values()) for row in data] == ROWS
+    assert element.cache_builds == [prefetch.TREE_SCOPE_ELEMENT | prefetch.TREE_SCOPE_CHILDREN]
+    assert all(len(row.cache_builds) == 1 for row in rows)
+
+
+def test_uia_virtualized_rows_are_realized_through_the_item_container(uia):
+    rows = [_row(row) for row in range(5)]
+    element = FakeUIAElement(children=rows[:2])
+    uia[id(element), "ItemContainer"] = FakeContainer(rows)
+    data = _keywords(_uia_listview(element)).get_listview_data("List", start=1, count=3)
+    assert [list(row.values()) for row in data] == ROWS[1:4]
+    assert [row.realized for row in rows] == [False, True, True, True, False]
+
+
+def test_uia_virtualized_rows_without_item_container_fail(uia):
+    element = FakeUIAElement(children=[_row(row) for row in range(2)])
+    with pytest.raises(RuntimeError, match="has 5 rows, but only 2 can be read"):
+        _keywords(_uia_listview(element)).get_listview_data("List")
+
+
+def test_uia_rows_missing_from_the_item_container_fail(uia):
+    rows = [_row(row) for row in range(5)]
+    element = FakeUIAElement(children=rows[:2])
+    uia[id(element), "ItemContainer"] = FakeContainer(rows[:4])
+    with pytest.raises(RuntimeError, match="has 5 rows, but only 4 could be found"):
+        _keywords(_uia_listview(element)).get_listview_data("List", start=2)
@@ -0,0 +1,104 @@
+import pytest
+
+from fakes import FakeSpecification, FakeWrapper
+from PywinautoLibrary.keywords import menu_cache
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+from PywinautoLibrary.keywords.menu_cache import MenuCache, clean_menu_text, menu_path_parts
+
+
+class FakeMenuItem:
+    def __init__(self, text, item_id, sub_menu=None, enabled=True):
+        self._text = text
+        self._item_id = item_id
+        self._sub_menu = sub_menu
+        self._enabled = enabled
+        self.selections = 0
+
+    def text(self):
+        return self._text
+
+    def item_id(self):
+        return self._item_id
+
+    def sub_menu(self):
+        return self._sub_menu
+
+    def is_enabled(self):
+        return self._enabled
+
+    def select(self):
+        self.selections += 1
+
+
+class FakeMenu:
+    def __init__(self, *items):
+        self._items = list(items)
+
+    def items(self):
+        return self._items
+
+
+@pytest.fixture
+def window(monkeypatch, tmp_path):
+    """A window with a File menu, whose menu bar reports the command IDs in enabled as enabled."""
+    executable = tmp_path / "app.exe"
+    executable.write_text("")
+    monkeypatch.setattr(menu_cache, "process_module", lambda process_id: str(executable))
+    enabled = {101, 102}
+    monkeypatch.setattr(MenuCache, "is_enabled", staticmethod(lambda window, item_id: item_id in enabled))
+    save = FakeMenuItem("&Save\tCtrl+S", 101)
+    save_as = FakeMenuItem("Save &As...", 102)
+    file_menu = FakeMenuItem("&File", 0, FakeMenu(save, save_as))
+    looked_up = []
+    commands = []
+
+    def menu_item(path):
+        looked_up.append(path)
+        return {"File -> Save": save, "File -> Save As...": save_as}[path]
+
+    wrapper = FakeWrapper(handle=1, process_id=lambda: 42, class_name=lambda: "Notepad", menu_item=menu_item,
+                          verify_actionable=lambda: None, notify_menu_select=commands.append,
+                          menu=lambda: FakeMenu(file_menu))
+    return wrapper, enabled, looked_up, commands
+
+
+def test_menu_path_parts_and_clean_text():
+    assert menu_path_parts("File -> Save As... ") == ("File", "Save As...")
+    assert clean_menu_text("Save &As...\tCtrl+Shift+S") == "Save As..."
+
+
+def test_menu_command_is_invoked_directly_once_resolved(window):
+    wrapper, _, looked_up, commands = window
+    keywords = ControlKeywords(FakeSpecification(wrapper))
+    keywords.menu_select("File -> Save")
+    keywords.menu_select("File -> Save")
+    assert looked_up == ["File -> Save"]
+    assert commands == [101]
+
+
+def test_disabled_command_is_resolved_again(window):
+    wrapper, enabled, looked_up, commands = window
+    keywords = ControlKeywords(FakeSpecification(wrapper))
+    keywords.menu_select("File -> Save")
+    enabled.discard(101)
+    keywords.menu_select("File -> Save")
+    assert looked_up == ["File -> Save", "File -> Save"]
+    assert commands == []
+
+
+def test_menu_structure_caches_command_ids(window):
+    wrapper, _, looked_up, commands = window
+    keywords = ControlKeywords(FakeSpecification(wrapper))
+    structure = keywords.get_menu_structure()
+    assert [child["text"] for child in structure[0]["children"]] == ["Save", "Save As..."]
+    keywords.menu_select("File -> Save As...")
+    assert looked_up == []
+    assert commands == [102]
+
+
+def test_cache_keys_depend_on_the_window_class(window):
+    wrapper, _, _, _ = window
+    cache = MenuCache()
+    cache.put(cache.key(wrapper, "File -> Save"), 101)
+    wrapper.class_name = lambda: "Other"
+    assert cache.get(cache.key(wrapper, "File -> Save")) is None
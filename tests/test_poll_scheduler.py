@@ -0,0 +1,93 @@
+import itertools
+import threading
+import time
+
+import pytest
+from pywinauto.timings import TimeoutError
+
+from PywinautoLibrary.keywords.poll_scheduler import PollScheduler, WaitCancelledError
+
+
+def test_wait_returns_condition_result():
+    scheduler = PollScheduler()
+    polls = itertools.count(1)
+    assert scheduler.wait(lambda: next(polls) >= 3 and "found", 1) == "found"
+    assert scheduler.statistics[-1]["polls"] == 3
+    assert scheduler.statistics[-1]["detected"]
+
+
+def test_wait_times_out_from_last_error():
+    scheduler = PollScheduler(min_interval=0.01)
+
+    def condition():
+        raise LookupError("missing")
+
+    with pytest.raises(TimeoutError) as error:
+        scheduler.wait(condition, 0.05, "missing control")
+    assert isinstance(error.value.__cause__, LookupError)
+    assert not scheduler.statistics[-1]["detected"]
+
+
+def test_snapshot_hooks_run_once_per_tick():
+    hook_calls = []
+    scheduler = PollScheduler(snapshot_hooks=[lambda: hook_calls.append(1)])
+    scheduler.wait(lambda: True, 1)
+    assert len(hook_calls) == scheduler.ticks == 1
+
+
+def test_interval_backs_off_to_maximum():
+    scheduler = PollScheduler(min_interval=0.01, max_interval=0.02, backoff=2)
+    with pytest.raises(TimeoutError):
+        scheduler.wait(lambda: False, 0.1)
+    assert 4 <= scheduler.statistics[-1]["polls"] <= 8
+
+
+@pytest.mark.parametrize("intervals", [(0, 1), (0.5, 0.1), (0.1, 1, 0.5)])
+def test_set_intervals_rejects_invalid_values(intervals):
+    with pytest.raises(ValueError):
+        PollScheduler().set_intervals(*intervals)
+
+
+def test_concurrent_waits_share_the_driver():
+    scheduler = PollScheduler(min_interval=0.01, max_interval=0.05)
+    errors = []
+
+    def slow_wait():
+        try:
+            scheduler.wait(lambda: False, 0.3)
+        except TimeoutError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=slow_wait) for _ in range(3)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert time.monotonic() - started < 0.6
+
+
+def test_new_waiter_is_polled_while_another_drives():
+    scheduler = PollScheduler(min_interval=0.01, max_interval=0.5)
+    slow = threading.Thread(target=lambda: pytest.raises(TimeoutError, scheduler.wait, lambda: False, 1))
+    slow.start()
+    time.sleep(0.2)
+    started = time.monotonic()
+    scheduler.wait(lambda: True, 1)
+    assert time.monotonic() - started < 0.1
+    slow.join()
+
+
+def test_cancelled_wait_raises():
+    scheduler = PollScheduler(min_interval=0.01)
+    cancel = threading.Event()
+    threading.Timer(0.05, lambda: (cancel.set(), scheduler.wake())).start()
+    with scheduler.cancel_on(cancel):
+        with pytest.raises(WaitCancelledError):
+            scheduler.wait(lambda: False, 5)
+    cancel.set()
+    with scheduler.cancel_on(cancel):
+        with pytest.raises(WaitCancelledError):
+            scheduler.wait(lambda: True, 5)
+    assert scheduler.wait(lambda: True, 1)
@@ -0,0 +1,103 @@
+import types
+
+from fakes import NOT_SUPPORTED, FakeIUIA, FakeUIAElement
+from pywinauto import uia_defines
+from PywinautoLibrary.keywords.prefetch import PropertyPrefetcher, UIACacheProvider
+
+
+class FakeProvider:
+    def __init__(self, elements):
+        self.elements = elements
+        self.key_reads = 0
+        self.fetched = []
+
+    def key(self, wrapper):
+        self.key_reads += 1
+        return wrapper
+
+    def fetch(self, root, properties):
+        self.fetched.append((root, list(properties)))
+        return {key: dict(values) for key, values in self.elements.items()}
+
+    def rows(self, listview, start, end, item_count, subtree=True):
+        for row in range(start, end):
+            yield [f"{listview} {row}", str(subtree)]
+
+
+def _read_fails():
+    raise AssertionError("read should not be called")
+
+
+def test_reads_are_served_from_the_fetch():
+    provider = FakeProvider({"ok": {"text": "OK", "toggle_state": 1}})
+    prefetcher = PropertyPrefetcher(provider)
+    assert prefetcher.begin("dialog") == 1
+    assert prefetcher.get("OK button", "text", lambda: "ok", _read_fails) == "OK"
+    assert prefetcher.get("OK button", "toggle_state", lambda: "ok", _read_fails) == 1
+    assert provider.key_reads == 1
+    assert prefetcher.statistics()["hits"] == 2
+
+
+def test_missing_values_fall_back_to_read():
+    provider = FakeProvider({"edit": {"toggle_state": 0}})
+    prefetcher = PropertyPrefetcher(provider)
+    assert prefetcher.get("Edit", "text", lambda: "edit", lambda: "not active") == "not active"
+    prefetcher.begin("dialog")
+    assert prefetcher.get("Edit", "text", lambda: "edit", lambda: "typed") == "typed"
+    assert prefetcher.get("Other", "text", lambda: "other", lambda: "other text") == "other text"
+    assert prefetcher.statistics()["misses"] == 3
+
+
+def test_invalidate_fetches_again_on_next_read():
+    provider = FakeProvider({"ok": {"text": "OK"}})
+    prefetcher = PropertyPrefetcher(provider)
+    prefetcher.begin("dialog", ["text"])
+    prefetcher.get("OK", "text", lambda: "ok", _read_fails)
+    provider.elements["ok"]["text"] = "Done"
+    prefetcher.invalidate()
+    assert len(provider.fetched) == 1
+    assert prefetcher.get("OK", "text", lambda: "ok", _read_fails) == "Done"
+    assert provider.fetched == [("dialog", ["text"]), ("dialog", ["text"])]
+    assert prefetcher.active
+
+
+def test_end_and_invalidate_when_inactive():
+    prefetcher = PropertyPrefetcher(FakeProvider({}))
+    prefetcher.invalidate()
+    assert not prefetcher.active
+    prefetcher.begin("dialog")
+    prefetcher.end()
+    assert not prefetcher.active
+    assert prefetcher.get("OK", "text", _read_fails, lambda: "read") == "read"
+
+
+def test_rows_count_as_one_fetch():
+    prefetcher = PropertyPrefetcher(FakeProvider({}))
+    rows = prefetcher.rows("list", 2, 4, 10, subtree=False)
+    assert list(rows) == [["list 2", "False"], ["list 3", "False"]]
+    assert prefetcher.statistics()["fetches"] == 1
+
+
+def test_hits_are_counted_per_control_and_property():
+    provider = FakeProvider({"ok": {"text": "OK", "is_enabled": True}, "edit": {"text": "typed"}})
+    prefetcher = PropertyPrefetcher(provider)
+    prefetcher.begin("dialog")
+    for _ in range(2):
+        prefetcher.get("OK", "text", lambda: "ok", _read_fails)
+    prefetcher.get("OK", "is_enabled", lambda: "ok", _read_fails)
+    prefetcher.get("Edit", "text", lambda: "edit", _read_fails)
+    prefetcher.get("Edit", "toggle_state", lambda: "edit", lambda: 0)
+    assert prefetcher.statistics()["control_hits"] == {"OK/text": 2, "OK/is_enabled": 1, "Edit/text": 1}
+
+
+def test_unsupported_properties_are_not_served(monkeypatch):
+    monkeypatch.setattr(uia_defines, "IUIA", FakeIUIA, raising=False)
+    button = FakeUIAElement("OK", runtime_id=(42, 2), class_name="Button", text_pattern=False,
+                            toggle_state=NOT_SUPPORTED)
+    unnamed = FakeUIAElement(NOT_SUPPORTED, runtime_id=(42, 3), class_name="", text_pattern=False)
+    root = FakeUIAElement("Dialog", [button, unnamed], runtime_id=(42, 1), class_name="#32770", text_pattern=False)
+    values = UIACacheProvider().fetch(types.SimpleNamespace(element_info=types.SimpleNamespace(element=root)),
+                                      ["text", "toggle_state"])
+    assert values[(42, 2)]["text"] == "OK"
+    assert "toggle_state" not in values[(42, 2)]
+    assert "text" not in values[(42, 3)] and "name" not in values[(42, 3)]
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from PywinautoLibrary.keywords.screenshot import ScreenshotPipeline
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = ScreenshotPipeline(capture=lambda image: image)
+    yield pipeline
+    pipeline._executor.shutdown()
+
+
+def test_capture_writes_image(pipeline, tmp_path):
+    path = str(tmp_path / "shot.png")
+    assert pipeline.capture(Image.new("RGB", (20, 10), "red"), path) == path
+    pipeline.flush()
+    with Image.open(path) as written:
+        assert written.size == (20, 10)
+    assert pipeline.written == 1
+
+
+def test_identical_captures_are_written_to_every_path(pipeline, tmp_path):
+    image = Image.new("RGB", (8, 8), "blue")
+    paths = [str(tmp_path / f"shot{index}.png") for index in range(3)]
+    for path in paths:
+        assert pipeline.capture(image, path) == path
+    pipeline.flush()
+    assert all(os.path.exists(path) for path in paths)
+    assert pipeline.duplicates == 2
+    assert pipeline.written == 3
+
+
+def test_scale_and_jpeg_quality(pipeline, tmp_path):
+    path = str(tmp_path / "sub" / "shot.jpg")
+    pipeline.capture(Image.new("RGBA", (40, 20)), path, scale=0.5, quality=50)
+    pipeline.flush()
+    with Image.open(path) as written:
+        assert written.format == "JPEG"
+        assert written.size == (20, 10)
+
+
+@pytest.mark.parametrize("path, scale", [("shot.gif", 1), ("shot.png", 0), ("shot.png", 2)])
+def test_invalid_arguments(pipeline, tmp_path, path, scale):
+    with pytest.raises(ValueError):
+        pipeline.capture(Image.new("RGB", (4, 4)), str(tmp_path / path), scale)
+
+
+def test_failed_write_is_raised_by_next_capture(pipeline, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    pipeline.capture(Image.new("RGB", (4, 4)), str(blocker / "shot.png"))
+    for future in [future for _, future in pipeline._pending]:
+        future.exception()
+    with pytest.raises(RuntimeError, match="Writing screenshots failed"):
+        pipeline.capture(Image.new("RGB", (4, 4)), str(tmp_path / "next.png"))
+    pipeline.flush()
+
+
+def test_failed_write_is_raised_by_flush(pipeline, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    pipeline.capture(Image.new("RGB", (4, 4)), str(blocker / "shot.png"))
+    with pytest.raises(RuntimeError, match="shot.png"):
+        pipeline.flush()
@@ -0,0 +1,78 @@
+import types
+
+import pytest
+
+from fakes import FakeSpecification, FakeWrapper
+from PywinautoLibrary.keywords import control_keywords
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+
+
+def _keywords(wrapper):
+    return ControlKeywords(FakeSpecification(FakeWrapper(handle=1), {"List": FakeSpecification(wrapper)}))
+
+
+class FakeListBox(FakeWrapper):
+    """win32 list box of 50 items with room for 5 rows, recording the top index messages."""
+
+    def __init__(self, top=0):
+        super().__init__(handle=2, item_count=lambda: 50, friendly_class_name=lambda: "ListBox",
+                         client_rect=lambda: types.SimpleNamespace(height=lambda: 100))
+        self.top = top
+        self.set_tops = []
+
+    def send_message(self, message, wparam=0, lparam=0):
+        if message == control_keywords.LB_GETTOPINDEX:
+            return self.top
+        if message == control_keywords.LB_GETITEMHEIGHT:
+            return 20
+        if message == control_keywords.LB_SETTOPINDEX:
+            self.set_tops.append(wparam)
+            self.top = wparam
+        return 0
+
+
+@pytest.mark.parametrize("top, item, expected_tops", [(0, "30", [26]), (30, 3, [3]), (10, "12", [])])
+def test_list_box_scrolls_by_the_least_amount(top, item, expected_tops):
+    listbox = FakeListBox(top)
+    _keywords(listbox).scroll_to_item("List", item)
+    assert listbox.set_tops == expected_tops
+
+
+def test_list_box_index_out_of_range():
+    with pytest.raises(ValueError, match="out of range"):
+        _keywords(FakeListBox()).scroll_to_item("List", "50")
+
+
+def test_list_view_item_is_ensured_visible():
+    state = {"top": 0}
+    item = FakeWrapper(item_index=40, ensure_visible=lambda: state.update(top=35))
+    messages = {control_keywords.LVM_GETTOPINDEX: lambda: state["top"],
+                control_keywords.LVM_GETCOUNTPERPAGE: lambda: 10}
+    listview = FakeWrapper(handle=2, friendly_class_name=lambda: "ListView", get_item=lambda key: item,
+                           send_message=lambda message: messages[message]())
+    _keywords(listview).scroll_to_item("List", "40")
+    assert state["top"] == 35
+
+
+def test_item_that_stays_hidden_fails():
+    item = FakeWrapper(item_index=40, ensure_visible=lambda: None)
+    listview = FakeWrapper(handle=2, friendly_class_name=lambda: "ListView", get_item=lambda key: item,
+                           send_message=lambda message: 0 if message == control_keywords.LVM_GETTOPINDEX else 10)
+    with pytest.raises(RuntimeError, match="could not be scrolled into view"):
+        _keywords(listview).scroll_to_item("List", "40")
+
+
+def test_uia_item_is_scrolled_with_its_scroll_item_pattern():
+    scrolled = []
+    item = FakeWrapper(iface_scroll_item=types.SimpleNamespace(ScrollIntoView=lambda: scrolled.append(True)),
+                       is_visible=lambda: bool(scrolled))
+    listbox = FakeWrapper(handle=2, backend="uia", friendly_class_name=lambda: "ListBox", get_item=lambda key: item,
+                          item_count=lambda: 50)
+    listbox.element_info.control_type = "List"
+    _keywords(listbox).scroll_to_item("List", "Item 30")
+    assert scrolled == [True]
+
+
+def test_unsupported_control_fails():
+    with pytest.raises(RuntimeError, match="not supported for Button controls"):
+        _keywords(FakeWrapper(handle=2, friendly_class_name=lambda: "Button")).scroll_to_item("List", "1")
@@ -0,0 +1,57 @@
+import pytest
+
+from fakes import FakeSpecification, FakeWrapper
+from pywinauto.timings import TimeoutError
+from PywinautoLibrary.keywords.control_keywords import ControlKeywords
+from PywinautoLibrary.keywords.poll_scheduler import PollScheduler
+
+
+class StatusBar(FakeSpecification):
+    """Status bar specification showing the next of its texts on every read, counting resolutions."""
+
+    def __init__(self, texts, present=True):
+        self.readings = list(texts)
+        self.resolutions = 0
+        super().__init__(FakeWrapper(handle=5, texts=self.read, get_part_text=lambda part: self.read()[part]),
+                         present=present)
+
+    def read(self):
+        texts = self.readings.pop(0) if len(self.readings) > 1 else self.readings[0]
+        if isinstance(texts, Exception):
+            raise texts
+        return texts
+
+    def wrapper_object(self):
+        self.resolutions += 1
+        return self.wrapper
+
+
+def _keywords(statusbar):
+    return ControlKeywords(FakeSpecification(FakeWrapper(handle=1), {"Status": statusbar}),
+                           poll_scheduler=PollScheduler(min_interval=0.01, max_interval=0.02))
+
+
+def test_wait_returns_the_matching_text_resolving_the_control_once():
+    statusbar = StatusBar([["Ready", ""], ["Saving...", ""], ["Saved 3 files", "Ln 1"]])
+    text, elapsed = _keywords(statusbar).wait_for_statusbar_text("Status", r"Saved \d+", timeout=2)
+    assert text == "Saved 3 files"
+    assert elapsed >= 0
+    assert statusbar.resolutions == 1
+
+
+def test_wait_on_one_part():
+    statusbar = StatusBar([["Saved", "Ln 1"], ["Saved", "Ln 2"]])
+    assert _keywords(statusbar).wait_for_statusbar_text("Status", "Ln 2", part=1, timeout=2)[0] == "Ln 2"
+
+
+def test_recreated_status_bar_is_resolved_again():
+    statusbar = StatusBar([["Ready"], RuntimeError("window destroyed"), ["Done"]])
+    assert _keywords(statusbar).wait_for_statusbar_text("Status", "Done", timeout=2)[0] == "Done"
+    assert statusbar.resolutions == 2
+
+
+def test_missing_status_bar_times_out_without_resolving():
+    statusbar = StatusBar([["Done"]], present=False)
+    with pytest.raises(TimeoutError):
+        _keywords(statusbar).wait_for_statusbar_text("Status", "Done", timeout=0.1)
+    assert statusbar.resolutions == 0
@@ -0,0 +1,56 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from PywinautoLibrary.keywords.template_match import TemplateMatcher, match_template
+
+
+def _noise(height, width, seed=1):
+    return numpy.random.default_rng(seed).integers(0, 256, (height, width)).astype(numpy.float64)
+
+
+def test_match_template_finds_exact_position():
+    image = _noise(60, 80)
+    score, position = match_template(image, image[20:35, 30:50])
+    assert position == (30, 20)
+    assert score == pytest.approx(1.0)
+
+
+def test_match_template_larger_than_image():
+    assert match_template(_noise(10, 10), _noise(11, 5)) == (-1.0, None)
+
+
+def test_match_template_flat_image_scores_zero():
+    score, position = match_template(numpy.full((20, 20), 7.0), _noise(5, 5))
+    assert score == 0.0
+    assert position is not None
+
+
+def _save_template(image, box, path):
+    template = Image.fromarray(image[box[1]:box[3], box[0]:box[2]].astype(numpy.uint8))
+    template.save(path)
+    return str(path)
+
+
+def test_find_locates_template_file_and_reuses_region(tmp_path):
+    image = _noise(60, 80)
+    template_path = _save_template(image, (10, 5, 30, 20), tmp_path / "template.png")
+    matcher = TemplateMatcher()
+    capture = Image.fromarray(image.astype(numpy.uint8))
+    score, position, size = matcher.find(capture, template_path, 0.9)
+    assert (position, size) == ((10, 5), (20, 15))
+    assert score == pytest.approx(1.0)
+    assert matcher._last_matches[template_path] == ((10, 5), (20, 15), 1.0)
+
+    shifted = numpy.roll(image, (3, 4), axis=(0, 1))
+    score, position, size = matcher.find(Image.fromarray(shifted.astype(numpy.uint8)), template_path, 0.9)
+    assert position == (14, 8)
+
+
+def test_find_below_threshold_is_not_remembered(tmp_path):
+    template_path = _save_template(_noise(20, 20, seed=2), (0, 0, 10, 10), tmp_path / "template.png")
+    matcher = TemplateMatcher()
+    score, position, size = matcher.find(Image.fromarray(_noise(40, 40).astype(numpy.uint8)), template_path, 0.99)
+    assert score < 0.99
+    assert template_path not in matcher._last_matches
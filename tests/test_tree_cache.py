@@ -0,0 +1,67 @@
+from PywinautoLibrary.keywords.tree_cache import TreeNodeCache, tree_path_parts
+
+
+class FakeNode:
+    def __init__(self, text, children=()):
+        self.label = text
+        self.children = {child.label: child for child in children}
+        self.expanded = 0
+
+    def window_text(self):
+        return self.label
+
+    def expand(self):
+        self.expanded += 1
+
+    def get_child(self, text):
+        return self.children[text]
+
+
+class FakeTree:
+    def __init__(self, *roots):
+        self.roots = {root.label: root for root in roots}
+        self.lookups = 0
+
+    def get_item(self, path):
+        self.lookups += 1
+        return self.roots[path.lstrip('\\')]
+
+
+def _tree():
+    leaf = FakeNode("Leaf")
+    return FakeTree(FakeNode("Root", [FakeNode("Branch", [leaf]), FakeNode("Other")])), leaf
+
+
+def test_tree_path_parts():
+    assert tree_path_parts("Root->Branch->Leaf") == ("Root", "Branch", "Leaf")
+    assert tree_path_parts("\\Root\\Branch") == ("Root", "Branch")
+
+
+def test_resolve_walks_from_cached_prefix():
+    tree, leaf = _tree()
+    cache = TreeNodeCache()
+    assert cache.resolve(tree, ("Root", "Branch", "Leaf")) is leaf
+    assert cache.resolve(tree, ("Root", "Branch", "Leaf")) is leaf
+    assert cache.resolve(tree, ("Root", "Other")).label == "Other"
+    assert tree.lookups == 1
+
+
+def test_renamed_node_is_resolved_again():
+    tree, leaf = _tree()
+    cache = TreeNodeCache()
+    cache.resolve(tree, ("Root", "Branch", "Leaf"))
+    leaf.label = "Renamed"
+    assert cache.get(("Root", "Branch", "Leaf")) is None
+    assert cache.get(("Root", "Branch")) is not None
+
+
+def test_invalidate_drops_subtree():
+    tree, _ = _tree()
+    cache = TreeNodeCache()
+    cache.resolve(tree, ("Root", "Branch", "Leaf"))
+    cache.resolve(tree, ("Root", "Other"))
+    cache.invalidate(("Root", "Branch"))
+    assert cache.get(("Root", "Branch", "Leaf")) is None
+    assert cache.get(("Root", "Other")) is not None
+    cache.invalidate()
+    assert cache.get(("Root",)) is None
@@ -0,0 +1,72 @@
+import types
+
+import pytest
+
+from PywinautoLibrary.keywords import window_snapshot
+from PywinautoLibrary.keywords.window_snapshot import WindowSnapshot, compile_title_regex
+
+
+class FakeElementInfo:
+    """Top-level window counting how often its title is read."""
+
+    def __init__(self, handle, name, process_id, visible=True):
+        self.handle = handle
+        self._name = name
+        self.process_id = process_id
+        self.visible = visible
+        self.name_reads = 0
+
+    @property
+    def name(self):
+        self.name_reads += 1
+        return self._name
+
+
+@pytest.fixture
+def desktop(monkeypatch):
+    windows = [FakeElementInfo(1, "Notepad - a.txt", 10), FakeElementInfo(2, "Notepad - b.txt", 20),
+               FakeElementInfo(3, "Calculator", 10), FakeElementInfo(4, "Notepad - hidden", 10, visible=False)]
+    enumerations = []
+
+    def element_info_class():
+        enumerations.append(1)
+        return types.SimpleNamespace(children=lambda: list(windows))
+
+    backends = {"win32": types.SimpleNamespace(element_info_class=element_info_class)}
+    monkeypatch.setattr(window_snapshot.registry, "backends", backends)
+    return windows, enumerations
+
+
+def test_snapshot_is_reused_within_the_ttl(desktop):
+    _, enumerations = desktop
+    snapshot = WindowSnapshot(ttl=60)
+    first = snapshot.windows()
+    assert snapshot.windows() is first
+    assert snapshot.find(title="Calculator")[0].handle == 3
+    assert len(enumerations) == 1
+    snapshot.windows(refresh=True)
+    snapshot.invalidate()
+    snapshot.windows()
+    assert len(enumerations) == snapshot.enumerations == 3
+
+
+def test_zero_ttl_enumerates_every_time(desktop):
+    _, enumerations = desktop
+    snapshot = WindowSnapshot(ttl=0)
+    snapshot.windows()
+    snapshot.windows()
+    assert len(enumerations) == 2
+
+
+def test_find_filters_by_process_before_reading_titles(desktop):
+    windows, _ = desktop
+    snapshot = WindowSnapshot(ttl=60)
+    assert [entry.handle for entry in snapshot.find(title_re="Notepad", process=10)] == [1]
+    assert windows[1].name_reads == 0
+    assert [entry.handle for entry in snapshot.find(title_re="Notepad", visible_only=False)] == [1, 2, 4]
+    # Titles are read once per snapshot.
+    assert windows[0].name_reads == 1
+
+
+def test_title_regexes_are_compiled_once():
+    assert compile_title_regex("Save.*") is compile_title_regex("Save.*")